@@ -0,0 +1,56 @@
+"""Measures the cost of dispatching a request to the handler of a Resource.
+
+Run with: python -m benchmarks.dispatch
+"""
+
+import timeit
+
+from lbz.misc import NestedDict
+from lbz.resource import Resource
+from lbz.rest import APIGatewayEvent
+from lbz.router import add_route
+
+ROUTES = 150
+NUMBER = 200_000
+
+
+def build_resource() -> type[Resource]:
+    def handler(self: Resource, **_params: str) -> None:  # pylint: disable=unused-argument
+        pass
+
+    namespace = {
+        f"handler_{i}": add_route(f"/resource_{i}/{{uid}}", method="GET")(handler)
+        for i in range(ROUTES)
+    }
+    return type("BenchmarkResource", (Resource,), namespace)
+
+
+def main() -> None:
+    resource_cls = build_resource()
+    route = f"/resource_{ROUTES - 1}/{{uid}}"
+    resource = resource_cls(APIGatewayEvent("GET", route, path_params={"uid": "1"}))
+    router = resource._router  # pylint: disable=protected-access
+
+    # The lookup done by Resource.__call__ before handlers were bound to endpoints
+    legacy_routes = NestedDict()
+    for legacy_route in router:
+        legacy_routes[legacy_route] = dict(router[legacy_route])
+
+    def legacy_dispatch() -> None:
+        if resource.path is None or resource.path not in legacy_routes:
+            raise RuntimeError
+        if resource.method not in legacy_routes[resource.path]:
+            raise RuntimeError
+        getattr(resource, legacy_routes[resource.path][resource.method])(**resource.path_params)
+
+    def endpoint_dispatch() -> None:
+        endpoint = router.get_endpoint(resource.path, resource.method)
+        endpoint.handler(resource, **resource.path_params)
+
+    for name, dispatch in (("getattr", legacy_dispatch), ("endpoint", endpoint_dispatch)):
+        seconds = min(timeit.repeat(dispatch, number=NUMBER, repeat=5))
+        print(f"{name:>10}: {seconds / NUMBER * 1e9:8.1f} ns per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measures how many JWT signatures per second each backend creates and verifies, per algorithm.
+
+Run with: python -m benchmarks.jwt_backends
+"""
+
+import timeit
+from functools import partial
+
+from jose import jwt
+from jose.exceptions import JWKError
+
+from lbz.jwt_backends import BACKENDS
+from tests.fixtures.ec_pair import SAMPLE_EC_PRIVATE_KEY, SAMPLE_EC_PUBLIC_KEY
+from tests.fixtures.ed25519_pair import SAMPLE_ED25519_PRIVATE_KEY, SAMPLE_ED25519_PUBLIC_KEY
+from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY
+
+KEY_PAIRS = {
+    "RS256": (SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY),
+    "ES256": (SAMPLE_EC_PRIVATE_KEY, SAMPLE_EC_PUBLIC_KEY),
+    "EdDSA": (SAMPLE_ED25519_PRIVATE_KEY, SAMPLE_ED25519_PUBLIC_KEY),
+}
+CLAIMS = {"allow": {"*": "*"}, "deny": {}, "iss": "benchmark", "aud": "benchmark"}
+
+
+def measure(function: partial) -> float:
+    """Returns calls per second, pure-Python backends are slow so the number of calls adapts."""
+    number, seconds = timeit.Timer(function).autorange()
+    return number / seconds
+
+
+def main() -> None:
+    print(f"{'backend':>12} {'algorithm':>9} {'sign/s':>10} {'verify/s':>10}")
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except ImportError:
+            print(f"{name:>12}: not installed")
+            continue
+        for algorithm, (private_jwk, public_jwk) in KEY_PAIRS.items():
+            try:
+                private_key = backend.construct(private_jwk, algorithm)
+                public_key = backend.construct(public_jwk, algorithm)
+            except JWKError:
+                print(f"{name:>12} {algorithm:>9}: not supported")
+                continue
+            signing_input = jwt.encode(CLAIMS, "", algorithm="HS256").rsplit(".", 1)[0].encode()
+            signature = private_key.sign(signing_input)
+            signs = measure(partial(private_key.sign, signing_input))
+            verifies = measure(partial(public_key.verify, signing_input, signature))
+            print(f"{name:>12} {algorithm:>9} {signs:10.0f} {verifies:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Measures the cost of building a Resource, with its Request, out of a small GET event,
+and of building and calling it.
+
+Run with: python -m benchmarks.request
+"""
+
+import timeit
+
+from lbz.resource import Resource
+from lbz.response import Response
+from lbz.rest import APIGatewayEvent, APIGatewayEventV2
+from lbz.router import add_route
+
+NUMBER = 100_000
+HEADERS = {f"X-Header-{i}": str(i) for i in range(20)}
+
+
+class BenchmarkResource(Resource):
+    @add_route("/items/{uid}")
+    def get_item(self, uid: str) -> Response:
+        return Response({"uid": uid})
+
+
+def main() -> None:
+    events = {
+        "REST API": APIGatewayEvent(
+            "GET", "/items/{uid}", path_params={"uid": "1"}, headers=HEADERS
+        ),
+        "HTTP API": APIGatewayEventV2(
+            "GET", "/items/{uid}", path_params={"uid": "1"}, headers=HEADERS
+        ),
+    }
+    for name, event in events.items():
+        timers = {
+            "built": lambda event=event: BenchmarkResource(event),
+            "called": lambda event=event: BenchmarkResource(event)(),
+        }
+        for step, timer in timers.items():
+            seconds = min(timeit.repeat(timer, number=NUMBER, repeat=5))
+            print(f"{name:>10} {step:>6}: {seconds / NUMBER * 1e6:8.2f} us per request")
+
+
+if __name__ == "__main__":
+    main()
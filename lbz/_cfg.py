@@ -2,6 +2,11 @@ from lbz.configuration import ConfigParser, EnvValue
 
 # LBZ configuration
 LOGGING_LEVEL = EnvValue("LOGGING_LEVEL", default="INFO")
+JSON_CODEC = EnvValue("JSON_CODEC", default="json")
+COMPRESSION_MIN_SIZE = EnvValue[int]("COMPRESSION_MIN_SIZE", default=1024, parser=int)
+DECOMPRESSION_MAX_SIZE = EnvValue[int](
+    "DECOMPRESSION_MAX_SIZE", default=10 * 1024 * 1024, parser=int
+)
 CORS_HEADERS = EnvValue[list[str]]("CORS_HEADERS", default=[], parser=ConfigParser.split_by_comma)
 CORS_ORIGIN = EnvValue[list[str]]("CORS_ORIGIN", default=[], parser=ConfigParser.split_by_comma)
 
@@ -13,8 +18,27 @@ EVENTS_BUS_NAME = EnvValue[str]("EVENTS_BUS_NAME")
 ALLOWED_PUBLIC_KEYS = EnvValue[list[dict]](
     "ALLOWED_PUBLIC_KEYS", default=[], parser=ConfigParser.load_jwt_keys
 )
-ALLOWED_AUDIENCES = EnvValue("ALLOWED_AUDIENCES", parser=ConfigParser.split_by_comma)
-ALLOWED_ISS = EnvValue("ALLOWED_ISS", default="")
+ALLOWED_AUDIENCES = EnvValue[frozenset[str]](
+    "ALLOWED_AUDIENCES", parser=ConfigParser.split_by_comma_into_set
+)
+ALLOWED_ISS = EnvValue[frozenset[str]](
+    "ALLOWED_ISS", default=frozenset(), parser=ConfigParser.split_by_comma_into_set
+)
 AUTH_REMOVE_PREFIXES = EnvValue(
     "AUTH_REMOVE_PREFIXES", default=False, parser=ConfigParser.cast_to_bool
 )
+JWT_CACHE_SIZE = EnvValue[int]("JWT_CACHE_SIZE", default=1024, parser=int)
+JWT_CACHE_EXPIRY_SKEW = EnvValue[int]("JWT_CACHE_EXPIRY_SKEW", default=30, parser=int)
+AUTHZ_CACHE_SIZE = EnvValue[int]("AUTHZ_CACHE_SIZE", default=1024, parser=int)
+JWT_BACKEND = EnvValue("JWT_BACKEND", default="auto")
+JWKS_URL = EnvValue("JWKS_URL", default="")
+JWKS_TTL = EnvValue[int]("JWKS_TTL", default=3600, parser=int)
+JWKS_MIN_REFETCH_INTERVAL = EnvValue[int]("JWKS_MIN_REFETCH_INTERVAL", default=60, parser=int)
+REVOKED_TOKENS_SOURCE = EnvValue("REVOKED_TOKENS_SOURCE", default="")
+REVOKED_TOKENS_TTL = EnvValue[int]("REVOKED_TOKENS_TTL", default=300, parser=int)
+REVOKED_TOKENS_FAIL_CLOSED = EnvValue(
+    "REVOKED_TOKENS_FAIL_CLOSED", default=False, parser=ConfigParser.cast_to_bool
+)
+TRUST_AUTHORIZER_CONTEXT = EnvValue(
+    "TRUST_AUTHORIZER_CONTEXT", default=False, parser=ConfigParser.cast_to_bool
+)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Any
+
+from lbz.exceptions import NotFound
+from lbz.misc import get_logger
+from lbz.resource import DEFAULT_ROUTE_KEY, Resource
+from lbz.response import Response
+from lbz.rest import PayloadFormat
+from lbz.router import Router
+
+logger = get_logger(__name__)
+
+
+class Application:
+    """Serves multiple Resources from a single Lambda function.
+
+    Each Resource is mounted under a prefix, and the incoming API Gateway event is dispatched
+    to it with a single lookup of the route template given in the event. Events of HTTP APIs
+    and Function URLs using the default route are resolved by their raw path.
+    """
+
+    def __init__(self) -> None:
+        self._mounts: dict[str, tuple[type[Resource], str, dict[str, Any]]] = {}
+        self._router = Router()
+
+    def __repr__(self) -> str:
+        return f"<Application routes={len(self._mounts)}>"
+
+    def __contains__(self, route: str) -> bool:
+        return route in self._mounts
+
+    def mount(self, prefix: str, resource: type[Resource], **resource_kwargs: Any) -> None:
+        """Mounts all routes of the resource under the prefix.
+
+        Additional keyword arguments are passed to the resource during its initialization.
+        """
+        prefix = prefix.rstrip("/")
+        router = resource._router  # pylint: disable=protected-access
+        for route in router:
+            if (full_route := prefix + route if route != "/" else prefix or "/") in self._mounts:
+                raise ValueError(f"Route {full_route} is already mounted")
+            self._mounts[full_route] = (resource, route, resource_kwargs)
+            for method, handler in router[route].items():
+                self._router.add_route(full_route, method, handler)
+
+    def resolve(self, uri: str) -> tuple[str, dict[str, str]] | None:
+        """Resolves concrete URI into mounted route template and its params."""
+        return self._router.resolve(uri)
+
+    def __call__(self, event: dict) -> Response:
+        context = event.get("requestContext", {})
+        if is_http_api := PayloadFormat.get_format(event) == PayloadFormat.HTTP_API:
+            route, path_params = self._get_http_api_route(event)
+        else:
+            route, path_params = context.get("resourcePath"), None
+        if route is None or (mounted := self._mounts.get(route)) is None:
+            error = NotFound(f"Nothing matches the given URI: {route}")
+            logger.debug(error)
+            return Response.from_exception(error, context.get("requestId", ""))
+
+        resource, resource_route, resource_kwargs = mounted
+        if is_http_api:
+            event = {
+                **event,
+                "routeKey": f"{context['http']['method']} {resource_route}",
+                "pathParameters": path_params,
+            }
+        elif resource_route != route:
+            event = {**event, "requestContext": {**context, "resourcePath": resource_route}}
+        return resource(event, **resource_kwargs)()
+
+    def _get_http_api_route(self, event: dict) -> tuple[str | None, dict | None]:
+        if (route_key := event.get("routeKey", DEFAULT_ROUTE_KEY)) != DEFAULT_ROUTE_KEY:
+            return route_key.split(" ", 1)[-1], event.get("pathParameters")
+        if resolved := self.resolve(event["rawPath"]):
+            return resolved
+        return None, None
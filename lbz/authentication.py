@@ -14,8 +14,10 @@ def remove_prefix(text: str) -> str:
 class User:
     _max_attributes = 1000
 
-    def __init__(self, token: str):
+    def __init__(self, token: str, claims: dict | None = None):
+        """Claims of the token are decoded, unless they were already verified and are given."""
         self._token = token
+        self._claims = claims
         self.username: str = ""
         for key, value in self.get_user_details_from_auth_token().items():
             self.__setattr__(key, value)
@@ -28,7 +30,7 @@ class User:
     def get_user_details_from_auth_token(self) -> dict:
         """Parses auth token for user details."""
         parsed_user = {}
-        attributes = decode_jwt(self._token)
+        attributes = self._claims if self._claims is not None else decode_jwt(self._token)
         self._validate_attributes(attributes)
         for key, value in attributes.items():
             if key not in STANDARD_CLAIMS:
@@ -1,3 +1,4 @@
 from lbz.authz.authorizer import Authorizer
 from lbz.authz.decorators import authorization
-from lbz.authz.utils import check_permission, has_permission
+from lbz.authz.filters import RestrictionFilter
+from lbz.authz.utils import check_permission, check_permissions, evaluate_all, has_permission
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from jose import jwt
-
+from lbz.authz.compact import pack_claims, unpack_claims
 from lbz.exceptions import PermissionDenied
-from lbz.jwt_utils import decode_jwt
+from lbz.jwt_utils import decode_jwt, encode_jwt
 from lbz.misc import deep_update, get_logger
 
 logger = get_logger(__name__)
@@ -25,6 +24,7 @@ class Authorizer:
         resource_name: str,
         permission_name: str,
         base_permission_policy: dict | None = None,
+        claims: dict | None = None,
     ):
         self.outcome = DENY
         self.allowed_resource: str | dict | None = None
@@ -34,7 +34,7 @@ class Authorizer:
         self.refs: dict[str, dict] = {}
         self.allow: dict = {}
         self.deny: dict = {}
-        self._set_policy(auth_jwt, base_permission_policy)
+        self._set_policy(auth_jwt, base_permission_policy, claims)
 
     def __repr__(self) -> str:
         return (
@@ -43,11 +43,17 @@ class Authorizer:
         )
 
     def _set_policy(
-        self, auth_jwt: str | None = None, base_permission_policy: dict | None = None
+        self,
+        auth_jwt: str | None = None,
+        base_permission_policy: dict | None = None,
+        claims: dict | None = None,
     ) -> None:
+        """Merges claims of the token, decoded unless already verified, into the base policy."""
         policy = base_permission_policy or {}
-        if auth_jwt is not None:
-            deep_update(policy, decode_jwt(auth_jwt))
+        if claims is None and auth_jwt is not None:
+            claims = decode_jwt(auth_jwt)
+        if claims is not None:
+            deep_update(policy, unpack_claims(claims))
         self.refs = policy.get("refs", {})
         try:
             self.allow = policy["allow"]
@@ -129,14 +135,18 @@ class Authorizer:
         return {"allow": self.allowed_resource, "deny": self.denied_resource}
 
     @staticmethod
-    def sign_authz(authz_data: dict, private_key_jwk: dict) -> str:
-        """Signs authorization in JWT format."""
+    def sign_authz(
+        authz_data: dict, private_key_jwk: dict, compact: bool = False, compress: bool = False
+    ) -> str:
+        """Signs authorization in JWT format, with the algorithm matching the key.
+
+        The policy can be packed into the compact format, deflated too if compress is set.
+        """
         if not isinstance(private_key_jwk, dict):
             raise ValueError("private_key_jwk must be a jwk dict")
         if "kid" not in private_key_jwk:
             raise ValueError("private_key_jwk must have the 'kid' field")
 
-        authz: str = jwt.encode(
-            authz_data, private_key_jwk, algorithm="RS256", headers={"kid": private_key_jwk["kid"]}
-        )
-        return authz
+        if compact or compress:
+            authz_data = pack_claims(authz_data, compress=compress)
+        return encode_jwt(authz_data, private_key_jwk)
@@ -0,0 +1,124 @@
+"""Compact format of authorization policies carried by tokens.
+
+Resource, permission and ref names are interned into a table of strings, identical
+restrictions are stored once and referenced by their index, e.g. policy
+
+    {"allow": {"orders": {"list": {"allow": "*"}, "get": {"allow": "*"}}}, "deny": {}}
+
+is packed into the "pol" claim as
+
+    {"v": 1, "s": ["orders", "list", "get"], "x": [{"allow": "*"}], "a": {"0": {"1": 0, "2": 0}},
+     "d": {}}
+
+which can also be deflated and base64url encoded into a string.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+from jose.utils import base64url_decode, base64url_encode
+
+from lbz.exceptions import PermissionDenied
+
+COMPACT_CLAIM = "pol"
+VERSION = 1
+# Decompressed policies are limited, so tokens cannot carry deflate bombs
+MAX_POLICY_SIZE = 1024 * 1024
+# Levels of names in the allow and deny statements, resources and their permissions
+_DEPTH = 2
+_STATEMENTS = {"allow": "a", "deny": "d"}
+
+
+class _Packer:
+    def __init__(self) -> None:
+        self.strings: dict[str, int] = {}
+        self.values: dict[str, int] = {}
+        self.value_list: list[Any] = []
+
+    def intern(self, name: str) -> str:
+        return str(self.strings.setdefault(name, len(self.strings)))
+
+    def store(self, value: Any) -> int:
+        key = json.dumps(value, sort_keys=True, separators=(",", ":"))
+        if (index := self.values.get(key)) is None:
+            index = self.values[key] = len(self.value_list)
+            self.value_list.append(value)
+        return index
+
+    def pack_tree(self, tree: Any, depth: int) -> Any:
+        if depth == 0 or not isinstance(tree, dict):
+            return self.store(tree)
+        return {
+            self.intern(name): self.pack_tree(value, depth - 1) for name, value in tree.items()
+        }
+
+
+def pack_policy(policy: dict, compress: bool = False) -> dict | str:
+    """Packs allow, deny and refs of the policy, into a deflated string if compress is set."""
+    if "allow" not in policy or "deny" not in policy:
+        raise ValueError("Policy must have allow and deny statements")
+    packer = _Packer()
+    packed: dict[str, Any] = {"v": VERSION}
+    for statement, key in _STATEMENTS.items():
+        packed[key] = packer.pack_tree(policy[statement], _DEPTH)
+    if "refs" in policy:
+        packed["r"] = packer.pack_tree(policy["refs"], 1)
+    packed["s"] = list(packer.strings)
+    packed["x"] = packer.value_list
+    if not compress:
+        return packed
+    data = json.dumps(packed, separators=(",", ":")).encode("utf-8")
+    compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    encoded: bytes = base64url_encode(compressor.compress(data) + compressor.flush())
+    return encoded.decode("ascii")
+
+
+def unpack_policy(packed: dict | str) -> dict:
+    """Restores allow, deny and refs out of the packed policy."""
+    try:
+        return _unpack(_inflate(packed) if isinstance(packed, str) else packed)
+    except (TypeError, ValueError, KeyError, IndexError, AttributeError, zlib.error) as error:
+        raise PermissionDenied("Invalid policy in the authorization token") from error
+
+
+def pack_claims(claims: dict, compress: bool = False) -> dict:
+    """Replaces the policy in the claims with the compact one."""
+    packed = {key: value for key, value in claims.items() if key not in ("allow", "deny", "refs")}
+    packed[COMPACT_CLAIM] = pack_policy(claims, compress=compress)
+    return packed
+
+
+def unpack_claims(claims: dict) -> dict:
+    """Restores the policy in the claims, which are returned as they are when it is not packed."""
+    if COMPACT_CLAIM not in claims:
+        return claims
+    unpacked = {key: value for key, value in claims.items() if key != COMPACT_CLAIM}
+    unpacked.update(unpack_policy(claims[COMPACT_CLAIM]))
+    return unpacked
+
+
+def _inflate(packed: str) -> Any:
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    data = decompressor.decompress(base64url_decode(packed.encode("ascii")), MAX_POLICY_SIZE)
+    if decompressor.unconsumed_tail:
+        raise ValueError("Compact policy is too large")
+    return json.loads(data)
+
+
+def _unpack(packed: dict) -> dict:
+    if packed["v"] != VERSION:
+        raise ValueError(f"Unsupported version of the compact policy: {packed['v']}")
+    strings, values = packed["s"], packed["x"]
+
+    def unpack_tree(tree: Any) -> Any:
+        if isinstance(tree, int):
+            return values[tree]
+        return {strings[int(name)]: unpack_tree(value) for name, value in tree.items()}
+
+    policy = {statement: unpack_tree(packed[key]) for statement, key in _STATEMENTS.items()}
+    if "r" in packed:
+        policy["refs"] = unpack_tree(packed["r"])
+    return policy
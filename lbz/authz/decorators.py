@@ -7,6 +7,7 @@ from typing import Concatenate, ParamSpec, TypeVar
 from lbz.authz.utils import check_permission
 from lbz.collector import authz_collector
 from lbz.resource import Resource
+from lbz.router import PERMISSION_ATTR
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -31,6 +32,7 @@ def authorization(permission_name: str | None = None) -> Callable[
             kwargs["restrictions"] = check_permission(self, permission_name or function.__name__)
             return function(self, *args, **kwargs)
 
+        setattr(wrapped, PERMISSION_ATTR, permission_name or function.__name__)
         return wrapped
 
     return decorator
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+from typing import Any
+
+from lbz.authz.authorizer import ALL
+from lbz.misc import FrozenSequence
+
+SELF = "self"
+_MISSING = object()
+
+Condition = tuple[str, "frozenset[Hashable] | None"]
+
+
+class RestrictionFilter:
+    """Predicate of records matching restrictions granted by authorization.
+
+    Restrictions are compiled once into value sets per field. A record passes when every field
+    of the allow restriction matches and not every field of the deny restriction does. Values
+    are single or lists, "*" matches any value and "self" stands for self_value, e.g. the id
+    of the requester. A whole "self" restriction is the same as {owner_field: "self"}.
+    """
+
+    def __init__(
+        self,
+        restrictions: Mapping[str, Any],
+        self_value: Hashable = None,
+        owner_field: str | None = None,
+    ):
+        self.restrictions = restrictions
+        self.self_value = self_value
+        self.owner_field = owner_field
+        self._allow = self._compile(restrictions.get("allow"))
+        self._deny = self._compile(restrictions.get("deny"))
+        self._predicate = self._build_predicate()
+
+    def __repr__(self) -> str:
+        return f"<RestrictionFilter restrictions={self.restrictions!r}>"
+
+    def __call__(self, record: Mapping[str, Any]) -> bool:
+        return self._predicate(record)
+
+    @property
+    def allows_all(self) -> bool:
+        """Whether every record passes, so results do not have to be filtered at all."""
+        return not self._allow and self._deny is None
+
+    def filter(self, records: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        """Lazily yields records matching restrictions."""
+        if self.allows_all:
+            return iter(records)
+        predicate = self._predicate
+        return (record for record in records if predicate(record))
+
+    def filter_list(self, records: list[dict]) -> list[dict]:
+        """Returns a new list of records matching restrictions."""
+        if self.allows_all:
+            return list(records)
+        predicate = self._predicate
+        return [record for record in records if predicate(record)]
+
+    def _compile(self, restriction: str | Mapping[str, Any] | None) -> list[Condition] | None:
+        """Compiles restriction into conditions of fields, None stands for no restriction.
+
+        "*" compiles to no conditions, which every record matches.
+        """
+        if not restriction:
+            return None
+        if restriction == ALL:
+            return []
+        if restriction == SELF:
+            if self.owner_field is None:
+                raise ValueError("owner_field is required to filter by 'self' restriction")
+            restriction = {self.owner_field: SELF}
+        if not isinstance(restriction, Mapping):
+            raise ValueError(f"Unsupported restriction: {restriction!r}")
+        return [(field, self._compile_values(values)) for field, values in restriction.items()]
+
+    def _compile_values(self, values: Any) -> frozenset[Hashable] | None:
+        values = (
+            values
+            if isinstance(values, (list, tuple, set, frozenset, FrozenSequence))
+            else [values]
+        )
+        if ALL in values:
+            return None
+        if SELF in values and self.self_value is None:
+            raise ValueError("self_value is required to filter by 'self' restriction")
+        return frozenset(self.self_value if value == SELF else value for value in values)
+
+    def _build_predicate(self) -> Callable[[Mapping[str, Any]], bool]:
+        allow = self._allow or []
+        deny = self._deny
+
+        def predicate(record: Mapping[str, Any]) -> bool:
+            if not all(_matches(record, field, values) for field, values in allow):
+                return False
+            return deny is None or not all(
+                _matches(record, field, values) for field, values in deny
+            )
+
+        return predicate
+
+
+def _matches(record: Mapping[str, Any], field: str, values: frozenset[Hashable] | None) -> bool:
+    if (value := record.get(field, _MISSING)) is _MISSING:
+        return False
+    try:
+        return values is None or value in values
+    except TypeError:  # unhashable values of the record never match
+        return False
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator, Mapping
+from copy import deepcopy
+from hashlib import sha256
+from typing import Any, NamedTuple
+
+from lbz._cfg import AUTHZ_CACHE_SIZE
+from lbz.authz.authorizer import ALLOW, DENY, LIMITED_ALLOW, Authorizer
+from lbz.authz.compact import unpack_claims
+from lbz.exceptions import PermissionDenied
+from lbz.misc import LRUCache, deep_update, freeze, get_logger
+
+logger = get_logger(__name__)
+
+# Stands for any resource or permission which is not named in the policy
+UNNAMED = "\x00"
+UNNAMED_KEY = (UNNAMED, UNNAMED)
+
+
+class Decision(NamedTuple):
+    """Outcome of a permission check, one of ALLOW, LIMITED_ALLOW or DENY, with restrictions.
+
+    Restrictions are read-only (FrozenMapping), so decisions are shared by all checks.
+    """
+
+    outcome: int
+    restrictions: Mapping[str, Any] | None
+
+    @property
+    def allowed(self) -> bool:
+        return self.outcome in (ALLOW, LIMITED_ALLOW)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the decision in a form which can be dumped into a JSON response."""
+        return {
+            "allowed": self.allowed,
+            "outcome": self.outcome,
+            "restrictions": self.restrictions,
+        }
+
+
+class CompiledPolicy:
+    """Decision table of a merged policy, keyed by (resource, permission).
+
+    Resources and permissions which are not named in the policy share the entries of wildcards,
+    so a check is a dictionary lookup. Each entry is decided by Authorizer when it is checked
+    for the first time, so decisions, and errors of malformed entries, are always the same.
+    """
+
+    def __init__(self, policy: dict):
+        if "allow" not in policy or "deny" not in policy:
+            raise PermissionDenied("Invalid policy in the authorization token")
+        self._policy = policy
+        self._named = set(self._get_named(policy))
+        self._decisions: dict[tuple[str, str], Decision] = {}
+
+    def __repr__(self) -> str:
+        return f"<CompiledPolicy entries={len(self._named)} decided={len(self._decisions)}>"
+
+    @classmethod
+    def merge(cls, guest_policy: dict, claims: dict | None) -> CompiledPolicy:
+        """Compiles the guest policy updated with the claims of the token, like Authorizer."""
+        policy = deepcopy(guest_policy)
+        if claims is not None:
+            deep_update(policy, unpack_claims(claims))
+        return cls(policy)
+
+    def check(self, resource: str, permission: str) -> Mapping[str, Any]:
+        """Returns restrictions of the permission on the resource, raises if it is not granted."""
+        if (restrictions := self.evaluate(resource, permission).restrictions) is None:
+            logger.debug("You don't have permission to %s on %s", permission, resource)
+            raise PermissionDenied()
+        return restrictions
+
+    def evaluate(self, resource: str, permission: str) -> Decision:
+        """Returns the decision on the permission on the resource, does not raise if denied."""
+        if (key := (resource, permission)) not in self._named:
+            key = (resource, UNNAMED) if (resource, UNNAMED) in self._named else UNNAMED_KEY
+        try:
+            decision = self._decisions[key]
+        except KeyError:
+            decision = self._decisions[key] = self._decide(*key)
+        return decision
+
+    def is_allowed(self, resource: str, permission: str) -> bool:
+        try:
+            self.check(resource, permission)
+        except PermissionDenied:
+            return False
+        return True
+
+    @staticmethod
+    def _get_named(policy: dict) -> Iterator[tuple[str, str]]:
+        yield UNNAMED_KEY
+        statements = [s for s in (policy["allow"], policy["deny"]) if isinstance(s, dict)]
+        for resource in {resource for statement in statements for resource in statement}:
+            yield resource, UNNAMED
+            for statement in statements:
+                if isinstance(permissions := statement.get(resource), dict):
+                    yield from ((resource, permission) for permission in permissions)
+
+    def _decide(self, resource: str, permission: str) -> Decision:
+        authorizer = Authorizer(None, resource, permission, base_permission_policy=self._policy)
+        try:
+            authorizer.check_access()
+        except PermissionDenied:
+            return Decision(DENY, None)
+        return Decision(authorizer.outcome, freeze(authorizer.restrictions))
+
+
+class CompiledPoliciesCache:
+    """Compiled policies kept between invocations of a warm Lambda container.
+
+    Policies are keyed by the hash of the token and the guest policy merged with its claims,
+    the token itself still has to be verified before its policy is used.
+    """
+
+    def __init__(self) -> None:
+        self._cache: LRUCache[tuple[bytes | None, str], CompiledPolicy] = LRUCache(maxsize=0)
+        self._size: int | None = None
+
+    def __repr__(self) -> str:
+        return f"<CompiledPoliciesCache {self._cache!r}>"
+
+    def get(
+        self,
+        token: str | None,
+        claims: dict | None,
+        guest_policy: dict,
+        guest_key: str | None = None,
+    ) -> CompiledPolicy:
+        """Returns the compiled policy, guest_key is the dumped guest policy if already known."""
+        if self._size != AUTHZ_CACHE_SIZE.value:
+            self._size = AUTHZ_CACHE_SIZE.value
+            self._cache = LRUCache(maxsize=self._size)
+        token_hash = sha256(token.encode("utf-8")).digest() if token is not None else None
+        key = (token_hash, guest_key if guest_key is not None else dump_guest_policy(guest_policy))
+        if (policy := self._cache.get(key)) is None:
+            policy = CompiledPolicy.merge(guest_policy, claims)
+            self._cache.set(key, policy)
+        return policy
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def dump_guest_policy(guest_policy: dict) -> str:
+    """Dumps the guest policy into a part of keys of compiled policies."""
+    return json.dumps(guest_policy, sort_keys=True, default=str)
+
+
+compiled_policies = CompiledPoliciesCache()
@@ -1,26 +1,41 @@
-from lbz.authz.authorizer import Authorizer
+from collections.abc import Iterable, Mapping
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from lbz.authz.policy import CompiledPolicy, Decision, compiled_policies, dump_guest_policy
 from lbz.exceptions import PermissionDenied, Unauthorized
 from lbz.resource import Resource
 
+# Guest policies of resources handling requests, dumped into cache keys once per request
+_guest_policies: WeakKeyDictionary[Resource, tuple[dict, str]] = WeakKeyDictionary()
 
-def check_permission(resource: Resource, permission_name: str) -> dict:
-    """Check if requester has sufficient permissions to do something on specific resource.
 
-    Raises if not.
-    """
-    base_permission_policy = resource.get_guest_authorization()
+def get_compiled_policy(resource: Resource) -> CompiledPolicy:
+    """Returns the policy of the requester, merged with the guest one, verifying the token."""
+    if (guest := _guest_policies.get(resource)) is None:
+        guest_policy = resource.get_guest_authorization()
+        guest = _guest_policies[resource] = (guest_policy, dump_guest_policy(guest_policy))
+    base_permission_policy, guest_key = guest
     if (authorization_header := resource.request.headers.get("Authorization")) is None:
         if not base_permission_policy:
             raise Unauthorized("Authorization header missing or empty")
 
-    authorizer = Authorizer(
-        auth_jwt=authorization_header,
-        resource_name=resource.get_name(),
-        permission_name=permission_name,
-        base_permission_policy=base_permission_policy,
+    # the token is verified on every check, even though its compiled policy might be cached
+    claims = (
+        resource.request.get_verified_claims(authorization_header)
+        if authorization_header is not None
+        else None
     )
-    authorizer.check_access()
-    return authorizer.restrictions
+    return compiled_policies.get(authorization_header, claims, base_permission_policy, guest_key)
+
+
+def check_permission(resource: Resource, permission_name: str) -> Mapping[str, Any]:
+    """Check if requester has sufficient permissions to do something on specific resource.
+
+    Raises if not, otherwise returns read-only restrictions. Policies are compiled once
+    per token and guest policy.
+    """
+    return get_compiled_policy(resource).check(resource.get_name(), permission_name)
 
 
 def has_permission(resource: Resource, permission_name: str) -> bool:
@@ -33,3 +48,28 @@ def has_permission(resource: Resource, permission_name: str) -> bool:
     except (Unauthorized, PermissionDenied):
         return False
     return True
+
+
+def check_permissions(resource: Resource, permission_names: Iterable[str]) -> dict[str, Decision]:
+    """Decides on many permissions on the resource at once, e.g. to show which actions are allowed.
+
+    Denied permissions do not raise, the token is verified once for all of them.
+    """
+    policy = get_compiled_policy(resource)
+    return {name: policy.evaluate(resource.get_name(), name) for name in permission_names}
+
+
+def evaluate_all(
+    resource: Resource, permissions: Mapping[str, Iterable[str]] | None = None
+) -> dict[str, dict[str, Decision]]:
+    """Decides on permissions of many resources at once, keyed by resource and permission names.
+
+    Defaults to all permissions the handlers of the resource are authorized with.
+    """
+    if permissions is None:
+        permissions = {resource.get_name(): resource.get_permission_names()}
+    policy = get_compiled_policy(resource)
+    return {
+        resource_name: {name: policy.evaluate(resource_name, name) for name in names}
+        for resource_name, names in permissions.items()
+    }
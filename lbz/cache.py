@@ -0,0 +1,106 @@
+"""In-memory cache of responses, kept between invocations of a warm Lambda container."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from functools import wraps
+from hashlib import sha256
+from http import HTTPStatus
+from typing import Any, Concatenate, ParamSpec, TypeVar
+
+from lbz.authz.filters import SELF
+from lbz.json_codec import json_default
+from lbz.misc import FrozenSequence, LRUCache
+from lbz.resource import Resource
+from lbz.response import Response
+from lbz.router import PERMISSION_ATTR
+
+P = ParamSpec("P")
+S = TypeVar("S", bound=Resource)
+
+CACHE_ATTR = "_lbz_response_cache"
+CACHEABLE_METHODS = ("GET",)
+
+
+def get_response_cache(handler: Callable[..., Any]) -> LRUCache[Hashable, Response]:
+    """Returns the cache of the handler decorated with cache_response, e.g. to read its stats."""
+    cache: LRUCache[Hashable, Response] = getattr(handler, CACHE_ATTR)
+    return cache
+
+
+def _make_key(
+    resource: Resource, kwargs: dict[str, Any], vary_headers: tuple[str, ...], per_user: bool
+) -> Hashable:
+    request = resource.request
+    # restrictions of "self" stand for a different requester each, so do their responses
+    per_user = per_user or _mentions_self(kwargs.get("restrictions"))
+    return (
+        resource.urn,
+        tuple(sorted((k, tuple(v)) for k, v in request.query_params.original_items())),
+        tuple(request.headers.get(header) for header in vary_headers),
+        _get_requester(resource) if per_user else None,
+        # covers path params and restrictions granted by authorization
+        json.dumps(kwargs, sort_keys=True, default=json_default),
+    )
+
+
+def _get_requester(resource: Resource) -> str | None:
+    """Returns the username of the requester, or the hash of the token if it has none."""
+    if username := getattr(resource.request.user, "username", None):
+        return str(username)
+    if (token := resource.request.headers.get("Authorization")) is not None:
+        return sha256(token.encode("utf-8")).hexdigest()
+    return None
+
+
+def _mentions_self(restrictions: Any) -> bool:
+    if isinstance(restrictions, Mapping):
+        return any(_mentions_self(value) for value in restrictions.values())
+    if isinstance(restrictions, (list, tuple, FrozenSequence)):
+        return any(_mentions_self(value) for value in restrictions)
+    return bool(restrictions == SELF)
+
+
+def cache_response(
+    ttl: float,
+    maxsize: int = 128,
+    vary_headers: Iterable[str] = (),
+    per_user: bool = False,
+) -> Callable[
+    [Callable[Concatenate[S, P], Response]],
+    Callable[Concatenate[S, P], Response],
+]:
+    """Caches successful responses of a GET handler for ttl seconds.
+
+    Responses are keyed by the path, query params, values of vary_headers, restrictions granted
+    by authorization and, with per_user or restrictions of "self", the username (the hash of
+    the token of requesters without one). The decorator has to be placed below
+    `authorization`, so permissions are still checked before a cached response is returned.
+    """
+    vary_headers = tuple(vary_headers)
+
+    def decorator(
+        function: Callable[Concatenate[S, P], Response],
+    ) -> Callable[Concatenate[S, P], Response]:
+        if hasattr(function, PERMISSION_ATTR):
+            raise ValueError(f"cache_response must be placed below authorization: {function}")
+        cache: LRUCache[Hashable, Response] = LRUCache(maxsize=maxsize, ttl=ttl)
+
+        @wraps(function)
+        def wrapped(self: S, *args: P.args, **kwargs: P.kwargs) -> Response:
+            if self.method not in CACHEABLE_METHODS:
+                return function(self, *args, **kwargs)
+            key = _make_key(self, kwargs, vary_headers, per_user)
+            if (response := cache.get(key)) is None:
+                response = function(self, *args, **kwargs)
+                if response.status_code != HTTPStatus.OK:
+                    return response
+                cache.set(key, response.copy())
+                return response
+            return response.copy()
+
+        setattr(wrapped, CACHE_ATTR, cache)
+        return wrapped
+
+    return decorator
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable, Iterable
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Any, NamedTuple
+
+GZIP = "gzip"
+BROTLI = "br"
+ZSTD = "zstd"
+IDENTITY = "identity"
+
+# zlib window accepting both gzip and zlib headers
+_GZIP_WBITS = zlib.MAX_WBITS | 32
+# zstd blocks expand to 128 KiB at most and take at least 4 bytes, so a byte expands 32 KiB times
+_ZSTD_MAX_EXPANSION = 32 * 1024
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _gzip_decompress(data: bytes, max_size: int) -> bytes:
+    decompressed = bytearray()
+    while True:  # members of the gzip file are decompressed one after another
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        decompressed += decompressor.decompress(data, max_size - len(decompressed) + 1)
+        if not decompressor.eof or len(decompressed) > max_size:
+            raise ValueError("Compressed data is truncated or exceeds the size limit")
+        if not (data := decompressor.unused_data):
+            return bytes(decompressed)
+
+
+def _brotli_compress(data: bytes) -> bytes:
+    compressed: bytes = import_module("brotli").compress(data, quality=5)
+    return compressed
+
+
+def _brotli_decompress(data: bytes, max_size: int) -> bytes:
+    decompressor = import_module("brotli").Decompressor()
+    decompressed: bytes = decompressor.process(data, output_buffer_limit=max_size + 1)
+    if not decompressor.is_finished():
+        raise ValueError("Compressed data is truncated or exceeds the size limit")
+    return decompressed
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    compressed: bytes = import_module("zstandard").ZstdCompressor(level=3).compress(data)
+    return compressed
+
+
+def _zstd_decompress(data: bytes, max_size: int) -> bytes:
+    decompressor: Any = import_module("zstandard").ZstdDecompressor()
+    decompressed = bytearray()
+    while True:  # frames are decompressed one after another
+        stream = decompressor.decompressobj()
+        position = 0
+        while not stream.eof and position < len(data):
+            # the output of a few bytes at a time cannot exceed the size limit by much
+            step = max((max_size - len(decompressed)) // _ZSTD_MAX_EXPANSION, 1)
+            decompressed += stream.decompress(data[position : position + step])
+            position += step
+            if len(decompressed) > max_size:
+                raise ValueError("Compressed data exceeds the size limit")
+        if not stream.eof:
+            raise ValueError("Compressed data is truncated")
+        if not (data := stream.unused_data + data[position:]):
+            return bytes(decompressed)
+
+
+class Codec(NamedTuple):
+    module: str | None  # optional dependency required by the codec
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes, int], bytes]
+
+
+# Supported encodings, the best ones first
+CODECS: dict[str, Codec] = {
+    BROTLI: Codec("brotli", _brotli_compress, _brotli_decompress),
+    ZSTD: Codec("zstandard", _zstd_compress, _zstd_decompress),
+    GZIP: Codec(None, _gzip_compress, _gzip_decompress),
+}
+
+
+def get_available_encodings() -> tuple[str, ...]:
+    """Lists encodings which can be used in the current environment, the best ones first."""
+    return tuple(
+        encoding
+        for encoding, codec in CODECS.items()
+        if codec.module is None or find_spec(codec.module) is not None
+    )
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """Parses the Accept-Encoding header into encodings and their quality values."""
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        encoding, *params = (part.strip() for part in item.split(";"))
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[encoding.lower()] = quality
+    return qualities
+
+
+def negotiate(accept_encoding: str | None, encodings: Iterable[str]) -> str | None:
+    """Picks the encoding accepted by the client with the highest quality.
+
+    Encodings are given in the order of preference, which settles ties between qualities.
+    None is returned when the response should not be compressed.
+    """
+    if not accept_encoding:
+        return None
+    qualities = parse_accept_encoding(accept_encoding)
+    default_quality = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        if (quality := qualities.get(encoding, default_quality)) > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return CODECS[encoding].compress(data)
+
+
+def decompress(data: bytes, encoding: str, max_size: int) -> bytes:
+    """Decompresses data, raising ValueError when it is invalid or larger than max_size."""
+    if (encoding := encoding.lower()) not in get_available_encodings():
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    try:
+        decompressed = CODECS[encoding].decompress(data, max_size)
+    except ValueError:
+        raise
+    except Exception as error:
+        raise ValueError(f"Invalid {encoding} data") from error
+    if len(decompressed) > max_size:
+        raise ValueError(f"Decompressed data exceeds the size limit of {max_size} bytes")
+    return decompressed
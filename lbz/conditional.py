@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+WEAK_PREFIX = "W/"
+
+
+def compute_etag(data: bytes, weak: bool = False) -> str:
+    """Computes ETag of the serialized representation."""
+    etag = f'"{blake2b(data, digest_size=16).hexdigest()}"'
+    return WEAK_PREFIX + etag if weak else etag
+
+
+def quote_etag(etag: str) -> str:
+    """Quotes the opaque tag given by the handler, unless it is quoted already."""
+    if etag.startswith((WEAK_PREFIX, '"')):
+        return etag
+    return f'"{etag}"'
+
+
+def weaken_etag(etag: str) -> str:
+    return etag if etag.startswith(WEAK_PREFIX) else WEAK_PREFIX + etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Checks If-None-Match against ETag using the weak comparison (RFC 9110, 13.1.2)."""
+    candidates = {
+        candidate.strip().removeprefix(WEAK_PREFIX) for candidate in if_none_match.split(",")
+    }
+    return "*" in candidates or etag.removeprefix(WEAK_PREFIX) in candidates
+
+
+def format_http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def is_not_modified(
+    request_headers: Mapping[str, str], etag: str | None, last_modified: str | None
+) -> bool:
+    """Evaluates conditional headers of a GET or HEAD request against the current validators.
+
+    If-Modified-Since is only taken into account when If-None-Match is not sent.
+    """
+    if (if_none_match := request_headers.get("If-None-Match")) is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    since, modified = parse_http_date(if_modified_since), parse_http_date(last_modified)
+    return since is not None and modified is not None and modified <= since
@@ -17,6 +17,10 @@ class ConfigParser:
     def split_by_comma(value: str) -> list[str]:
         return value.split(",")
 
+    @staticmethod
+    def split_by_comma_into_set(value: str) -> frozenset[str]:
+        return frozenset(value.split(","))
+
     @staticmethod
     def cast_to_bool(value: str) -> bool:
         if value.lower() in ("true", "1"):
@@ -6,6 +6,7 @@ from abc import ABCMeta, abstractmethod
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from threading import Thread
 
+from lbz import json_codec
 from lbz.misc import get_logger
 from lbz.resource import Resource
 from lbz.rest import APIGatewayEvent
@@ -23,7 +24,7 @@ class MyLambdaDevHandler(BaseHTTPRequestHandler, metaclass=ABCMeta):
     def cls(self) -> type[Resource]:
         pass
 
-    def _get_route_params(self, org_path: str) -> tuple[str | None, dict | None]:  # noqa:C901
+    def _get_route_params(self, org_path: str) -> tuple[str | None, dict | None]:
         """Parses route and params.
 
         :param org_path:
@@ -32,28 +33,9 @@ class MyLambdaDevHandler(BaseHTTPRequestHandler, metaclass=ABCMeta):
         router = self.cls._router  # pylint: disable=protected-access
         if org_path in router:
             return org_path, None
-        if org_path.find("?") != -1:
-            org_path = org_path[: org_path.find("?")]
-        path = org_path.split("/")
-        path.remove("")
-        for org_route in router:
-            if org_route == "/":
-                continue
-            route = org_route.split("/")
-            route.remove("")
-            if len(path) == len(route):
-                acc = 0
-                params = {}
-                for i, route_part in enumerate(route):
-                    if route_part.startswith("{"):
-                        acc += 1
-                        param = path[i]
-                        params[route_part.strip("{").strip("}")] = param
-                    if route_part == path[i]:
-                        acc += 1
-                if len(path) == acc:
-                    return org_route, params
-        return None, None
+        if (resolved := router.resolve(org_path.split("?", 1)[0])) is None:
+            return None, None
+        return resolved
 
     def _send_json(self, code: int, obj: dict, headers: dict | None = None) -> None:
         # Make sure only one response is sent
@@ -68,7 +50,8 @@ class MyLambdaDevHandler(BaseHTTPRequestHandler, metaclass=ABCMeta):
         self.end_headers()
 
         self.done = True
-        self.wfile.write(json.dumps(obj, indent=4, sort_keys=True).encode("utf-8"))
+        dumped = json.dumps(obj, indent=4, sort_keys=True, default=json_codec.json_default)
+        self.wfile.write(dumped.encode("utf-8"))
 
     def _error(self, code: int, message: str) -> None:
         content_type = "application/json;charset=UTF-8"
@@ -85,7 +68,7 @@ class MyLambdaDevHandler(BaseHTTPRequestHandler, metaclass=ABCMeta):
                 request_body = self.rfile.read(request_size).decode(
                     encoding="utf_8", errors="strict"
                 )
-                request_obj = json.loads(request_body)
+                request_obj = json_codec.loads(request_body)
             else:
                 request_obj = {}
             parsed_url = urllib.parse.urlparse(self.path)
@@ -109,7 +92,7 @@ class MyLambdaDevHandler(BaseHTTPRequestHandler, metaclass=ABCMeta):
             response_as_dict = response.to_dict()
             resp_headers = response_as_dict.get("headers", {})
             if body := response_as_dict.get("body"):
-                response_as_dict = json.loads(body)
+                response_as_dict = json_codec.loads(body)
             else:
                 response_as_dict = {}
             self._send_json(code, response_as_dict, resp_headers)
@@ -6,7 +6,10 @@ from lbz.rest import APIGatewayEvent
 
 
 class Client:
-    """Client created for testing purposes."""
+    """Client created for testing purposes.
+
+    Accepts both route templates (with params given separately) and concrete URIs.
+    """
 
     def __init__(self, resource: type[Resource]):
         self.resource = resource
@@ -70,6 +73,9 @@ class Client:
         body: dict | None,
         headers: dict | None,
     ) -> Response:
+        router = self.resource._router  # pylint: disable=protected-access
+        if params is None and path not in router and (resolved := router.resolve(path)):
+            path, params = resolved
         return self.resource(
             APIGatewayEvent(
                 resource_path=path,
@@ -2,4 +2,5 @@ from lbz.events.api import EventAPI, event_emitter
 from lbz.events.broker import BaseEventBroker, CognitoEventBroker, EventBroker
 from lbz.events.enums import CognitoEventType
 from lbz.events.event import Event
+from lbz.events.outbox import DynamoDBOutboxStore, Outbox, SQLiteOutboxStore
 from lbz.events.protocols import EventHandler
@@ -1,17 +1,26 @@
+import random
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from functools import wraps
+from functools import partial, wraps
+from threading import Thread
 from typing import TYPE_CHECKING, ParamSpec, TypeVar
 
 from lbz._cfg import AWS_LAMBDA_FUNCTION_NAME, EVENTS_BUS_NAME
 from lbz.aws_boto3 import client
 from lbz.events.event import Event
+from lbz.events.outbox import Outbox
 from lbz.misc import Singleton, get_logger
+from lbz.type_defs import LambdaContext
 
 if TYPE_CHECKING:
-    from mypy_boto3_events.type_defs import PutEventsRequestEntryTypeDef
+    from mypy_boto3_events import EventBridgeClient
+    from mypy_boto3_events.type_defs import PutEventsRequestEntryTypeDef, PutEventsResponseTypeDef
 else:
+    EventBridgeClient = object
     PutEventsRequestEntryTypeDef = dict
+    PutEventsResponseTypeDef = dict
 
 logger = get_logger(__name__)
 
@@ -20,6 +29,17 @@ R = TypeVar("R")
 
 # https://docs.aws.amazon.com/eventbridge/latest/APIReference/API_PutEvents.html
 MAX_EVENTS_TO_SEND_AT_ONCE = 10
+MAX_EVENTS_SIZE_TO_SEND_AT_ONCE = 256 * 1024
+MAX_SENDING_THREADS = 8
+MAX_SEND_ATTEMPTS = 3
+# Retries are delayed by a random time up to the base doubled with every attempt
+RETRY_BASE_DELAY = 0.05
+# Sending in the background is waited for until that many seconds before the Lambda times out
+DEADLINE_MARGIN = 0.2
+# Sending in the background left by the previous invocation is waited for at most that long
+PREVIOUS_SENDING_TIMEOUT = 2.0
+
+Batch = list[tuple[int, PutEventsRequestEntryTypeDef]]
 
 
 class EventAPI(metaclass=Singleton):
@@ -30,6 +50,9 @@ class EventAPI(metaclass=Singleton):
         self._sent_events: list[Event] = []
         self._failed_events: list[Event] = []
         self._bus_name = EVENTS_BUS_NAME.value
+        self._error_handler: Callable[[Exception], None] = log_sending_error
+        self._sending_thread: Thread | None = None
+        self._outbox: Outbox | None = None
 
     def __repr__(self) -> str:
         return (
@@ -46,6 +69,14 @@ class EventAPI(metaclass=Singleton):
     def set_bus_name(self, bus_name: str) -> None:
         self._bus_name = bus_name
 
+    def set_error_handler(self, error_handler: Callable[[Exception], None]) -> None:
+        """Sets the callback of errors raised while sending events in the background."""
+        self._error_handler = error_handler
+
+    def set_outbox(self, outbox: Outbox | None) -> None:
+        """Sets the outbox keeping events which could not be sent, until a later send."""
+        self._outbox = outbox
+
     @property
     def bus_name(self) -> str:
         return self._bus_name
@@ -66,22 +97,48 @@ class EventAPI(metaclass=Singleton):
         self._pending_events.append(new_event)
 
     def send(self) -> None:
-        success = True
-        while self._pending_events:
-            events = self._pending_events[:MAX_EVENTS_TO_SEND_AT_ONCE]
-            try:
-                entries = [self._create_eb_entry(event) for event in events]
-                client.eventbridge.put_events(Entries=entries)
-                self._sent_events.extend(events)
-            except Exception as err:  # pylint: disable=broad-except
-                self._failed_events.extend(events)
-                logger.exception(err)
-                success = False
+        """Sends pending events in batches limited by count and size, concurrently.
 
-            self._pending_events = self._pending_events[MAX_EVENTS_TO_SEND_AT_ONCE:]
+        Only entries which failed are retried, events which could not be sent in the end
+        are moved to failed events and RuntimeError is raised. With an outbox set, they are
+        also saved in it, and events saved before are sent again together with pending ones.
+        """
+        events, self._pending_events = self._pending_events, []
+        self._send(events, self._sent_events, self._failed_events)
 
-        if not success:
-            raise RuntimeError("Sending events has failed. Check logs for more details!")
+    def send_in_background(self) -> None:
+        """Starts sending pending events in a thread, e.g. while the response is serialized.
+
+        It has to be joined before the Lambda returns, as a frozen Lambda sends nothing.
+        Sending started before is waited for at most PREVIOUS_SENDING_TIMEOUT seconds.
+        """
+        self.join(timeout=PREVIOUS_SENDING_TIMEOUT)
+        events, self._pending_events = self._pending_events, []
+        # events are reported in lists of the time they were taken, which clear replaces
+        self._sending_thread = Thread(
+            target=self._send_or_report,
+            args=(events, self._sent_events, self._failed_events),
+            name="lbz-events",
+            daemon=True,
+        )
+        self._sending_thread.start()
+
+    def join(self, context: LambdaContext | None = None, timeout: float | None = None) -> bool:
+        """Waits for events sent in the background, until the Lambda is about to time out.
+
+        Waits for timeout seconds at most, if given. Returns whether sending has finished.
+        """
+        if self._sending_thread is None:
+            return True
+        if context is not None:
+            remaining = max(context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN, 0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._sending_thread.join(timeout)
+        if self._sending_thread.is_alive():
+            logger.error("Sending events has not finished before the deadline")
+            return False
+        self._sending_thread = None
+        return True
 
     def clear(self) -> None:
         self.clear_sent()
@@ -97,6 +154,113 @@ class EventAPI(metaclass=Singleton):
     def clear_failed(self) -> None:
         self._failed_events = []
 
+    def _send_or_report(self, events: list[Event], sent: list[Event], failed: list[Event]) -> None:
+        try:
+            self._send(events, sent, failed)
+        except Exception as err:  # pylint: disable=broad-except
+            self._error_handler(err)
+
+    def _send(self, events: list[Event], sent: list[Event], failed_events: list[Event]) -> None:
+        """Sends events, adding them to the given lists of sent and failed events."""
+        replayed = self._take_from_outbox()
+        failed = self._put_events(replayed + events)
+        own_failed = {index - len(replayed) for index in failed if index >= len(replayed)}
+
+        sent.extend(e for i, e in enumerate(events) if i not in own_failed)
+        failed_events.extend(e for i, e in enumerate(events) if i in own_failed)
+        if self._outbox is not None:
+            self._update_outbox(self._outbox, replayed + events, failed, len(replayed))
+        if own_failed:
+            raise RuntimeError("Sending events has failed. Check logs for more details!")
+
+    def _put_events(self, events: list[Event]) -> set[int]:
+        """Sends events, returns indexes of those which could not be sent."""
+        batches, failed = self._pack([self._create_eb_entry(event) for event in events])
+        if not batches:
+            return failed
+        # the client is created here, as creating it lazily is not safe in many threads at once
+        send_batch = partial(self._send_batch, client.eventbridge)
+        if len(batches) > 1:
+            with ThreadPoolExecutor(min(len(batches), MAX_SENDING_THREADS)) as executor:
+                results = list(executor.map(send_batch, batches))
+        else:
+            results = [send_batch(batches[0])]
+        failed.update(index for batch_failed in results for index in batch_failed)
+        return failed
+
+    def _take_from_outbox(self) -> list[Event]:
+        if self._outbox is None:
+            return []
+        try:
+            return self._outbox.take()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Reading events from the outbox has failed")
+            return []
+
+    @staticmethod
+    def _update_outbox(
+        outbox: Outbox, events: list[Event], failed: set[int], replayed: int
+    ) -> None:
+        """Deletes replayed events which were sent and saves new ones which were not.
+
+        Replayed events which were not sent stay in the outbox as they are, so they keep aging.
+        """
+        try:
+            outbox.delete(e for i, e in enumerate(events[:replayed]) if i not in failed)
+            outbox.save(e for i, e in enumerate(events[replayed:], replayed) if i in failed)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Updating the outbox of events has failed")
+
+    @staticmethod
+    def _pack(entries: list[PutEventsRequestEntryTypeDef]) -> tuple[list[Batch], set[int]]:
+        """Packs entries in order into batches, returns them and entries too big to be sent."""
+        batches: list[Batch] = []
+        too_big: set[int] = set()
+        batch: Batch = []
+        batch_size = 0
+        for index, entry in enumerate(entries):
+            if (size := get_entry_size(entry)) > MAX_EVENTS_SIZE_TO_SEND_AT_ONCE:
+                logger.error("Event %s is too big to be sent: %d bytes", entry["DetailType"], size)
+                too_big.add(index)
+                continue
+            if (
+                len(batch) == MAX_EVENTS_TO_SEND_AT_ONCE
+                or batch_size + size > MAX_EVENTS_SIZE_TO_SEND_AT_ONCE
+            ):
+                batches.append(batch)
+                batch, batch_size = [], 0
+            batch.append((index, entry))
+            batch_size += size
+        if batch:
+            batches.append(batch)
+        return batches, too_big
+
+    def _send_batch(self, eventbridge: EventBridgeClient, batch: Batch) -> list[int]:
+        """Sends the batch retrying failed entries, returns indexes of those never sent."""
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            if attempt:
+                # jitter spreads retries of concurrent batches and Lambdas throttled together
+                time.sleep(random.uniform(0, RETRY_BASE_DELAY * 2**attempt))  # nosec B311
+            try:
+                response = eventbridge.put_events(Entries=[entry for _, entry in batch])
+            except Exception as err:  # pylint: disable=broad-except
+                if attempt == MAX_SEND_ATTEMPTS - 1:
+                    logger.exception(err)
+                continue
+            if not (batch := self._get_failed(batch, response)):
+                return []
+        return [index for index, _ in batch]
+
+    @staticmethod
+    def _get_failed(batch: Batch, response: PutEventsResponseTypeDef) -> Batch:
+        if not response.get("FailedEntryCount"):
+            return []
+        results = response["Entries"]
+        failed = [item for item, result in zip(batch, results) if result.get("ErrorCode")]
+        errors = {result["ErrorCode"] for result in results if result.get("ErrorCode")}
+        logger.warning("Failed sending %d events, errors: %s", len(failed), errors)
+        return failed
+
     def _create_eb_entry(self, new_event: Event) -> PutEventsRequestEntryTypeDef:
         return {
             "Detail": new_event.serialized_data,
@@ -107,6 +271,17 @@ class EventAPI(metaclass=Singleton):
         }
 
 
+def log_sending_error(error: Exception) -> None:
+    logger.error("Sending events in the background has failed: %r", error)
+
+
+def get_entry_size(entry: PutEventsRequestEntryTypeDef) -> int:
+    """Calculates the size of the entry the way PutEvents does it."""
+    size = len(entry["Source"].encode("utf-8")) + len(entry["DetailType"].encode("utf-8"))
+    size += len(entry["Detail"].encode("utf-8"))
+    return size + sum(len(resource.encode("utf-8")) for resource in entry["Resources"])
+
+
 def event_emitter(function: Callable[P, R]) -> Callable[P, R]:
     """Decorator that makes function an emitter - automatically sends pending events on success"""
     EventAPI().clear()
@@ -11,6 +11,9 @@ logger = get_logger(__name__)
 
 
 class BaseEventBroker(BaseBroker[None]):
+    # Handlers get the same frozen event instead of deep copies of it, so they cannot change it
+    frozen_events: bool = False
+
     def __init__(
         self,
         mapper: Mapping[str, list[EventHandler]],
@@ -22,7 +25,12 @@ class BaseEventBroker(BaseBroker[None]):
     ) -> None:
         super().__init__(event, context)
         self.mapper = mapper
-        self.event = Event(event[data_key], event_type=event[type_key])
+        self.event = Event(
+            event[data_key],
+            event_type=event[type_key],
+            event_id=event.get("id"),
+            frozen=self.frozen_events,
+        )
 
     @property
     def handlers(self) -> list[EventHandler]:
@@ -34,7 +42,7 @@ class BaseEventBroker(BaseBroker[None]):
     def handle(self) -> None:
         for handler in self.handlers:
             try:
-                handler(deepcopy(self.event))
+                handler(self.event if self.event.frozen else deepcopy(self.event))
             except Exception as error:  # pylint: disable=broad-except
                 self.on_error(error)
 
@@ -65,5 +73,5 @@ class CognitoEventBroker(BaseEventBroker):
         event: dict,
         context: LambdaContext,
     ) -> None:
+        event["request"]["userName"] = event["userName"]
         super().__init__(mapper, event, context, type_key="triggerSource", data_key="request")
-        self.event.data["userName"] = event["userName"]
@@ -1,28 +1,91 @@
 from __future__ import annotations
 
-import json
+from copy import copy, deepcopy
+from typing import Any
+from uuid import uuid4
 
+from lbz import json_codec
+from lbz.misc import FrozenMapping
+
+
+class Event:
+    """Event with its data, sent by EventAPI or handled by brokers.
+
+    Data of frozen events is exposed through read-only views (FrozenMapping, FrozenSequence)
+    over the original data, which must not be changed anymore, so frozen events are hashable,
+    serialize their data once and are shared instead of deep-copied.
+    """
+
+    __slots__ = ("type", "id", "frozen", "_data", "_serialized", "_hash")
 
-# TODO: Implement the hash method to stay compatible with pylint requirements
-class Event:  # pylint: disable=eq-without-hash
     type: str
 
-    def __init__(self, data: dict, *, event_type: str | None = None) -> None:
-        self.data = data
-        self.type = event_type or self.type
+    def __init__(
+        self,
+        data: dict | FrozenMapping,
+        *,
+        event_type: str | None = None,
+        event_id: str | None = None,
+        frozen: bool = False,
+    ) -> None:
+        if event_type:
+            self.type = event_type
+        # identifies the event in the outbox, so it is stored and replayed once
+        self.id = event_id or uuid4().hex
+        self.frozen = frozen
+        # data forwarded from a frozen event is copied, so this event owns its data
+        self._data = data.thaw() if isinstance(data, FrozenMapping) else data
+        self._serialized: str | None = None
+        self._hash: int | None = None
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Event):
-            return self.type == other.type and self.data == other.data
+            return self.type == other.type and self._data == other._data
         return False
 
+    def __hash__(self) -> int:
+        if not self.frozen:
+            raise TypeError(f"unhashable mutable event: {self.type}")
+        if self._hash is None:
+            self._hash = hash((self.type, FrozenMapping(self._data)))
+        return self._hash
+
     def __repr__(self) -> str:
-        return f"Event(type='{self.type}', data={self.data})"
+        return f"Event(type='{self.type}', data={self._data})"
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Event:
+        if self.frozen:
+            return self
+        event = copy(self)
+        event._data = deepcopy(self._data, memo)
+        return event
+
+    @property
+    def data(self) -> Any:
+        """Data of the event, a dict or a read-only FrozenMapping if the event is frozen."""
+        if self.frozen:
+            return FrozenMapping(self._data)
+        return self._data
+
+    @data.setter
+    def data(self, data: dict) -> None:
+        if self.frozen:
+            raise TypeError(f"Data of the frozen event {self.type} cannot be changed")
+        self._data = data
+
+    def freeze(self) -> Event:
+        """Makes data of the event read-only from now on, returns the event itself."""
+        self.frozen = True
+        return self
 
     @staticmethod
     def serialize(data: dict) -> str:
-        return json.dumps(data, default=str)
+        return json_codec.dumps(data, compact=False)
 
     @property
     def serialized_data(self) -> str:
-        return self.serialize(self.data)
+        if not self.frozen:
+            return self.serialize(self._data)
+        if self._serialized is None:
+            self._serialized = self.serialize(self._data)
+        return self._serialized
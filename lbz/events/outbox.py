@@ -0,0 +1,223 @@
+"""Outbox keeping events which could not be sent, so later invocations send them again.
+
+Events are stored by their ids, so storing one many times keeps a single copy
+and each of them is replayed until it is sent, then removed from the store.
+Events which could not be sent for max_age seconds, e.g. too big ones, are dropped.
+
+Ids are not sent to EventBridge, which has no field for them, so delivery is at least once:
+an event sent without its response being received is sent again. Consumers which must not
+handle an event twice have to deduplicate it by their own key in its data.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Protocol
+
+from lbz import json_codec
+from lbz.aws_boto3 import client
+from lbz.events.event import Event
+from lbz.misc import get_logger
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.type_defs import WriteRequestUnionTypeDef
+else:
+    WriteRequestUnionTypeDef = dict
+
+logger = get_logger(__name__)
+
+DEFAULT_SQLITE_PATH = "/tmp/lbz-outbox.sqlite3"  # nosec B108
+REPLAY_LIMIT = 100
+# Events are dropped after that many seconds in the outbox
+MAX_AGE = 24 * 60 * 60
+# Store is read again after that many seconds, as other containers may have saved events in it
+CHECK_INTERVAL = 60
+# https://docs.aws.amazon.com/amazondynamodb/latest/APIReference/API_BatchWriteItem.html
+MAX_ITEMS_TO_WRITE_AT_ONCE = 25
+MAX_WRITE_ATTEMPTS = 3
+
+
+class OutboxStore(Protocol):
+    def put(self, events: Sequence[Event]) -> None:
+        """Stores events, each id once."""
+
+    def get(self, limit: int) -> list[Event]:
+        """Returns at most limit stored events, the oldest first, dropping expired ones."""
+
+    def delete(self, event_ids: list[str]) -> None:
+        """Removes events with the ids, if they are stored."""
+
+
+class SQLiteOutboxStore:
+    """Stores events in a SQLite file, by default in /tmp of the Lambda container.
+
+    Such events survive invocations of the container, but not its recycling.
+    """
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, max_age: float = MAX_AGE) -> None:
+        self.path = path
+        self.max_age = max_age
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS outbox "
+                "(id TEXT PRIMARY KEY, type TEXT NOT NULL, data TEXT NOT NULL, created_at REAL)"
+            )
+
+    def __repr__(self) -> str:
+        return f"<SQLiteOutboxStore path={self.path}>"
+
+    def put(self, events: Sequence[Event]) -> None:
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO outbox VALUES (?, ?, ?, ?)",
+                [(e.id, e.type, e.serialized_data, time.time()) for e in events],
+            )
+
+    def get(self, limit: int) -> list[Event]:
+        with self._connect() as connection:
+            expired = connection.execute(
+                "SELECT id FROM outbox WHERE created_at < ?", (time.time() - self.max_age,)
+            ).fetchall()
+            connection.executemany("DELETE FROM outbox WHERE id = ?", expired)
+            rows = connection.execute(
+                "SELECT id, type, data FROM outbox ORDER BY created_at LIMIT ?", (limit,)
+            ).fetchall()
+        log_expired([event_id for (event_id,) in expired])
+        return [load_event(event_id, event_type, data) for event_id, event_type, data in rows]
+
+    def delete(self, event_ids: list[str]) -> None:
+        with self._connect() as connection:
+            connection.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(event_id,) for event_id in event_ids]
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # a connection per operation, as events may be sent from a background thread
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+class DynamoDBOutboxStore:
+    """Stores events in a DynamoDB table with the "id" (string) partition key.
+
+    Such events survive recycling of Lambda containers and are replayed by any of them.
+    Scanned items are not ordered, so events are the oldest first only among those returned
+    by a scan limited to the replay limit, not among all stored ones.
+    """
+
+    def __init__(self, table_name: str, max_age: float = MAX_AGE) -> None:
+        self.table_name = table_name
+        self.max_age = max_age
+
+    def __repr__(self) -> str:
+        return f"<DynamoDBOutboxStore table={self.table_name}>"
+
+    def put(self, events: Sequence[Event]) -> None:
+        self._write(
+            [
+                {
+                    "PutRequest": {
+                        "Item": {
+                            "id": {"S": event.id},
+                            "type": {"S": event.type},
+                            "data": {"S": event.serialized_data},
+                            "created_at": {"N": str(time.time())},
+                        }
+                    }
+                }
+                for event in events
+            ]
+        )
+
+    def get(self, limit: int) -> list[Event]:
+        items = client.dynamodb.scan(TableName=self.table_name, Limit=limit)["Items"]
+        items.sort(key=lambda item: float(item["created_at"]["N"]))
+        expires_at = time.time() - self.max_age
+        if expired := [i["id"]["S"] for i in items if float(i["created_at"]["N"]) < expires_at]:
+            self.delete(expired)
+            log_expired(expired)
+        return [
+            load_event(item["id"]["S"], item["type"]["S"], item["data"]["S"])
+            for item in items
+            if item["id"]["S"] not in expired
+        ]
+
+    def delete(self, event_ids: list[str]) -> None:
+        self._write(
+            [{"DeleteRequest": {"Key": {"id": {"S": event_id}}}} for event_id in event_ids]
+        )
+
+    def _write(self, requests: list[WriteRequestUnionTypeDef]) -> None:
+        """Writes requests in batches, retrying those which DynamoDB has not processed."""
+        for start in range(0, len(requests), MAX_ITEMS_TO_WRITE_AT_ONCE):
+            chunk: Sequence[WriteRequestUnionTypeDef] = requests[
+                start : start + MAX_ITEMS_TO_WRITE_AT_ONCE
+            ]
+            for _ in range(MAX_WRITE_ATTEMPTS):
+                response = client.dynamodb.batch_write_item(RequestItems={self.table_name: chunk})
+                if not (chunk := response.get("UnprocessedItems", {}).get(self.table_name, [])):
+                    break
+            else:
+                raise RuntimeError(f"Writing {len(chunk)} items to {self.table_name} has failed")
+
+
+def load_event(event_id: str, event_type: str, data: str) -> Event:
+    return Event(json_codec.loads(data), event_type=event_type, event_id=event_id)
+
+
+def log_expired(event_ids: list[str]) -> None:
+    if event_ids:
+        logger.error("Dropped %d expired events from the outbox: %s", len(event_ids), event_ids)
+
+
+class Outbox:
+    """Events which could not be sent, replayed in limited numbers by EventAPI.send.
+
+    The store is read again only when the last read returned events, events were put in it
+    or check_interval seconds have passed, which is when events saved by other containers
+    in a shared store are found. So invocations with nothing to replay rarely query it.
+    """
+
+    def __init__(
+        self,
+        store: OutboxStore | None = None,
+        replay_limit: int = REPLAY_LIMIT,
+        check_interval: float = CHECK_INTERVAL,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.store = store if store is not None else SQLiteOutboxStore()
+        self.replay_limit = replay_limit
+        self.check_interval = check_interval
+        self._timer = timer
+        self._may_have_events = True
+        self._checked_at = 0.0
+
+    def __repr__(self) -> str:
+        return f"<Outbox store={self.store!r}>"
+
+    def save(self, events: Iterable[Event]) -> None:
+        if events := list(events):
+            self.store.put(events)
+            self._may_have_events = True
+            logger.warning("Saved %d events in the outbox", len(events))
+
+    def take(self) -> list[Event]:
+        """Returns events to replay, which stay in the outbox until they are deleted."""
+        if not self._may_have_events and self._timer() - self._checked_at < self.check_interval:
+            return []
+        self._checked_at = self._timer()
+        events = self.store.get(self.replay_limit)
+        self._may_have_events = bool(events)
+        return events
+
+    def delete(self, events: Iterable[Event]) -> None:
+        if event_ids := [event.id for event in events]:
+            self.store.delete(event_ids)
@@ -58,6 +58,18 @@ class LambdaFWServerException(LambdaFWException):
     """500 - 599 Exceptions for easier distinguishably when developing"""
 
 
+class NotModified(LambdaFWException):
+    """304 - Document has not changed since given time"""
+
+    message = HTTPStatus.NOT_MODIFIED.description
+    status_code = HTTPStatus.NOT_MODIFIED.value
+
+    def __init__(self, headers: dict[str, str] | None = None) -> None:
+        super().__init__()
+        # Validators (ETag, Last-Modified) sent back with the 304 response
+        self.headers = headers or {}
+
+
 class BadRequestError(LambdaFWClientException):
     """400 - Bad request syntax or unsupported method"""
 
@@ -105,8 +117,9 @@ class UnsupportedMethod(LambdaFWClientException):
 
     status_code = HTTPStatus.METHOD_NOT_ALLOWED.value
 
-    def __init__(self, method: str) -> None:
+    def __init__(self, method: str, allowed_methods: list[str] | None = None) -> None:
         super().__init__(message=f"Unsupported method: {method}")
+        self.allowed_methods = allowed_methods or []
 
 
 class NotAcceptable(LambdaFWClientException):
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Any
+from uuid import UUID
+
+from lbz._cfg import JSON_CODEC
+from lbz.misc import FrozenMapping, FrozenSequence, get_logger
+
+logger = get_logger(__name__)
+
+AUTO = "auto"
+
+
+def json_default(obj: Any) -> Any:
+    """Converts objects which are not natively supported by JSON encoders.
+
+    Decimals are dumped as strings to keep their precision, read-only views of frozen data
+    as the viewed dicts and lists. Objects of unknown types fall back to their string
+    representation as they did before codecs were introduced.
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (FrozenMapping, FrozenSequence)):
+        return obj.thaw()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def _decimals_to_str(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (dict, FrozenMapping)):
+        return {key: _decimals_to_str(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, FrozenSequence)):
+        return [_decimals_to_str(item) for item in obj]
+    return obj
+
+
+class JSONCodec:
+    """Codec based on the standard library, used by default."""
+
+    name = "json"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
+
+    def dumps(self, obj: Any, compact: bool = True) -> str:
+        if compact:
+            return json.dumps(obj, separators=(",", ":"), default=json_default)
+        return json.dumps(obj, default=json_default)
+
+    def dumpb(self, obj: Any, compact: bool = True) -> bytes:
+        return self.dumps(obj, compact=compact).encode("utf-8")
+
+    def loads(self, payload: str | bytes) -> Any:
+        return json.loads(payload)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec based on orjson, output is always compact."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._orjson = import_module(self.name)
+        self._option = self._orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, compact: bool = True) -> str:
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj: Any, compact: bool = True) -> bytes:
+        dumped: bytes = self._orjson.dumps(obj, default=json_default, option=self._option)
+        return dumped
+
+    def loads(self, payload: str | bytes) -> Any:
+        return self._orjson.loads(payload)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec based on ujson.
+
+    ujson dumps Decimals as numbers without calling the default hook, so they are replaced
+    with strings beforehand, which copies containers of the dumped object.
+    """
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        self._ujson = import_module(self.name)
+
+    def dumps(self, obj: Any, compact: bool = True) -> str:
+        dumped: str = self._ujson.dumps(
+            _decimals_to_str(obj), default=json_default, ensure_ascii=False
+        )
+        return dumped
+
+    def loads(self, payload: str | bytes) -> Any:
+        return self._ujson.loads(payload)
+
+
+class MsgspecCodec(JSONCodec):
+    """Codec based on msgspec, output is always compact."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        self._msgspec = import_module(self.name)
+        self._encoder = self._msgspec.json.Encoder(enc_hook=json_default)
+        self._decoder = self._msgspec.json.Decoder()
+
+    def dumps(self, obj: Any, compact: bool = True) -> str:
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj: Any, compact: bool = True) -> bytes:
+        dumped: bytes = self._encoder.encode(obj)
+        return dumped
+
+    def loads(self, payload: str | bytes) -> Any:
+        try:
+            return self._decoder.decode(payload)
+        except self._msgspec.DecodeError as error:
+            raise ValueError(str(error)) from error
+
+
+# Order in which installed codecs are picked when JSON_CODEC is set to "auto"
+CODECS: dict[str, type[JSONCodec]] = {
+    codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, UjsonCodec, JSONCodec)
+}
+_instances: dict[str, JSONCodec] = {}
+
+
+def get_codec() -> JSONCodec:
+    """Returns the codec chosen with the JSON_CODEC setting.
+
+    Errors raised while decoding are always instances of ValueError, regardless of the codec.
+    """
+    if (name := JSON_CODEC.value) == AUTO:
+        name = next(name for name in CODECS if name == JSONCodec.name or find_spec(name))
+    if (codec := _instances.get(name)) is None:
+        if name not in CODECS:
+            raise ValueError(f"Unsupported JSON codec: {name}")
+        codec = _instances[name] = CODECS[name]()
+        logger.debug("Using %s JSON codec", name)
+    return codec
+
+
+def dumps(obj: Any, compact: bool = True) -> str:
+    return get_codec().dumps(obj, compact=compact)
+
+
+def dumpb(obj: Any, compact: bool = True) -> bytes:
+    return get_codec().dumpb(obj, compact=compact)
+
+
+def loads(payload: str | bytes) -> Any:
+    return get_codec().loads(payload)
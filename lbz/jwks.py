@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from ipaddress import ip_address
+from threading import Lock, Thread
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+from lbz._cfg import JWKS_MIN_REFETCH_INTERVAL, JWKS_TTL, JWKS_URL
+from lbz.misc import get_logger
+
+logger = get_logger(__name__)
+
+FETCH_TIMEOUT = 5
+
+
+class JWKSource:
+    """Public keys published under a JWKS URL, e.g. .well-known/jwks.json of a Cognito user pool.
+
+    Keys are kept for ttl seconds, then the stale ones are still served while fresh ones are
+    fetched in a background thread, which a frozen Lambda container finishes when thawed.
+    Attempts to fetch keys are made at most once per min_refetch_interval seconds, so tokens
+    signed with unknown keys cannot flood the endpoint.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 3600,
+        min_refetch_interval: float = 60,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        if not is_secure_url(url):
+            raise ValueError(f"Unsupported JWKS URL: {url}")
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self._timer = timer
+        self._keys: list[dict] = []
+        self._fetched_at: float | None = None
+        self._attempted_at: float | None = None
+        self._lock = Lock()
+        self._refresh_thread: Thread | None = None
+
+    def __repr__(self) -> str:
+        return f"<JWKSource url={self.url} keys={len(self._keys)}>"
+
+    @property
+    def keys(self) -> list[dict]:
+        """Returns published keys, the list is replaced only when they change."""
+        if self._can_attempt():
+            if self._fetched_at is None:
+                self.refresh()
+            elif self._timer() - self._fetched_at >= self.ttl:
+                self.refresh_in_background()
+        return self._keys
+
+    def refetch(self) -> bool:
+        """Fetches keys once an unknown key id arrives, returns whether they changed."""
+        return self._can_attempt() and self.refresh()
+
+    def refresh(self) -> bool:
+        """Fetches keys right away, returns whether they changed."""
+        with self._lock:
+            self._attempted_at = self._timer()
+            try:
+                keys = self._fetch()
+            except (OSError, TypeError, ValueError, KeyError) as error:
+                logger.warning("Failed fetching JWKS from %s: %r", self.url, error)
+                return False
+            self._fetched_at = self._timer()
+            if keys == self._keys:
+                return False
+            self._keys = keys
+            logger.info("Loaded %d public keys from %s", len(keys), self.url)
+            return True
+
+    def refresh_in_background(self) -> None:
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._attempted_at = self._timer()
+        self._refresh_thread = Thread(target=self.refresh, name="lbz-jwks-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Waits for the background refresh, if there is any."""
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+
+    def _can_attempt(self) -> bool:
+        return (
+            self._attempted_at is None
+            or self._timer() - self._attempted_at >= self.min_refetch_interval
+        )
+
+    def _fetch(self) -> list[dict]:
+        request = Request(self.url, headers={"Accept": "application/json"})
+        # the scheme of the URL is checked when the source is created
+        with urlopen(request, timeout=FETCH_TIMEOUT) as response:  # nosec B310
+            keys = json.load(response)["keys"]
+        if not isinstance(keys, list) or not all(isinstance(key, dict) for key in keys):
+            raise TypeError("JWKS keys must be a list of objects")
+        return keys
+
+
+def is_secure_url(url: str) -> bool:
+    """Tells whether keys can be fetched from the URL: over HTTPS, or HTTP on the loopback."""
+    parsed = urlparse(url)
+    if parsed.scheme == "https":
+        return True
+    if parsed.scheme != "http" or not parsed.hostname:
+        return False
+    if parsed.hostname == "localhost":
+        return True
+    try:
+        return ip_address(parsed.hostname).is_loopback
+    except ValueError:
+        return False
+
+
+_sources: dict[str, JWKSource] = {}
+
+
+def get_jwks_source() -> JWKSource | None:
+    """Returns the source of keys published under JWKS_URL, None when it is not set."""
+    if not (url := JWKS_URL.value):
+        return None
+    if (source := _sources.get(url)) is None:
+        source = _sources[url] = JWKSource(
+            url, ttl=JWKS_TTL.value, min_refetch_interval=JWKS_MIN_REFETCH_INTERVAL.value
+        )
+    return source
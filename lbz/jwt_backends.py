@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Any
+
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+from jose.utils import base64url_decode
+
+from lbz._cfg import JWT_BACKEND
+from lbz.misc import get_logger
+
+logger = get_logger(__name__)
+
+AUTO = "auto"
+RS256 = "RS256"
+ES256 = "ES256"
+EDDSA = "EdDSA"
+
+# Algorithms of keys which do not declare their "alg", by the key type
+DEFAULT_ALGORITHMS = {"RSA": RS256, "EC": ES256, "OKP": EDDSA}
+
+
+def get_algorithm(jwk: dict) -> str:
+    """Returns the algorithm the JWK is meant for, RS256 when it cannot be told."""
+    if alg := jwk.get("alg"):
+        return str(alg)
+    return DEFAULT_ALGORITHMS.get(jwk.get("kty", ""), RS256)
+
+
+class Ed25519Key(Key):  # pylint: disable=abstract-method
+    """EdDSA key built out of an OKP JWK (RFC 8037), which jose does not support on its own.
+
+    Only signing and verification are implemented, the key cannot be used for encryption.
+    """
+
+    def __init__(self, key: dict, algorithm: str) -> None:
+        ed25519 = import_module("cryptography.hazmat.primitives.asymmetric.ed25519")
+        self._invalid_signature = import_module("cryptography.exceptions").InvalidSignature
+        if key.get("kty") != "OKP" or key.get("crv") != "Ed25519":
+            raise JWKError("Only Ed25519 keys of the OKP type are supported")
+        self._algorithm = algorithm
+        self._jwk = key
+        try:
+            if "d" in key:
+                self._private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
+                    base64url_decode(key["d"].encode("utf-8"))
+                )
+                self._public_key = self._private_key.public_key()
+            else:
+                self._private_key = None
+                self._public_key = ed25519.Ed25519PublicKey.from_public_bytes(
+                    base64url_decode(key["x"].encode("utf-8"))
+                )
+        except (KeyError, ValueError) as error:
+            raise JWKError(f"Invalid Ed25519 key: {error}") from error
+
+    def sign(self, msg: bytes) -> bytes:
+        if self._private_key is None:
+            raise JWKError("A private key is needed to sign")
+        signature: bytes = self._private_key.sign(msg)
+        return signature
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        try:
+            self._public_key.verify(sig, msg)
+        except self._invalid_signature:
+            return False
+        return True
+
+    def public_key(self) -> Ed25519Key:
+        public_jwk = {k: v for k, v in self._jwk.items() if k != "d"}
+        return Ed25519Key(public_jwk, self._algorithm)
+
+    def to_dict(self) -> dict:
+        return dict(self._jwk)
+
+
+class JoseBackend:
+    """Backend based on the pure-Python rsa and ecdsa packages installed along with jose."""
+
+    name = "jose"
+
+    def __init__(self) -> None:
+        self._key_classes = self._load_key_classes()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
+
+    @property
+    def algorithms(self) -> frozenset[str]:
+        return frozenset(self._key_classes)
+
+    def construct(self, jwk: dict, algorithm: str) -> Key:
+        """Builds the key ready to sign or verify tokens, raises JWKError if it is not valid."""
+        if (key_class := self._key_classes.get(algorithm)) is None:
+            raise JWKError(f"Unsupported algorithm: {algorithm}")
+        key: Key = key_class(jwk, algorithm)
+        return key
+
+    @staticmethod
+    def _load_key_classes() -> dict[str, Any]:
+        return {
+            RS256: import_module("jose.backends.rsa_backend").RSAKey,
+            ES256: import_module("jose.backends.ecdsa_backend").ECDSAECKey,
+        }
+
+
+class CryptographyBackend(JoseBackend):
+    """Backend based on cryptography, which is the fastest one and also supports EdDSA."""
+
+    name = "cryptography"
+
+    @staticmethod
+    def _load_key_classes() -> dict[str, Any]:
+        backend = import_module("jose.backends.cryptography_backend")
+        return {
+            RS256: backend.CryptographyRSAKey,
+            ES256: backend.CryptographyECKey,
+            EDDSA: Ed25519Key,
+        }
+
+
+# Order in which installed backends are picked when JWT_BACKEND is set to "auto"
+BACKENDS: dict[str, type[JoseBackend]] = {
+    backend.name: backend for backend in (CryptographyBackend, JoseBackend)
+}
+_instances: dict[str, JoseBackend] = {}
+
+
+def get_backend() -> JoseBackend:
+    """Returns the backend chosen with the JWT_BACKEND setting."""
+    if (name := JWT_BACKEND.value) == AUTO:
+        name = next(name for name in BACKENDS if name == JoseBackend.name or find_spec(name))
+    if (backend := _instances.get(name)) is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unsupported JWT backend: {name}")
+        backend = _instances[name] = BACKENDS[name]()
+        logger.debug("Using %s JWT backend", name)
+    return backend
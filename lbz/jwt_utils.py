@@ -1,20 +1,124 @@
+import json
+import time
+from calendar import timegm
+from copy import deepcopy
+from datetime import datetime
+from hashlib import sha256
+from typing import NamedTuple
+
 from jose import jwt
-from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+from jose.backends.base import Key
+from jose.exceptions import ExpiredSignatureError, JWKError, JWTClaimsError, JWTError
+from jose.utils import base64url_encode
 
-from lbz._cfg import ALLOWED_AUDIENCES, ALLOWED_ISS, ALLOWED_PUBLIC_KEYS
+from lbz import jwt_backends
+from lbz._cfg import (
+    ALLOWED_AUDIENCES,
+    ALLOWED_ISS,
+    ALLOWED_PUBLIC_KEYS,
+    JWKS_URL,
+    JWT_CACHE_EXPIRY_SKEW,
+    JWT_CACHE_SIZE,
+)
 from lbz.exceptions import MissingConfigValue, SecurityError, Unauthorized
-from lbz.misc import get_logger
+from lbz.jwks import get_jwks_source
+from lbz.jwt_backends import JoseBackend
+from lbz.misc import LRUCache, get_logger
+from lbz.revocation import check_not_revoked
 
 logger = get_logger(__name__)
 
 
-def get_matching_jwk(auth_jwt_token: str) -> dict:
-    """Checks provided JWT token against allowed tokens."""
+class PublicKey(NamedTuple):
+    kid: str
+    alg: str
+    jwk: dict
+    key: Key
+
+
+class KeyRegistry:
+    """Public keys from ALLOWED_PUBLIC_KEYS and JWKS_URL, parsed once and indexed by their ids.
+
+    Keys are validated while being loaded by the JWT_BACKEND, the registry is loaded again once
+    the configuration or published keys change. Invalid published keys are skipped, so a broken
+    JWKS endpoint cannot break keys from the configuration. The first key wins when a few of
+    them share the same id.
+    """
+
+    def __init__(self) -> None:
+        self._keys: dict[str, PublicKey] = {}
+        self._source: tuple | None = None
+
+    def __repr__(self) -> str:
+        return f"<KeyRegistry kids={list(self._keys)}>"
+
+    def get(self, kid: str) -> PublicKey | None:
+        self.load()
+        return self._keys.get(kid)
+
+    def load(self) -> None:
+        jwks_source = get_jwks_source()
+        source = (
+            ALLOWED_PUBLIC_KEYS.value,
+            jwks_source.keys if jwks_source else None,
+            jwt_backends.get_backend(),
+        )
+        # configuration values are compared by identity, as they are parsed again once reset
+        if self._source and all(
+            current is loaded for current, loaded in zip(source, self._source)
+        ):
+            return
+        public_keys, published_keys, backend = source
+        keys = self._parse_configured(public_keys, backend)
+        self._keys, self._source = self._parse_published(keys, published_keys, backend), source
+
+    @classmethod
+    def _parse_configured(
+        cls, public_keys: list[dict], backend: JoseBackend
+    ) -> dict[str, PublicKey]:
+        keys: dict[str, PublicKey] = {}
+        for public_key in public_keys:
+            if "kid" not in public_key:
+                raise RuntimeError("One of the provided public keys doesn't have the 'kid' field")
+            if public_key["kid"] not in keys:
+                keys[public_key["kid"]] = cls._parse(public_key, backend)
+        return keys
+
+    @classmethod
+    def _parse_published(
+        cls, keys: dict[str, PublicKey], published_keys: list[dict] | None, backend: JoseBackend
+    ) -> dict[str, PublicKey]:
+        for public_key in published_keys or ():
+            try:
+                if public_key["kid"] not in keys:
+                    keys[public_key["kid"]] = cls._parse(public_key, backend)
+            except (KeyError, RuntimeError) as error:
+                logger.warning("Skipping invalid key published under JWKS_URL: %r", error)
+        return keys
+
+    @staticmethod
+    def _parse(public_key: dict, backend: JoseBackend) -> PublicKey:
+        alg = jwt_backends.get_algorithm(public_key)
+        try:
+            key = backend.construct(public_key, alg)
+        except (JWKError, TypeError, ValueError) as error:
+            raise RuntimeError(f"The public key with id={public_key['kid']} is invalid") from error
+        return PublicKey(kid=public_key["kid"], alg=alg, jwk=public_key, key=key)
+
+
+key_registry = KeyRegistry()
+
+
+def get_matching_key(auth_jwt_token: str) -> PublicKey:
+    """Finds the allowed public key the JWT token was signed with."""
     try:
         kid_from_jwt_header = jwt.get_unverified_header(auth_jwt_token)["kid"]
-        for key in ALLOWED_PUBLIC_KEYS.value:
-            if key["kid"] == kid_from_jwt_header:
-                return key
+        if public_key := key_registry.get(kid_from_jwt_header):
+            return public_key
+        # keys might have been rotated, attempts to fetch them again are rate limited
+        if (jwks_source := get_jwks_source()) and jwks_source.refetch():
+            if public_key := key_registry.get(kid_from_jwt_header):
+                return public_key
 
         logger.warning(
             "The key with id=%s was not found in the environment variable.", kid_from_jwt_header
@@ -28,6 +132,46 @@ def get_matching_jwk(auth_jwt_token: str) -> dict:
         raise Unauthorized from error
 
 
+def encode_jwt(claims: dict, private_key_jwk: dict) -> str:
+    """Signs claims with the algorithm of the key, the id of which is put into the header."""
+    alg = jwt_backends.get_algorithm(private_key_jwk)
+    key = jwt_backends.get_backend().construct(private_key_jwk, alg)
+    header = {"alg": alg, "kid": private_key_jwk["kid"], "typ": "JWT"}
+    for claim in ("exp", "iat", "nbf"):
+        if isinstance(value := claims.get(claim), datetime):
+            claims = {**claims, claim: timegm(value.utctimetuple())}
+    signing_input = b".".join(
+        (
+            _encode_segment(json.dumps(header, separators=(",", ":"), sort_keys=True).encode()),
+            _encode_segment(json.dumps(claims, separators=(",", ":")).encode()),
+        )
+    )
+    return b".".join((signing_input, _encode_segment(key.sign(signing_input)))).decode("ascii")
+
+
+def _encode_segment(value: bytes) -> bytes:
+    encoded: bytes = base64url_encode(value)
+    return encoded
+
+
+def get_matching_jwk(auth_jwt_token: str) -> dict:
+    """Checks provided JWT token against allowed tokens."""
+    return get_matching_key(auth_jwt_token).jwk
+
+
+def validate_audience(decoded_jwt: dict) -> None:
+    """Checks the optional "aud" claim against ALLOWED_AUDIENCES, the same way jose does."""
+    if "aud" not in decoded_jwt:
+        return
+    audiences = decoded_jwt["aud"]
+    if isinstance(audiences, str):
+        audiences = [audiences]
+    if not isinstance(audiences, list) or not all(isinstance(aud, str) for aud in audiences):
+        raise JWTClaimsError("Invalid claim format in token")
+    if ALLOWED_AUDIENCES.value.isdisjoint(audiences):
+        raise JWTClaimsError("Invalid audience")
+
+
 def validate_jwt_properties(decoded_jwt: dict) -> None:
     if "exp" not in decoded_jwt:
         raise SecurityError("The auth token doesn't have the 'exp' field.")
@@ -38,35 +182,106 @@ def validate_jwt_properties(decoded_jwt: dict) -> None:
         raise Unauthorized(f"{issuer} is not an allowed token issuer")
 
 
-def decode_jwt(auth_jwt_token: str) -> dict:  # noqa:C901
-    """Decodes JWT token."""
+class VerifiedTokensCache:
+    """Claims of verified tokens kept between invocations of a warm Lambda container.
+
+    Tokens are keyed by their hash and expire JWT_CACHE_EXPIRY_SKEW seconds before their "exp".
+    All entries are dropped once the configuration used to verify them changes.
+    """
+
+    def __init__(self) -> None:
+        self._cache: LRUCache[bytes, dict] = LRUCache(maxsize=0)
+        self._config: tuple | None = None
+
+    def __repr__(self) -> str:
+        return f"<VerifiedTokensCache {self._cache!r}>"
+
+    def get(self, token: str) -> dict | None:
+        self._drop_if_config_changed()
+        if (claims := self._cache.get(self._hash(token))) is None:
+            return None
+        return deepcopy(claims)
+
+    def set(self, token: str, claims: dict) -> None:
+        ttl = claims["exp"] - JWT_CACHE_EXPIRY_SKEW.value - time.time()
+        self._cache.set(self._hash(token), deepcopy(claims), ttl=ttl)
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @staticmethod
+    def _hash(token: str) -> bytes:
+        return sha256(token.encode("utf-8")).digest()
 
-    if not ALLOWED_PUBLIC_KEYS.value:
+    def _drop_if_config_changed(self) -> None:
+        jwks_source = get_jwks_source()
+        config = (
+            ALLOWED_PUBLIC_KEYS.value,
+            jwks_source.keys if jwks_source else None,
+            ALLOWED_AUDIENCES.value,
+            ALLOWED_ISS.value,
+            JWT_CACHE_SIZE.value,
+        )
+        if self._config is None or any(
+            current is not cached for current, cached in zip(config, self._config)
+        ):
+            # configuration values are compared by identity, as they are parsed again once reset
+            self._config = config
+            self._cache = LRUCache(maxsize=JWT_CACHE_SIZE.value)
+
+
+verified_tokens_cache = VerifiedTokensCache()
+
+
+def decode_jwt(auth_jwt_token: str) -> dict:
+    """Decodes JWT token, claims of tokens verified before are taken from the cache."""
+
+    if not ALLOWED_PUBLIC_KEYS.value and not JWKS_URL.value:
         raise MissingConfigValue("ALLOWED_PUBLIC_KEYS")
 
     if not ALLOWED_AUDIENCES.value:
         raise MissingConfigValue("ALLOWED_AUDIENCES")
 
-    if any("kid" not in public_key for public_key in ALLOWED_PUBLIC_KEYS.value):
-        raise RuntimeError("One of the provided public keys doesn't have the 'kid' field")
+    key_registry.load()
 
-    jwk = get_matching_jwk(auth_jwt_token)
-    for idx, aud in enumerate(ALLOWED_AUDIENCES.value, start=1):
-        try:
-            decoded_jwt: dict = jwt.decode(auth_jwt_token, jwk, algorithms="RS256", audience=aud)
-            validate_jwt_properties(decoded_jwt)
-            return decoded_jwt
-        except JWTClaimsError as error:
-            if idx == len(ALLOWED_AUDIENCES.value):
-                logger.warning("Failed decoding JWT with any of JWK - details: %r", error)
-                raise Unauthorized() from error
-        except ExpiredSignatureError as error:
-            raise Unauthorized("Your token has expired. Please refresh it.") from error
-        except JWTError as error:
-            logger.warning("Failed decoding JWT with following details: %r", error)
-            raise Unauthorized() from error
-        except Exception as ex:
-            msg = f"An error occurred during decoding the token.\nToken body:\n{auth_jwt_token}"
-            raise RuntimeError(msg) from ex
-    logger.error("Failed decoding JWT for unknown reason.")
-    raise Unauthorized
+    # tokens of other types are left for the verification to reject
+    if isinstance(auth_jwt_token, str) and (cached := verified_tokens_cache.get(auth_jwt_token)):
+        # tokens can be revoked after they were cached
+        check_not_revoked(cached)
+        return cached
+    claims = _verify_jwt(auth_jwt_token)
+    check_not_revoked(claims)
+    verified_tokens_cache.set(auth_jwt_token, claims)
+    return claims
+
+
+def _verify_jwt(auth_jwt_token: str) -> dict:
+    public_key = get_matching_key(auth_jwt_token)
+    try:
+        # the signature is verified once, the audience is checked against all allowed ones after
+        decoded_jwt: dict = jwt.decode(
+            auth_jwt_token,
+            public_key.key,
+            algorithms=public_key.alg,
+            options={"verify_aud": False},
+        )
+        validate_audience(decoded_jwt)
+        validate_jwt_properties(decoded_jwt)
+        return decoded_jwt
+    except ExpiredSignatureError as error:
+        raise Unauthorized("Your token has expired. Please refresh it.") from error
+    except JWTClaimsError as error:
+        logger.warning("Failed decoding JWT with any of JWK - details: %r", error)
+        raise Unauthorized() from error
+    except JWTError as error:
+        logger.warning("Failed decoding JWT with following details: %r", error)
+        raise Unauthorized() from error
+    except SecurityError:
+        # tokens missing required claims are rejected as such, e.g. by the Lambda authorizer
+        raise
+    except Exception as ex:
+        msg = f"An error occurred during decoding the token.\nToken body:\n{auth_jwt_token}"
+        raise RuntimeError(msg) from ex
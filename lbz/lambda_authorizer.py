@@ -0,0 +1,121 @@
+"""Lambda authorizer verifying tokens before requests reach API Gateway integrations.
+
+Verified claims are passed in the context of the authorizer, keyed by hashes of their tokens,
+so Resources trusting the context (TRUST_AUTHORIZER_CONTEXT) do not verify tokens again.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterable
+from hashlib import sha256
+
+from multidict import CIMultiDict
+
+from lbz import json_codec
+from lbz._cfg import TRUST_AUTHORIZER_CONTEXT
+from lbz.brokers import BaseBroker
+from lbz.exceptions import SecurityError, Unauthorized
+from lbz.jwt_utils import decode_jwt
+from lbz.misc import get_logger
+from lbz.revocation import check_not_revoked
+from lbz.type_defs import LambdaContext
+
+logger = get_logger(__name__)
+
+CONTEXT_KEY = "lbz_claims"
+TOKEN_HEADERS = ("Authorization", "Authentication")
+
+
+def get_token_hash(token: str) -> str:
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+class LambdaAuthorizerBroker(BaseBroker[dict]):
+    """Responds to TOKEN and REQUEST authorizer events of REST and HTTP APIs with IAM policies.
+
+    Policies allow or deny the whole stage, so API Gateway can cache them per token and reuse
+    them for all routes. Invalid tokens, including ones without required claims, are denied,
+    which API Gateway responds with 403.
+    """
+
+    def __init__(
+        self, event: dict, context: LambdaContext, token_headers: Iterable[str] = TOKEN_HEADERS
+    ) -> None:
+        super().__init__(event, context)
+        self.token_headers = tuple(token_headers)
+
+    def handle(self) -> dict:
+        if not (tokens := self.get_tokens()):
+            logger.debug("No token to authorize the request with")
+            return self.build_policy("Deny")
+        try:
+            claims = {get_token_hash(token): decode_jwt(token) for token in tokens}
+        except (Unauthorized, SecurityError) as error:
+            logger.debug("Denying the request with an invalid token: %r", error)
+            return self.build_policy("Deny")
+        principal_id = next(
+            (c["sub"] for c in claims.values() if c.get("sub")), next(iter(claims))
+        )
+        return self.build_policy("Allow", principal_id, claims)
+
+    def pre_handle(self) -> None:
+        pass
+
+    def post_handle(self) -> None:
+        pass
+
+    def get_tokens(self) -> list[str]:
+        """Returns tokens of the TOKEN authorizer or present in headers of the REQUEST one."""
+        if self.raw_event.get("type") == "TOKEN":
+            token = self.raw_event.get("authorizationToken")
+            return [token] if token else []
+        headers = CIMultiDict(self.raw_event.get("headers") or {})
+        return [headers[header] for header in self.token_headers if headers.get(header)]
+
+    def build_policy(
+        self, effect: str, principal_id: str = "unauthorized", claims: dict | None = None
+    ) -> dict:
+        policy: dict = {
+            "principalId": principal_id,
+            "policyDocument": {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Action": "execute-api:Invoke",
+                        "Effect": effect,
+                        "Resource": self.get_stage_arn(),
+                    }
+                ],
+            },
+        }
+        if claims is not None:
+            policy["context"] = {CONTEXT_KEY: json_codec.dumps(claims)}
+        return policy
+
+    def get_stage_arn(self) -> str:
+        """Turns the ARN of the method (REST API) or route (HTTP API) into one of all of them."""
+        arn = self.raw_event.get("methodArn") or self.raw_event["routeArn"]
+        return "/".join(arn.split("/", 2)[:2] + ["*"])
+
+
+def get_trusted_claims(request_context: dict, token: str) -> dict | None:
+    """Returns claims of the token verified by LambdaAuthorizerBroker, if the context is trusted.
+
+    Claims are looked up by the hash of the token, so they are never taken for a different one,
+    and expired tokens are left to be verified, and rejected, as usual. Raises Unauthorized
+    if the token was revoked since the authorizer verified it.
+    """
+    if not TRUST_AUTHORIZER_CONTEXT.value:
+        return None
+    authorizer = request_context.get("authorizer") or {}
+    # HTTP APIs nest the context of Lambda authorizers
+    serialized = (authorizer.get("lambda") or authorizer).get(CONTEXT_KEY)
+    if not isinstance(serialized, str):
+        return None
+    claims: dict | None = json_codec.loads(serialized).get(get_token_hash(token))
+    if claims is None or claims.get("exp", math.inf) <= time.time():
+        return None
+    check_not_revoked(claims)
+    return claims
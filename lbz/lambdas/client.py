@@ -4,6 +4,7 @@ import json
 from collections.abc import Iterable
 from typing import Any, cast
 
+from lbz import json_codec
 from lbz.aws_boto3 import client
 from lbz.lambdas.enums import LambdaResult, LambdaSource
 from lbz.lambdas.exceptions import LambdaError
@@ -84,11 +85,18 @@ class LambdaClient:
             base64_encoded=response["isBase64Encoded"],
         )
 
+    @classmethod
+    def _dump_payload(cls, payload: dict) -> bytes:
+        # Custom encoders set by subclasses take precedence over the configured codec
+        if cls.json_encoder is not SetsEncoder:
+            return json.dumps(payload, cls=cls.json_encoder).encode("utf-8")
+        return json_codec.dumpb(payload, compact=False)
+
     @classmethod
     def _invoke(cls, function_name: str, payload: dict, asynchronous: bool = False) -> dict:
         raw_response = client.lambda_.invoke(
             FunctionName=function_name,
-            Payload=json.dumps(payload, cls=cls.json_encoder).encode("utf-8"),
+            Payload=cls._dump_payload(payload),
             InvocationType="Event" if asynchronous else "RequestResponse",
         )
 
@@ -97,7 +105,7 @@ class LambdaClient:
             return {"result": LambdaResult.ACCEPTED}
 
         try:
-            response: dict = json.loads(raw_response["Payload"].read().decode("utf-8"))
+            response: dict = json_codec.loads(raw_response["Payload"].read())
             return response
         except Exception:
             # f-string used directly to keep messages unique from a monitoring/tracking perspective
@@ -43,7 +43,7 @@ class LambdaSource:
     @classmethod
     def get_source(cls, event: dict) -> str:
         # FYI: AWS is very inconsistent in its way to provide the source information
-        if event.get("httpMethod") is not None:
+        if event.get("httpMethod") is not None or "http" in event.get("requestContext", {}):
             return cls.API_GW
         if event.get("invoke_type") == cls.DIRECT:
             return cls.DIRECT
@@ -3,16 +3,28 @@ from __future__ import annotations
 import copy
 import logging
 import logging.handlers
+import time
 import warnings
-from collections.abc import Callable, Hashable, Iterable, Iterator, MutableMapping
+from collections import OrderedDict
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
 from functools import wraps
-from typing import Any, ParamSpec, TypeVar
+from threading import Lock
+from typing import Any, Generic, ParamSpec, TypeVar, overload
 
 from lbz._cfg import LOGGING_LEVEL
 
 T = TypeVar("T")
 P = ParamSpec("P")
 R = TypeVar("R")
+K = TypeVar("K", bound=Hashable)
 
 
 class NestedDict(dict):
@@ -88,6 +100,166 @@ class MultiDict(MutableMapping):
         return [(key, values) for key, values in self._dict.items() if key not in keys_to_skip]
 
 
+class LRUCache(Generic[K, T]):
+    """Size-bounded cache evicting the least recently used entries.
+
+    Entries expire after the TTL given per entry or for the whole cache (never, if none).
+    Lookups are counted, which makes the efficiency of the cache observable.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._entries: OrderedDict[K, tuple[float | None, T]] = OrderedDict()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<LRUCache size={len(self)}/{self.maxsize} hits={self.hits} misses={self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def get(self, key: K, default: T | None = None) -> T | None:
+        with self._lock:
+            if (entry := self._get_entry(key)) is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: K, value: T, ttl: float | None = None) -> None:
+        if (ttl := self.ttl if ttl is None else ttl) is not None and ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (None if ttl is None else self._timer() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> T | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+    def _get_entry(self, key: K) -> tuple[float | None, T] | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        if entry[0] is not None and entry[0] <= self._timer():
+            del self._entries[key]
+            return None
+        return entry
+
+
+class FrozenMapping(Mapping[str, Any]):
+    """Read-only view of a dict, nested dicts and lists are viewed the same way."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return freeze(self._data[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        return bool(self._data == (other._data if isinstance(other, FrozenMapping) else other))
+
+    def __hash__(self) -> int:
+        return hash(_to_hashable(self._data))
+
+    def __repr__(self) -> str:
+        return f"FrozenMapping({self._data!r})"
+
+    def thaw(self) -> dict:
+        """Returns a mutable deep copy of the viewed dict."""
+        return copy.deepcopy(self._data)
+
+
+class FrozenSequence(Sequence[Any]):
+    """Read-only view of a list, nested dicts and lists are viewed the same way."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: list) -> None:
+        self._data = data
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> FrozenSequence: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return FrozenSequence(self._data[index])
+        return freeze(self._data[index])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        return bool(self._data == (other._data if isinstance(other, FrozenSequence) else other))
+
+    def __hash__(self) -> int:
+        return hash(_to_hashable(self._data))
+
+    def __repr__(self) -> str:
+        return f"FrozenSequence({self._data!r})"
+
+    def thaw(self) -> list:
+        """Returns a mutable deep copy of the viewed list."""
+        return copy.deepcopy(self._data)
+
+
+def freeze(value: Any) -> Any:
+    """Returns a read-only view of a dict or a list, other values are returned as they are."""
+    if isinstance(value, dict):
+        return FrozenMapping(value)
+    if isinstance(value, list):
+        return FrozenSequence(value)
+    return value
+
+
+def _to_hashable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return frozenset((key, _to_hashable(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_to_hashable(item) for item in value)
+    return value
+
+
 def get_logger(name: str) -> logging.Logger:
     """Shortcut for creating logger instance."""
     logger_obj = logging.getLogger(name)
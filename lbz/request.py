@@ -1,47 +1,133 @@
 from __future__ import annotations
 
 import base64
-import json
+from collections.abc import Mapping
 from typing import Any
+from urllib.parse import parse_qs
 
 from multidict import CIMultiDict
 
+from lbz import compression, json_codec
+from lbz._cfg import DECOMPRESSION_MAX_SIZE
 from lbz.authentication import User
-from lbz.exceptions import BadRequestError
+from lbz.exceptions import BadRequestError, UnsupportedMediaType
+from lbz.jwt_utils import decode_jwt
+from lbz.lambda_authorizer import get_trusted_claims
 from lbz.misc import MultiDict
 from lbz.rest import ContentType
 
 
 class Request:
-    """Represents request from API gateway."""
+    """Represents request from API gateway.
+
+    The request wraps fields of the event as they are, headers are made case-insensitive
+    and query params are parsed only when they are accessed for the first time.
+    """
+
+    __slots__ = (
+        "uri_params",
+        "method",
+        "context",
+        "stage_vars",
+        "user",
+        "_headers",
+        "_query_params",
+        "_query_string",
+        "_is_base64_encoded",
+        "_cookies",
+        "_body",
+        "_json_body",
+        "_raw_body",
+        "_claims",
+    )
 
     def __init__(
         self,
-        headers: CIMultiDict,
+        headers: Mapping[str, str] | None,
         uri_params: dict,
         method: str,
-        body: str | bytes | dict,
+        body: str | bytes | dict | None,
         context: dict,
         stage_vars: dict,
         is_base64_encoded: bool,
         query_params: dict | None = None,
         user: User | None = None,
+        cookies: list[str] | None = None,
+        query_string: str | None = None,
     ):
-        self.query_params = MultiDict(query_params or {})
-        self.headers = headers
+        self._headers = headers
+        self._query_params: MultiDict | dict | None = query_params
+        self._query_string = query_string
         self.uri_params = uri_params
         self.method = method
         self.context = context
         self.stage_vars = stage_vars
         self.user = user
         self._is_base64_encoded = is_base64_encoded
+        self._cookies = cookies
         self._body = body
         self._json_body: dict | None = None
         self._raw_body: bytes | dict | None = None
+        self._claims: dict[str, dict] = {}
 
     def __repr__(self) -> str:
         return f"<Request {self.method} >"
 
+    @property
+    def headers(self) -> CIMultiDict:
+        if not isinstance(self._headers, CIMultiDict):
+            self._headers = CIMultiDict(self._headers or {})
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: Mapping[str, str] | None) -> None:
+        self._headers = headers
+
+    def get_header(self, name: str) -> str | None:
+        """Returns the first value of the header, without wrapping all headers when not needed."""
+        if isinstance(self._headers, CIMultiDict):
+            return self._headers.get(name)
+        if not self._headers:
+            return None
+        name = name.lower()
+        for header, value in self._headers.items():
+            if len(header) == len(name) and header.lower() == name:
+                return value
+        return None
+
+    @property
+    def query_params(self) -> MultiDict:
+        if not isinstance(self._query_params, MultiDict):
+            raw_query_params = self._query_params
+            if raw_query_params is None and self._query_string:
+                raw_query_params = parse_qs(self._query_string, keep_blank_values=True)
+            self._query_params = MultiDict(raw_query_params or {})
+        return self._query_params
+
+    @query_params.setter
+    def query_params(self, query_params: MultiDict | dict | None) -> None:
+        self._query_params = query_params
+        self._query_string = None
+
+    def get_verified_claims(self, token: str) -> dict:
+        """Verifies the JWT token once per request and returns its claims.
+
+        Claims are shared by all users of the token, so they must not be modified. Claims
+        already verified by LambdaAuthorizerBroker are taken when TRUST_AUTHORIZER_CONTEXT is set.
+        """
+        if (claims := self._claims.get(token)) is None:
+            claims = get_trusted_claims(self.context or {}, token) or decode_jwt(token)
+            self._claims[token] = claims
+        return claims
+
+    @property
+    def cookies(self) -> list[str]:
+        """Cookies sent with the request, in the "name=value" format."""
+        if self._cookies is None:
+            cookie_header: str = self.headers.get("Cookie", "")
+            self._cookies = [cookie for cookie in cookie_header.split("; ") if cookie]
+        return self._cookies
+
     @staticmethod
     def _decode_base64(encoded: str | bytes) -> bytes:
         if not isinstance(encoded, bytes):
@@ -57,12 +143,26 @@ class Request:
                 self._raw_body = self._body.encode("utf-8")
             else:
                 self._raw_body = self._body
+            if isinstance(self._raw_body, bytes):
+                self._raw_body = self._decompress(self._raw_body)
         return self._raw_body
 
+    def _decompress(self, raw_body: bytes) -> bytes:
+        """Decompresses the body according to its Content-Encoding header."""
+        encoding = self.headers.get("Content-Encoding", compression.IDENTITY).strip().lower()
+        if encoding == compression.IDENTITY:
+            return raw_body
+        if encoding not in compression.get_available_encodings():
+            raise UnsupportedMediaType(f"Content-Encoding is not supported: {encoding}")
+        try:
+            return compression.decompress(raw_body, encoding, DECOMPRESSION_MAX_SIZE.value)
+        except ValueError as error:
+            raise BadRequestError(f"Invalid payload.\n{error}") from error
+
     @staticmethod
     def _safe_json_loads(payload: str | bytes) -> Any:
         try:
-            return json.loads(payload)
+            return json_codec.loads(payload)
         except ValueError as error:
             raise BadRequestError(f"Invalid payload.\nPayload body:\n {repr(payload)}") from error
 
@@ -82,9 +182,12 @@ class Request:
         return self._json_body
 
     def to_dict(self) -> dict:
-        copied = {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
-        copied["headers"] = dict(copied["headers"])
-        copied["user"] = repr(copied["user"])
-        if copied["query_params"] is not None:
-            copied["query_params"] = dict(copied["query_params"])
-        return copied
+        return {
+            "query_params": dict(self.query_params),
+            "headers": dict(self.headers),
+            "uri_params": self.uri_params,
+            "method": self.method,
+            "context": self.context,
+            "stage_vars": self.stage_vars,
+            "user": repr(self.user),
+        }
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Callable
 from copy import deepcopy
+from datetime import datetime
 from http import HTTPStatus
+from typing import Any
 from urllib.parse import urlencode
 
-from multidict import CIMultiDict
-
-from lbz._cfg import ALLOWED_PUBLIC_KEYS, CORS_HEADERS, CORS_ORIGIN
+from lbz import conditional
+from lbz._cfg import ALLOWED_PUBLIC_KEYS, CORS_HEADERS, CORS_ORIGIN, JWKS_URL
 from lbz.authentication import User
 from lbz.collector import authz_collector
-from lbz.events.api import EventAPI
+from lbz.events.api import PREVIOUS_SENDING_TIMEOUT, EventAPI
 from lbz.exceptions import (
     LambdaFWClientException,
     LambdaFWServerException,
-    NotFound,
+    NotModified,
     ServerError,
     Unauthorized,
     UnsupportedMethod,
@@ -22,10 +22,14 @@ from lbz.exceptions import (
 from lbz.misc import get_logger
 from lbz.request import Request
 from lbz.response import Response
-from lbz.rest import ContentType
+from lbz.rest import ContentType, PayloadFormat
 from lbz.router import Router
 
 ALLOW_ORIGIN_HEADER = "Access-Control-Allow-Origin"
+# Route used by Lambda Function URLs and the catch-all route of HTTP APIs
+DEFAULT_ROUTE_KEY = "$default"
+# Methods for which If-None-Match and If-Modified-Since are evaluated
+CONDITIONAL_METHODS = ("GET", "HEAD")
 
 logger = get_logger(__name__)
 
@@ -34,19 +38,44 @@ class Resource:
     _name: str = ""
     _router = Router()
     _authz_collector = authz_collector
+    # Encodings responses are compressed with (best first), compression is disabled when empty
+    compression: tuple[str, ...] = ()
+    # Responses smaller than that are not compressed, defaults to COMPRESSION_MIN_SIZE
+    compression_min_size: int | None = None
+    # ETag computed out of the dumped body is added to successful GET and HEAD responses
+    auto_etag: bool = False
+    weak_etag: bool = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._router = Router.collect(cls)
 
     @classmethod
     def get_name(cls) -> str:
         return cls._name or cls.__name__.lower()
 
+    @classmethod
+    def get_permission_names(cls) -> list[str]:
+        """Lists names of permissions the handlers of the resource are authorized with."""
+        return cls._router.get_permissions()
+
     def __init__(self, event: dict):
+        if PayloadFormat.get_format(event) == PayloadFormat.HTTP_API:
+            self._load_http_api_event(event)
+        else:
+            self._load_rest_api_event(event)
+        self._authz_collector.set_resource(self.get_name())
+        self._authz_collector.set_guest_permissions(self.get_guest_authorization())
+        self.response: Response = None  # type: ignore
+        self._validators: dict[str, str] = {}
+
+    def _load_rest_api_event(self, event: dict) -> None:
         self.urn = event["path"]  # TODO: Variables should match corresponding event fields
         self.path = event.get("requestContext", {}).get("resourcePath")
         self.path_params = event.get("pathParameters") or {}  # DO NOT refactor
         self.method = event["requestContext"]["httpMethod"]
-        headers: CIMultiDict = CIMultiDict(event.get("headers", {}))
         self.request = Request(
-            headers=headers,
+            headers=event.get("headers"),
             uri_params=self.path_params,
             method=self.method,
             body=event["body"],
@@ -55,21 +84,43 @@ class Resource:
             is_base64_encoded=event.get("isBase64Encoded", False),
             query_params=event["multiValueQueryStringParameters"],
         )
-        self._authz_collector.set_resource(self.get_name())
-        self._authz_collector.set_guest_permissions(self.get_guest_authorization())
-        self.response: Response = None  # type: ignore
+
+    def _load_http_api_event(self, event: dict) -> None:
+        context = event["requestContext"]
+        self.urn = event["rawPath"]
+        self.method = context["http"]["method"]
+        self.path_params = event.get("pathParameters") or {}
+        if (route_key := event.get("routeKey", DEFAULT_ROUTE_KEY)) != DEFAULT_ROUTE_KEY:
+            self.path = route_key.split(" ", 1)[-1]
+        elif resolved := self._router.resolve(self.urn):
+            self.path, self.path_params = resolved
+        else:
+            self.path = None
+        self.request = Request(
+            headers=event.get("headers"),
+            uri_params=self.path_params,
+            method=self.method,
+            body=event.get("body"),
+            context=context,
+            stage_vars=event.get("stageVariables") or {},
+            is_base64_encoded=event.get("isBase64Encoded", False),
+            query_string=event.get("rawQueryString"),
+            cookies=event.get("cookies"),
+        )
 
     def __call__(self) -> Response:
         try:
             self.pre_request_hook()
 
-            if self.path is None or self.path not in self._router:
-                raise NotFound(f"Nothing matches the given URI: {self.path}")
-            if self.method not in self._router[self.path]:
-                raise UnsupportedMethod(method=self.method)
-            self.request.user = self._get_user(self.request.headers)
-            endpoint: Callable = getattr(self, self._router[self.path][self.method])
-            self.response = endpoint(**self.path_params)
+            endpoint = self._router.get_endpoint(self.path, self.method)
+            self.request.user = self._get_user()
+            self.response = endpoint.handler(self, **self.path_params)
+        except NotModified as err:
+            self.response = Response.not_modified(err.headers)
+        except UnsupportedMethod as err:
+            logger.debug(err, exc_info=True)
+            self.response = Response.from_exception(err, self.request.context["requestId"])
+            self.response.headers["Allow"] = ", ".join(err.allowed_methods)
         except LambdaFWClientException as err:
             logger.debug(err, exc_info=True)
             self.response = Response.from_exception(err, self.request.context["requestId"])
@@ -81,20 +132,65 @@ class Resource:
             self.response = Response.from_exception(
                 ServerError(), self.request.context["requestId"]
             )
+        self._evaluate_conditional_request()
+        self._compress_response()
         self._post_request_hook()
         return self.response
 
     def __repr__(self) -> str:
         return f"<Resource {self.method} @ {self.urn} >"
 
-    def _get_user(self, headers: CIMultiDict) -> User | None:
-        authentication = headers.get("Authentication")
-        if authentication and ALLOWED_PUBLIC_KEYS.value:
-            return User(authentication)
+    def _get_user(self) -> User | None:
+        authentication = self.request.get_header("Authentication")
+        if authentication and (ALLOWED_PUBLIC_KEYS.value or JWKS_URL.value):
+            return User(authentication, claims=self.request.get_verified_claims(authentication))
         if authentication:
             raise Unauthorized("Authentication method not supported")
         return None
 
+    def check_not_modified(
+        self, etag: str | None = None, last_modified: datetime | None = None
+    ) -> None:
+        """Ends a conditional request early, based on a cheap version of the resource.
+
+        Meant to be called by handlers before doing expensive work. Raises NotModified, responded
+        with 304, if the client already has that version, otherwise the validators are added
+        to the response of the handler.
+        """
+        if etag is not None:
+            self._validators["ETag"] = conditional.quote_etag(etag)
+        if last_modified is not None:
+            self._validators["Last-Modified"] = conditional.format_http_date(last_modified)
+        if self.method in CONDITIONAL_METHODS and conditional.is_not_modified(
+            self.request.headers,
+            self._validators.get("ETag"),
+            self._validators.get("Last-Modified"),
+        ):
+            raise NotModified(headers=dict(self._validators))
+
+    def _evaluate_conditional_request(self) -> None:
+        if self.method not in CONDITIONAL_METHODS or self.response.status_code != HTTPStatus.OK:
+            return
+        for header, value in self._validators.items():
+            self.response.headers.setdefault(header, value)
+        if self.auto_etag and "ETag" not in self.response.headers:
+            self.response.set_etag(weak=self.weak_etag)
+        headers = self.response.headers
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
+        if conditional.is_not_modified(
+            self.request.headers, headers.get("ETag"), headers.get("Last-Modified")
+        ):
+            self.response = Response.not_modified(headers)
+
+    def _compress_response(self) -> None:
+        if self.compression:
+            self.response.compress(
+                self.request.headers.get("Accept-Encoding"),
+                self.compression,
+                min_size=self.compression_min_size,
+            )
+
     def _post_request_hook(self) -> None:
         """Makes the post_request_hook run-time friendly."""
         try:
@@ -153,7 +249,9 @@ class CORSResource(Resource):
             return Response("", headers=self.resp_headers(), status_code=HTTPStatus.NO_CONTENT)
 
         resp = super().__call__()
-        if resp.status_code >= 400 and ALLOW_ORIGIN_HEADER not in resp.headers:
+        if (
+            resp.status_code >= 400 or resp.status_code == HTTPStatus.NOT_MODIFIED
+        ) and ALLOW_ORIGIN_HEADER not in resp.headers:
             resp.headers.update(self.resp_headers())
         return resp
 
@@ -217,13 +315,22 @@ class PaginatedCORSResource(CORSResource):
 
 
 class EventAwareResource(Resource):
+    # Events are sent in the background, while the response is serialized, the Lambda handler
+    # must call EventAPI().join(context) before it returns
+    defer_events: bool = False
+
     def __init__(self, event: dict):
         super().__init__(event)
         self.event_api = EventAPI()
+        # the previous invocation might have timed out before its events were sent, such events
+        # are still reported in the lists of that invocation, not the ones made anew by clear
+        self.event_api.join(timeout=PREVIOUS_SENDING_TIMEOUT)
         self.event_api.clear()
 
     def post_request_hook(self) -> None:
-        if self.response.ok:
+        if self.response.ok and self.defer_events:
+            self.event_api.send_in_background()
+        elif self.response.ok:
             self.event_api.send()
         else:
             self.event_api.clear_pending()
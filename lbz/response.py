@@ -1,36 +1,66 @@
 from __future__ import annotations
 
-import json
+from base64 import b64encode
+from collections.abc import Iterable, Mapping
 from copy import deepcopy
+from http import HTTPStatus
 
+from lbz import compression, conditional, json_codec
+from lbz._cfg import COMPRESSION_MIN_SIZE
 from lbz.exceptions import LambdaFWException
 from lbz.rest import ContentType
 
+# Representation headers which are not sent with 304 responses (RFC 9110, 15.4.5)
+SKIPPED_NOT_MODIFIED_HEADERS = frozenset(
+    ("Content-Type", "Content-Length", "Content-Encoding", "Content-Language")
+)
+# Responses which never have a body, so there is nothing to compress
+BODILESS_STATUSES = frozenset((HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED))
+
 
 class Response:
     """Response from lambda.
 
-    Performs automatic dumping when body is dict, otherwise payload just passes through.
+    Performs automatic dumping when body is dict, bytes are base64-encoded, otherwise payload
+    just passes through.
     """
 
     def __init__(
         self,
-        body: str | dict,
+        body: str | dict | bytes,
         /,
         headers: dict | None = None,
         status_code: int = 200,
         base64_encoded: bool = False,
     ):
-        self.body = body
+        self._body = body
         self._json = body if isinstance(body, dict) else None
+        self._dumped_body: str | bytes | None = None
         self.headers = headers if headers is not None else self._get_content_header()
         self.status_code = status_code
-        # TODO: handle bae64 encoded responses appropriately
         self.is_base64 = base64_encoded
+        self.content_encoding: str | None = None
+        self.compression_min_size: int | None = None
 
     def __repr__(self) -> str:
         return f"<Response(status_code={self.status_code})>"
 
+    @property
+    def body(self) -> str | dict | bytes:
+        return self._body
+
+    @body.setter
+    def body(self, body: str | dict | bytes) -> None:
+        self._body = body
+        self._json = body if isinstance(body, dict) else None
+        self._dumped_body = None
+
+    @classmethod
+    def not_modified(cls, headers: Mapping[str, str]) -> Response:
+        """Creates an empty 304 response keeping headers of the original, except content ones."""
+        kept_headers = {k: v for k, v in headers.items() if k not in SKIPPED_NOT_MODIFIED_HEADERS}
+        return cls("", headers=kept_headers, status_code=HTTPStatus.NOT_MODIFIED)
+
     @classmethod
     def from_exception(cls, error: LambdaFWException, request_id: str) -> Response:
         """Creates a proper standardised Response for Errors."""
@@ -52,25 +82,95 @@ class Response:
     def ok(self) -> bool:
         return self.status_code < 400
 
+    def compress(
+        self,
+        accept_encoding: str | None,
+        encodings: Iterable[str] | None = None,
+        min_size: int | None = None,
+    ) -> Response:
+        """Compresses the body with the best encoding accepted by the client, once dumped.
+
+        Encodings are given in the order of preference and default to all available ones,
+        the ones which require missing optional dependencies are skipped.
+        Bodies smaller than min_size (COMPRESSION_MIN_SIZE by default) are left as they are.
+        """
+        available = compression.get_available_encodings()
+        encodings = available if encodings is None else [e for e in encodings if e in available]
+        if vary := self.headers.get("Vary"):
+            self.headers["Vary"] = f"{vary}, Accept-Encoding"
+        else:
+            self.headers["Vary"] = "Accept-Encoding"
+        self.content_encoding = compression.negotiate(accept_encoding, encodings)
+        self.compression_min_size = min_size
+        return self
+
+    def copy(self) -> Response:
+        """Creates a copy with its own headers, sharing the body and its dumped form."""
+        copied = Response(
+            self.body,
+            headers=dict(self.headers),
+            status_code=self.status_code,
+            base64_encoded=self.is_base64,
+        )
+        copied._dumped_body = self._dump_body()  # pylint: disable=protected-access
+        copied.content_encoding = self.content_encoding
+        copied.compression_min_size = self.compression_min_size
+        return copied
+
+    def set_etag(self, weak: bool = False) -> str:
+        """Sets the ETag header computed out of the dumped body.
+
+        The dumped body is reused by to_dict, so later in-place changes of the body are ignored.
+        """
+        body = self._dump_body()
+        raw_body = body.encode("utf-8") if isinstance(body, str) else body
+        self.headers["ETag"] = etag = conditional.compute_etag(raw_body, weak=weak)
+        return etag
+
     def to_dict(self) -> dict:
         """Dumps response to AWS Lambda compatible response format."""
-        body = (
-            json.dumps(self.body, separators=(",", ":"), default=str)
-            if self.is_json
-            else self.body
-        )
+        body = self._dump_body()
+        headers, is_base64 = self.headers, self.is_base64
+        if self.content_encoding and not is_base64:
+            raw_body = body.encode("utf-8") if isinstance(body, str) else body
+            if self._should_compress(raw_body):
+                body = compression.compress(raw_body, self.content_encoding)
+                headers = {**headers, "Content-Encoding": self.content_encoding}
+                if etag := headers.get("ETag"):
+                    # Compressed representation is only semantically equivalent to the original
+                    headers["ETag"] = conditional.weaken_etag(etag)
+        if isinstance(body, bytes):
+            body, is_base64 = b64encode(body).decode("ascii"), True
         response = {
-            "headers": self.headers,
+            "headers": headers,
             "statusCode": self.status_code,
             "body": body,
-            "isBase64Encoded": self.is_base64,
+            "isBase64Encoded": is_base64,
         }
 
         return response
 
+    def _dump_body(self) -> str | bytes:
+        if self._dumped_body is None:
+            if isinstance(self.body, dict) or self.is_json:
+                self._dumped_body = json_codec.dumps(self.body)
+            else:
+                self._dumped_body = self.body
+        return self._dumped_body
+
+    def _should_compress(self, raw_body: bytes) -> bool:
+        if not raw_body or self.status_code in BODILESS_STATUSES:
+            return False
+        return len(raw_body) >= self._get_compression_min_size()
+
+    def _get_compression_min_size(self) -> int:
+        if self.compression_min_size is None:
+            return COMPRESSION_MIN_SIZE.value
+        return self.compression_min_size
+
     def json(self) -> dict:
         if self._json is None:
-            self._json = json.loads(self.body)  # type: ignore[arg-type]
+            self._json = json_codec.loads(self.body)  # type: ignore[arg-type]
         return self._json
 
     def _get_content_header(self) -> dict:
@@ -79,4 +179,6 @@ class Response:
             return {"Content-Type": ContentType.JSON}
         if isinstance(self.body, str):
             return {"Content-Type": ContentType.TEXT}
+        if isinstance(self.body, bytes):
+            return {"Content-Type": ContentType.BINARY}
         raise RuntimeError("Response body type not supported yet.")
@@ -1,2 +1,2 @@
-from lbz.rest.api_gateway_event import APIGatewayEvent
-from lbz.rest.enums import ContentType
+from lbz.rest.api_gateway_event import APIGatewayEvent, APIGatewayEventV2
+from lbz.rest.enums import ContentType, PayloadFormat
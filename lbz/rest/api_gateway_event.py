@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
+import time
 import uuid
+from urllib.parse import urlencode
 
-from lbz.rest.enums import ContentType
+from lbz.rest.enums import ContentType, PayloadFormat
 
 DEFAULT_HEADERS = {"Content-Type": ContentType.JSON}
 
@@ -51,3 +54,65 @@ class APIGatewayEvent(dict):
                 else:
                     multi_value_query_params[key] = [str(elem) for elem in value]
         return multi_value_query_params
+
+
+class APIGatewayEventV2(dict):
+    """Easy-to-use dictionary simulating the event coming from the HTTP API or Function URL
+
+    Both of them use the payload format version 2.0, Function URLs always use the default route.
+    https://docs.aws.amazon.com/lambda/latest/dg/urls-invocation.html#urls-payloads
+    """
+
+    def __init__(
+        self,
+        method: str,
+        resource_path: str,
+        path_params: dict | None = None,
+        query_params: dict | None = None,
+        body: dict | str | None = None,
+        headers: dict | None = None,
+        cookies: list[str] | None = None,
+        is_base64_encoded: bool = False,
+        route_key: str | None = None,
+    ) -> None:
+        super().__init__()
+
+        path_params = {} if path_params is None else path_params
+        route_key = f"{method} {resource_path}" if route_key is None else route_key
+        raw_path = resource_path.format(**path_params)
+
+        self["version"] = PayloadFormat.HTTP_API
+        self["routeKey"] = route_key
+        self["rawPath"] = raw_path
+        self["rawQueryString"] = urlencode(query_params or {}, doseq=True)
+        self["headers"] = DEFAULT_HEADERS if headers is None else headers
+        if cookies:
+            self["cookies"] = cookies
+        if query_params:
+            self["queryStringParameters"] = self._get_query_params(query_params)
+        if path_params:
+            self["pathParameters"] = path_params
+        if body is not None:
+            self["body"] = body if isinstance(body, str) else json.dumps(body)
+        self["requestContext"] = {
+            "http": {
+                "method": method,
+                "path": raw_path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "lbz",
+            },
+            "requestId": str(uuid.uuid4()),
+            "routeKey": route_key,
+            "stage": "$default",
+            "timeEpoch": int(time.time() * 1000),
+        }
+        self["isBase64Encoded"] = is_base64_encoded
+
+    @staticmethod
+    def _get_query_params(query_params: dict) -> dict:
+        # Multiple values of the same parameter are joined with commas in the 2.0 format
+        return {
+            key: ",".join(str(elem) for elem in value) if isinstance(value, list) else str(value)
+            for key, value in query_params.items()
+        }
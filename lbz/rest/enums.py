@@ -1,3 +1,14 @@
 class ContentType:
     JSON = "application/json"
     TEXT = "text/plain"
+    BINARY = "application/octet-stream"
+
+
+class PayloadFormat:
+    # https://docs.aws.amazon.com/apigateway/latest/developerguide/http-api-develop-integrations-lambda.html
+    REST_API = "1.0"
+    HTTP_API = "2.0"  # also used by Lambda Function URLs
+
+    @classmethod
+    def get_format(cls, event: dict) -> str:
+        return cls.HTTP_API if event.get("version") == cls.HTTP_API else cls.REST_API
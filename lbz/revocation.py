@@ -0,0 +1,209 @@
+"""Revocation of tokens before they expire, by their ids (the jti claim).
+
+Revoked ids are loaded from REVOKED_TOKENS_SOURCE, which is one of:
+
+- file:///path/to/revoked.json
+- ssm:/name/of/the/parameter
+- s3://bucket/path/to/revoked.json
+
+holding a JSON list of ids, or ids separated by commas or new lines.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from threading import Lock, Thread
+from urllib.parse import urlparse
+
+from lbz._cfg import REVOKED_TOKENS_FAIL_CLOSED, REVOKED_TOKENS_SOURCE, REVOKED_TOKENS_TTL
+from lbz.aws_boto3 import client
+from lbz.aws_ssm import SSM
+from lbz.exceptions import Unauthorized
+from lbz.misc import get_logger
+
+logger = get_logger(__name__)
+
+FALSE_POSITIVE_RATE = 0.001
+_HASH_MASK = (1 << 64) - 1
+
+
+class BloomFilter:
+    """Set of strings which can tell they are not in it without false negatives.
+
+    Positions of bits are derived from the built-in hash of a string, which is cached in
+    the string itself, so checking an id allocates nothing and stops at the first unset bit.
+    """
+
+    def __init__(self, size: int, hash_count: int):
+        self.size = max(size, 8)
+        self.hash_count = max(hash_count, 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __repr__(self) -> str:
+        return f"<BloomFilter size={self.size} hash_count={self.hash_count}>"
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[str], false_positive_rate: float = FALSE_POSITIVE_RATE
+    ) -> BloomFilter:
+        """Builds the smallest filter holding values with the given rate of false positives."""
+        values = list(values)
+        size = math.ceil(-len(values) * math.log(false_positive_rate) / math.log(2) ** 2)
+        bloom_filter = cls(size, round(size / max(len(values), 1) * math.log(2)))
+        for value in values:
+            bloom_filter.add(value)
+        return bloom_filter
+
+    def add(self, value: str) -> None:
+        digest = hash(value) & _HASH_MASK
+        step = (digest >> 32) | 1
+        for index in range(self.hash_count):
+            position = (digest + index * step) % self.size
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        digest = hash(value) & _HASH_MASK
+        step = (digest >> 32) | 1
+        for index in range(self.hash_count):
+            position = (digest + index * step) % self.size
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+def load_file(path: str) -> str:
+    return Path(path).read_text(encoding="utf-8")
+
+
+def load_ssm_parameter(name: str) -> str:
+    if (value := SSM.get_parameter(name)) is None:
+        raise ValueError(f"SSM parameter {name} does not exist")
+    return value
+
+
+def load_s3_object(bucket: str, key: str) -> str:
+    body: bytes = client.s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return body.decode("utf-8")
+
+
+def get_loader(source: str) -> Callable[[], str]:
+    """Returns the loader of revoked ids published under the source."""
+    url = urlparse(source)
+    if url.scheme == "file":
+        return lambda: load_file(url.netloc + url.path)
+    if url.scheme == "ssm":
+        return lambda: load_ssm_parameter(url.netloc + url.path)
+    if url.scheme == "s3":
+        return lambda: load_s3_object(url.netloc, url.path.lstrip("/"))
+    raise ValueError(f"Unsupported source of revoked tokens: {source}")
+
+
+def parse_revoked(content: str) -> frozenset[str]:
+    if content.lstrip().startswith("["):
+        revoked = json.loads(content)
+        if not isinstance(revoked, list) or not all(isinstance(jti, str) for jti in revoked):
+            raise TypeError("Revoked tokens must be a list of strings")
+        return frozenset(revoked)
+    return frozenset(jti.strip() for jti in content.replace(",", "\n").splitlines() if jti.strip())
+
+
+class RevocationList:
+    """Ids of revoked tokens, screened by a Bloom filter and confirmed with the exact set.
+
+    Ids are loaded once, then reloaded in a background thread every ttl seconds, while
+    the current ones are still used. Failed loads keep the ids loaded before. Until ids are
+    loaded for the first time, they are loaded right away every ttl seconds and, if fail_closed,
+    every id counts as revoked.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], str],
+        ttl: float = 300,
+        timer: Callable[[], float] = time.monotonic,
+        fail_closed: bool = False,
+    ):
+        self.ttl = ttl
+        self.fail_closed = fail_closed
+        self.loaded = False
+        self._loader = loader
+        self._timer = timer
+        self._filter = BloomFilter.from_values(())
+        self._revoked: frozenset[str] = frozenset()
+        self._attempted_at: float | None = None
+        self._lock = Lock()
+        self._refresh_thread: Thread | None = None
+
+    def __repr__(self) -> str:
+        return f"<RevocationList revoked={len(self._revoked)} loaded={self.loaded}>"
+
+    def is_revoked(self, jti: str) -> bool:
+        if self._attempted_at is None:
+            self.refresh()
+        elif self._timer() - self._attempted_at >= self.ttl:
+            if self.loaded:
+                self.refresh_in_background()
+            else:
+                self.refresh()
+        if not self.loaded:
+            return self.fail_closed
+        # ids which are not revoked are almost always rejected by the filter alone
+        return jti in self._filter and jti in self._revoked
+
+    def refresh(self) -> bool:
+        """Loads revoked ids right away, returns whether they changed."""
+        with self._lock:
+            self._attempted_at = self._timer()
+            try:
+                revoked = parse_revoked(self._loader())
+            # e.g. errors of boto3 clients, which fail_closed decides about like any other
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error("Failed loading revoked tokens: %r", error)
+                return False
+            self.loaded = True
+            if revoked == self._revoked:
+                return False
+            self._filter = BloomFilter.from_values(revoked)
+            self._revoked = revoked
+            logger.info("Loaded %d revoked tokens", len(revoked))
+            return True
+
+    def refresh_in_background(self) -> None:
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._attempted_at = self._timer()
+        self._refresh_thread = Thread(target=self.refresh, name="lbz-revocation", daemon=True)
+        self._refresh_thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Waits for the background refresh, if there is any."""
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+
+
+_lists: dict[str, RevocationList] = {}
+
+
+def get_revocation_list() -> RevocationList | None:
+    """Returns the list of tokens revoked under REVOKED_TOKENS_SOURCE, None when it is not set."""
+    if not (source := REVOKED_TOKENS_SOURCE.value):
+        return None
+    if (revocation_list := _lists.get(source)) is None:
+        revocation_list = _lists[source] = RevocationList(
+            get_loader(source),
+            ttl=REVOKED_TOKENS_TTL.value,
+            fail_closed=REVOKED_TOKENS_FAIL_CLOSED.value,
+        )
+    return revocation_list
+
+
+def check_not_revoked(claims: dict) -> None:
+    """Raises Unauthorized if the token with the claims was revoked."""
+    if (jti := claims.get("jti")) is None or (revocation_list := get_revocation_list()) is None:
+        return
+    if revocation_list.is_revoked(jti):
+        raise Unauthorized("Your token has been revoked.")
@@ -1,17 +1,103 @@
+from __future__ import annotations
+
 import json
 from collections.abc import Callable, Iterator
 from functools import wraps
-from typing import Any, ParamSpec, TypeVar
+from typing import Any, NamedTuple, ParamSpec, TypeVar
 
-from lbz.misc import NestedDict, Singleton
+from lbz.exceptions import NotFound, UnsupportedMethod
+from lbz.misc import NestedDict
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
+# Attributes under which decorators leave metadata on the handlers
+ROUTES_ATTR = "_lbz_routes"
+PERMISSION_ATTR = "_lbz_permission"
+
+
+def split_path(path: str) -> list[str]:
+    """Splits URI or route template into its non-empty segments."""
+    return [segment for segment in path.split("/") if segment]
+
+
+class Endpoint(NamedTuple):
+    """Handler bound to the route and method once, when the Resource class is created."""
+
+    route: str
+    method: str
+    handler: Callable[..., Any]
+    permission: str | None
+
+
+class RouteNode:
+    """Single segment of the compiled routes tree.
+
+    Static segments are kept in a dictionary, while `{param}` and greedy `{param+}` segments
+    are kept separately as wildcards, so resolving a URI costs time proportional to its depth.
+    """
+
+    __slots__ = ("children", "wildcards", "greedy", "route")
+
+    def __init__(self, greedy: bool = False) -> None:
+        self.children: dict[str, RouteNode] = {}
+        self.wildcards: dict[str, RouteNode] = {}
+        self.greedy = greedy
+        self.route: str | None = None
+
+    def insert(self, route: str) -> None:
+        node = self
+        for segment in split_path(route):
+            if segment.startswith("{") and segment.endswith("}"):
+                name = segment[1:-1]
+                greedy = name.endswith("+")
+                name = name.rstrip("+")
+                node = node.wildcards.setdefault(name, RouteNode(greedy=greedy))
+            else:
+                node = node.children.setdefault(segment, RouteNode())
+        node.route = route
+
+    def match(self, segments: list[str], index: int, params: dict[str, str]) -> str | None:
+        """Finds the route matching segments, static segments take precedence over wildcards."""
+        if index == len(segments):
+            return self.route
+        if (child := self.children.get(segments[index])) is not None:
+            if (route := child.match(segments, index + 1, params)) is not None:
+                return route
+        for name, wildcard in self.wildcards.items():
+            if (route := wildcard.match_wildcard(segments, index, params)) is not None:
+                params[name] = "/".join(segments[index:]) if wildcard.greedy else segments[index]
+                return route
+        return None
+
+    def match_wildcard(
+        self, segments: list[str], index: int, params: dict[str, str]
+    ) -> str | None:
+        if self.greedy:
+            return self.route
+        return self.match(segments, index + 1, params)
+
+
+class Router:
+    """Routing table of a single Resource class."""
 
-class Router(metaclass=Singleton):
     def __init__(self) -> None:
         self._routes = NestedDict()
+        self._tree = RouteNode()
+        self._endpoints: dict[tuple[str, str], Endpoint] = {}
+        self._allowed_methods: dict[str, tuple[str, ...]] = {}
+        self._frozen = False
+
+    @classmethod
+    def collect(cls, owner: type) -> Router:
+        """Builds frozen router out of handlers decorated in the class and all its bases."""
+        router = cls()
+        for klass in reversed(owner.__mro__):
+            for name, attribute in vars(klass).items():
+                for route, method in getattr(attribute, ROUTES_ATTR, ()):
+                    router.add_route(route, method, name)
+        router.bind(owner)
+        return router
 
     def __getitem__(self, route: str) -> Any:
         return self._routes[route]
@@ -33,23 +119,72 @@ class Router(metaclass=Singleton):
 
     def add_route(self, route: str, method: str, handler: str) -> None:
         """Registers handler to route and method."""
+        if self._frozen:
+            raise RuntimeError(f"Router is frozen, {method} {route} cannot be added anymore")
+        if route not in self._routes:
+            self._tree.insert(route)
         self._routes[route][method] = handler
 
+    def resolve(self, uri: str) -> tuple[str, dict[str, str]] | None:
+        """Resolves concrete URI (without query string) into route template and its params."""
+        params: dict[str, str] = {}
+        if (route := self._tree.match(split_path(uri), 0, params)) is None:
+            return None
+        return route, params
+
+    def bind(self, owner: type) -> None:
+        """Precomputes endpoints of all registered handlers of the class and freezes the router."""
+        for route, methods in self._routes.items():
+            self._allowed_methods[route] = tuple(methods)
+            for method, name in methods.items():
+                handler = getattr(owner, name)
+                self._endpoints[route, method] = Endpoint(
+                    route=route,
+                    method=method,
+                    handler=handler,
+                    permission=getattr(handler, PERMISSION_ATTR, None),
+                )
+        self.freeze()
+
+    def get_endpoint(self, route: str | None, method: str) -> Endpoint:
+        """Finds the endpoint bound to the route and method.
+
+        Raises NotFound or UnsupportedMethod (listing allowed methods) when there is none.
+        """
+        if route is not None and (endpoint := self._endpoints.get((route, method))):
+            return endpoint
+        if route is None or (allowed_methods := self._allowed_methods.get(route)) is None:
+            raise NotFound(f"Nothing matches the given URI: {route}")
+        raise UnsupportedMethod(method=method, allowed_methods=list(allowed_methods))
+
+    def get_permissions(self) -> list[str]:
+        """Lists names of permissions required by the bound endpoints, in the routing order."""
+        permissions = (endpoint.permission for endpoint in self._endpoints.values())
+        return list(dict.fromkeys(p for p in permissions if p is not None))
+
+    def freeze(self) -> None:
+        self._frozen = True
+
     def clear(self) -> None:
         self._routes = NestedDict()
+        self._tree = RouteNode()
+        self._endpoints = {}
+        self._allowed_methods = {}
+        self._frozen = False
 
 
 def add_route(route: str, method: str = "GET") -> Callable[[Callable[P, R]], Callable[P, R]]:
-    """Flask-like wrapper for adding routes."""
+    """Flask-like wrapper for adding routes.
 
-    def wrapper(function: Callable[P, R]) -> Callable[P, R]:
-        router = Router()
-        router.add_route(route, method, function.__name__)
+    Routes are only marked on the handler, the Resource class collects them once it is created.
+    """
 
+    def wrapper(function: Callable[P, R]) -> Callable[P, R]:
         @wraps(function)
         def wrapped(*args: P.args, **kwargs: P.kwargs) -> R:
             return function(*args, **kwargs)
 
+        setattr(wrapped, ROUTES_ATTR, [*getattr(function, ROUTES_ATTR, []), (route, method)])
         return wrapped
 
     return wrapper
@@ -7,7 +7,9 @@ setup(
     version=pathlib.Path("version").read_text("utf-8").strip(),
     author="Piotr Dyba",
     author_email="piotr.dyba@localbini.com",
-    packages=find_packages(exclude=["examples", "examples.*", "tests", "tests.*"]),
+    packages=find_packages(
+        exclude=["benchmarks", "benchmarks.*", "examples", "examples.*", "tests", "tests.*"]
+    ),
     package_data={"lbz": ["py.typed"]},
     scripts=[],
     url="https://github.com/pdyba/lambdalizator",
@@ -20,6 +22,14 @@ setup(
         "multidict>=6.7.0",
         "python-jose>=3.5.0",
     ],
+    extras_require={
+        "brotli": ["brotli>=1.2.0"],
+        "cryptography": ["cryptography>=3.4.0"],
+        "msgspec": ["msgspec>=0.18.0"],
+        "orjson": ["orjson>=3.8.0"],
+        "ujson": ["ujson>=5.4.0"],
+        "zstd": ["zstandard>=0.21.0"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -13,11 +13,25 @@ from lbz._cfg import (
     ALLOWED_ISS,
     ALLOWED_PUBLIC_KEYS,
     AUTH_REMOVE_PREFIXES,
+    AUTHZ_CACHE_SIZE,
     AWS_LAMBDA_FUNCTION_NAME,
+    COMPRESSION_MIN_SIZE,
     CORS_HEADERS,
     CORS_ORIGIN,
+    DECOMPRESSION_MAX_SIZE,
     EVENTS_BUS_NAME,
+    JSON_CODEC,
+    JWKS_MIN_REFETCH_INTERVAL,
+    JWKS_TTL,
+    JWKS_URL,
+    JWT_BACKEND,
+    JWT_CACHE_EXPIRY_SKEW,
+    JWT_CACHE_SIZE,
     LOGGING_LEVEL,
+    REVOKED_TOKENS_FAIL_CLOSED,
+    REVOKED_TOKENS_SOURCE,
+    REVOKED_TOKENS_TTL,
+    TRUST_AUTHORIZER_CONTEXT,
 )
 from lbz.authentication import User
 from lbz.authz.authorizer import Authorizer
@@ -27,7 +41,7 @@ from lbz.request import Request
 from lbz.resource import Resource
 from lbz.response import Response
 from lbz.rest import APIGatewayEvent, ContentType
-from lbz.router import Router, add_route
+from lbz.router import add_route
 from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY
 from tests.utils import encode_token
 
@@ -50,6 +64,9 @@ def setting_initial_lbz_configuration(allowed_audiences: list[str]) -> Iterator[
     }
     with patch.dict(environ, patched_environ):
         LOGGING_LEVEL.reset()
+        JSON_CODEC.reset()
+        COMPRESSION_MIN_SIZE.reset()
+        DECOMPRESSION_MAX_SIZE.reset()
         CORS_HEADERS.reset()
         CORS_ORIGIN.reset()
         AWS_LAMBDA_FUNCTION_NAME.reset()
@@ -58,6 +75,17 @@ def setting_initial_lbz_configuration(allowed_audiences: list[str]) -> Iterator[
         ALLOWED_AUDIENCES.reset()
         ALLOWED_ISS.reset()
         AUTH_REMOVE_PREFIXES.reset()
+        AUTHZ_CACHE_SIZE.reset()
+        JWT_CACHE_SIZE.reset()
+        JWT_CACHE_EXPIRY_SKEW.reset()
+        JWT_BACKEND.reset()
+        JWKS_URL.reset()
+        JWKS_TTL.reset()
+        JWKS_MIN_REFETCH_INTERVAL.reset()
+        REVOKED_TOKENS_FAIL_CLOSED.reset()
+        REVOKED_TOKENS_SOURCE.reset()
+        REVOKED_TOKENS_TTL.reset()
+        TRUST_AUTHORIZER_CONTEXT.reset()
         yield
 
 
@@ -67,12 +95,6 @@ def clear_authz_collector() -> Iterator[None]:
     authz_collector.clean()
 
 
-@pytest.fixture(autouse=True)
-def clear_router_collector() -> Iterator[None]:
-    yield
-    Router().clear()
-
-
 @pytest.fixture()
 def sample_request() -> Request:
     # TODO: change to simple factory / parametrise it
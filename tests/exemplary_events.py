@@ -180,3 +180,72 @@ def dynamodb_event() -> dict:
             }
         ]
     }
+
+
+def http_api_event() -> dict:
+    return {
+        "version": "2.0",
+        "routeKey": "POST /users/{uid}",
+        "rawPath": "/users/42",
+        "rawQueryString": "fields=name&fields=email&limit=",
+        "cookies": ["session=abc", "theme=dark"],
+        "headers": {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "host": "r3pmxmplak.execute-api.us-east-2.amazonaws.com",
+        },
+        "queryStringParameters": {"fields": "name,email", "limit": ""},
+        "requestContext": {
+            "accountId": "123456789012",
+            "apiId": "r3pmxmplak",
+            "domainName": "r3pmxmplak.execute-api.us-east-2.amazonaws.com",
+            "domainPrefix": "r3pmxmplak",
+            "http": {
+                "method": "POST",
+                "path": "/users/42",
+                "protocol": "HTTP/1.1",
+                "sourceIp": "205.255.255.176",
+                "userAgent": "curl/7.64.1",
+            },
+            "requestId": "JKJaXmPLvHcESHA=",
+            "routeKey": "POST /users/{uid}",
+            "stage": "$default",
+            "time": "10/Mar/2020:05:16:23 +0000",
+            "timeEpoch": 1583817383220,
+        },
+        "pathParameters": {"uid": "42"},
+        "body": "eyJuYW1lIjogIkpvaG4ifQ==",
+        "isBase64Encoded": True,
+    }
+
+
+def function_url_event() -> dict:
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": "/users/42",
+        "rawQueryString": "",
+        "headers": {
+            "accept": "application/json",
+            "host": "a1b2c3d4e5f6.lambda-url.us-east-2.on.aws",
+        },
+        "requestContext": {
+            "accountId": "123456789012",
+            "apiId": "a1b2c3d4e5f6",
+            "domainName": "a1b2c3d4e5f6.lambda-url.us-east-2.on.aws",
+            "domainPrefix": "a1b2c3d4e5f6",
+            "http": {
+                "method": "GET",
+                "path": "/users/42",
+                "protocol": "HTTP/1.1",
+                "sourceIp": "123.123.123.123",
+                "userAgent": "agent",
+            },
+            "requestId": "id",
+            "routeKey": "$default",
+            "stage": "$default",
+            "time": "12/Mar/2020:19:03:58 +0000",
+            "timeEpoch": 1583348638390,
+        },
+        "isBase64Encoded": False,
+    }
@@ -0,0 +1,18 @@
+SAMPLE_EC_PRIVATE_KEY = {
+    "kty": "EC",
+    "crv": "P-256",
+    "kid": "b671d02c-ffd2-4745-9543-3f576bf67582",
+    "alg": "ES256",
+    "x": "JF3vHRW-BXFRJfBDJs7Z9oczBH-CbeMCMa9jNWFpDaA",
+    "y": "Z5lRwVThePOvdUR8MCWlzyse2exjw3vKTCsWjYcfgUw",
+    "d": "Mu3Z5dIo7q4Hh72S_Gc9bRqlcbVD9Ug0o-Lw_rNiGJ0",
+}
+
+SAMPLE_EC_PUBLIC_KEY = {
+    "kty": "EC",
+    "crv": "P-256",
+    "kid": "b671d02c-ffd2-4745-9543-3f576bf67582",
+    "alg": "ES256",
+    "x": "JF3vHRW-BXFRJfBDJs7Z9oczBH-CbeMCMa9jNWFpDaA",
+    "y": "Z5lRwVThePOvdUR8MCWlzyse2exjw3vKTCsWjYcfgUw",
+}
@@ -0,0 +1,16 @@
+SAMPLE_ED25519_PRIVATE_KEY = {
+    "kty": "OKP",
+    "crv": "Ed25519",
+    "kid": "c09241ec-3f59-4db2-b13e-0fc066213464",
+    "alg": "EdDSA",
+    "x": "GpAM2wQPRPzXLCYjyZ0oYD77a8i7cZ1HJP2e1zvyCwY",
+    "d": "0lxzAxgdQracgD1y6T1Ev0FOdnvcdQgHgNomQW45-jc",
+}
+
+SAMPLE_ED25519_PUBLIC_KEY = {
+    "kty": "OKP",
+    "crv": "Ed25519",
+    "kid": "c09241ec-3f59-4db2-b13e-0fc066213464",
+    "alg": "EdDSA",
+    "x": "GpAM2wQPRPzXLCYjyZ0oYD77a8i7cZ1HJP2e1zvyCwY",
+}
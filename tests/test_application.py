@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+
+from lbz.application import Application
+from lbz.resource import CORSResource, Resource
+from lbz.response import Response
+from lbz.rest import APIGatewayEvent, APIGatewayEventV2
+from lbz.router import add_route
+
+
+class UsersResource(Resource):
+    @add_route("/")
+    def list(self) -> Response:
+        return Response({"resource": "users", "urn": self.urn})
+
+    @add_route("/{uid}")
+    def get(self, uid: str) -> Response:
+        return Response({"resource": "users", "uid": uid})
+
+
+class OrdersResource(CORSResource):
+    @add_route("/")
+    def list(self) -> Response:
+        return Response({"resource": "orders"})
+
+    @add_route("/{uid}")
+    def get(self, uid: str) -> Response:
+        return Response({"resource": "orders", "uid": uid})
+
+
+@pytest.fixture(name="application")
+def application_fixture() -> Application:
+    application = Application()
+    application.mount("/users", UsersResource)
+    application.mount("/orders/", OrdersResource, methods=["GET"], origins=["*"])
+    return application
+
+
+class TestApplication:
+    def test_mounts_all_routes_under_prefixes(self, application: Application) -> None:
+        assert "/users" in application
+        assert "/users/{uid}" in application
+        assert "/orders" in application
+        assert "/orders/{uid}" in application
+        assert "/" not in application
+        assert repr(application) == "<Application routes=4>"
+
+    def test_dispatches_to_mounted_resource(self, application: Application) -> None:
+        response = application(APIGatewayEvent("GET", "/users"))
+
+        assert response.body == {"resource": "users", "urn": "/users"}
+
+    def test_dispatches_with_path_params(self, application: Application) -> None:
+        response = application(APIGatewayEvent("GET", "/orders/{uid}", path_params={"uid": "1"}))
+
+        assert response.body == {"resource": "orders", "uid": "1"}
+
+    def test_passes_additional_arguments_to_resource(self, application: Application) -> None:
+        response = application(APIGatewayEvent("OPTIONS", "/orders"))
+
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert response.headers["Access-Control-Allow-Methods"] == "GET, OPTIONS"
+
+    def test_returns_not_found_when_route_is_not_mounted(self, application: Application) -> None:
+        response = application(APIGatewayEvent("GET", "/unknown"))
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_resolves_concrete_uri(self, application: Application) -> None:
+        assert application.resolve("/users/1") == ("/users/{uid}", {"uid": "1"})
+
+    def test_raises_when_same_route_is_mounted_twice(self, application: Application) -> None:
+        with pytest.raises(ValueError, match="Route /users is already mounted"):
+            application.mount("/users", UsersResource)
+
+    def test_mounts_resource_at_root(self) -> None:
+        application = Application()
+        application.mount("/", UsersResource)
+
+        assert application(APIGatewayEvent("GET", "/")).body == {"resource": "users", "urn": "/"}
+
+    def test_dispatches_http_api_event(self, application: Application) -> None:
+        event = APIGatewayEventV2("GET", "/users/{uid}", path_params={"uid": "1"})
+
+        assert application(event).body == {"resource": "users", "uid": "1"}
+
+    def test_dispatches_function_url_event(self, application: Application) -> None:
+        event = APIGatewayEventV2("GET", "/orders/{uid}", {"uid": "2"}, route_key="$default")
+
+        assert application(event).body == {"resource": "orders", "uid": "2"}
+
+    def test_returns_not_found_when_function_url_path_is_unknown(
+        self, application: Application
+    ) -> None:
+        event = APIGatewayEventV2("GET", "/unknown", route_key="$default")
+
+        assert application(event).status_code == HTTPStatus.NOT_FOUND
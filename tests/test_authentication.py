@@ -24,6 +24,14 @@ def test_decoding_user(user_token: str) -> None:
     assert User(user_token)
 
 
+def test_user_uses_already_verified_claims(jwt_partial_payload: dict) -> None:
+    with patch("lbz.authentication.decode_jwt") as mocked_decode_jwt:
+        user = User("token", claims={"cognito:username": "x", **jwt_partial_payload})
+
+    assert user.username == "x"
+    mocked_decode_jwt.assert_not_called()
+
+
 def test_decoding_user_raises_unauthorized_when_invalid_token(user_token: str) -> None:
     with pytest.raises(Unauthorized):
         User(user_token + "?")
@@ -79,9 +87,9 @@ def test_loading_user_does_not_parse_standard_claims(jwt_partial_payload: dict)
         assert not hasattr(user, key)
 
 
-def test_user_raises_when_more_attributes_than_1000() -> None:
-    with pytest.raises(RuntimeError):
-        cognito_user = {str(uuid4()): str(uuid4()) for i in range(1001)}
+def test_user_raises_when_more_attributes_than_1000(user_cognito: dict) -> None:
+    with pytest.raises(RuntimeError, match="1000"):
+        cognito_user = {**user_cognito, **{str(uuid4()): str(uuid4()) for i in range(1001)}}
         User(encode_token(cognito_user))
 
 
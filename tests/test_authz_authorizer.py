@@ -52,6 +52,16 @@ class TestAuthorizerWithMockedJWT:
         with patch("lbz.authz.authorizer.decode_jwt", lambda _: token_payload):
             return Authorizer("xx", "test_resource", "permission_name")
 
+    def test_already_verified_claims_are_not_decoded_again(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        with patch("lbz.authz.authorizer.decode_jwt") as mocked_decode_jwt:
+            authz = Authorizer(
+                "xx", "test_resource", "permission_name", claims=full_access_authz_payload
+            )
+        mocked_decode_jwt.assert_not_called()
+        assert authz.allow == {ALL: ALL}
+
     def test_wrong_jwt_authz_payload_raises_permission_denied(self) -> None:
         with pytest.raises(PermissionDenied):
             self._make_mocked_authorizer({})
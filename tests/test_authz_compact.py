@@ -0,0 +1,124 @@
+import json
+import zlib
+
+import pytest
+from jose import jwt
+from jose.utils import base64url_encode
+
+from lbz.authz.authorizer import Authorizer
+from lbz.authz.compact import pack_claims, pack_policy, unpack_claims, unpack_policy
+from lbz.authz.policy import CompiledPolicy
+from lbz.exceptions import PermissionDenied
+from lbz.jwt_utils import decode_jwt
+from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY
+
+RESTRICTIONS = {"allow": "*", "deny": {"status": "archived"}}
+ADMIN_POLICY = {
+    "allow": {
+        **{
+            f"resource-{index}": {
+                **{f"permission-{number}": RESTRICTIONS for number in range(20)},
+                "own": {"ref": "own"},
+            }
+            for index in range(20)
+        },
+        "users": "*",
+    },
+    "deny": {"resource-0": {"permission-0": {"uid": "1"}}},
+    "refs": {"own": {"allow": {"uid": "self"}}},
+}
+
+
+class TestCompactPolicy:
+    @pytest.mark.parametrize("compress", [False, True])
+    @pytest.mark.parametrize(
+        "policy",
+        [
+            ADMIN_POLICY,
+            {"allow": "*", "deny": {}},
+            {"allow": {"*": "*"}, "deny": {"orders": "*"}},
+            {"allow": {"orders": {"list": {"allow": {"uid": ["1", 2]}}}}, "deny": {}},
+        ],
+    )
+    def test_policy_is_restored(self, policy: dict, compress: bool) -> None:
+        packed = json.loads(json.dumps(pack_policy(policy, compress=compress)))
+
+        assert unpack_policy(packed) == policy
+
+    def test_names_and_restrictions_are_stored_once(self) -> None:
+        packed = pack_policy(
+            {
+                "allow": {"orders": {"list": RESTRICTIONS, "get": RESTRICTIONS}},
+                "deny": {"orders": {"list": {"uid": "1"}}},
+            }
+        )
+
+        assert packed == {
+            "v": 1,
+            "s": ["orders", "list", "get"],
+            "x": [RESTRICTIONS, {"uid": "1"}],
+            "a": {"0": {"1": 0, "2": 0}},
+            "d": {"0": {"1": 1}},
+        }
+
+    def test_compact_policy_is_smaller(self) -> None:
+        size = len(json.dumps(ADMIN_POLICY))
+
+        assert len(json.dumps(pack_policy(ADMIN_POLICY))) < size / 2
+        assert len(pack_policy(ADMIN_POLICY, compress=True)) < size / 20
+
+    def test_policy_without_statements_cannot_be_packed(self) -> None:
+        with pytest.raises(ValueError, match="Policy must have allow and deny statements"):
+            pack_policy({"allow": "*"})
+
+    @pytest.mark.parametrize(
+        "packed",
+        [
+            {"v": 2, "s": [], "x": [], "a": 0, "d": 0},
+            {"v": 1, "s": [], "x": [], "a": {"0": 0}, "d": 0},
+            {"v": 1, "s": [], "x": []},
+            "not-deflated",
+            [],
+        ],
+    )
+    def test_invalid_policy(self, packed: dict | str) -> None:
+        with pytest.raises(PermissionDenied, match="Invalid policy in the authorization token"):
+            unpack_policy(packed)
+
+    def test_deflate_bombs_are_rejected(self) -> None:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        bomb = compressor.compress(b" " * 2 * 1024 * 1024) + compressor.flush()
+
+        with pytest.raises(PermissionDenied):
+            unpack_policy(base64url_encode(bomb).decode("ascii"))
+
+
+class TestCompactClaims:
+    def test_only_policy_is_packed(self, full_access_authz_payload: dict) -> None:
+        packed = pack_claims(full_access_authz_payload)
+
+        assert set(packed) == set(full_access_authz_payload) - {"allow", "deny"} | {"pol"}
+        assert unpack_claims(packed) == full_access_authz_payload
+
+    def test_claims_without_compact_policy_are_not_copied(self) -> None:
+        claims = {"allow": "*", "deny": {}}
+
+        assert unpack_claims(claims) is claims
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_signed_compact_policy_is_decoded_by_authorizer(
+        self, full_access_authz_payload: dict, compress: bool
+    ) -> None:
+        claims = {**full_access_authz_payload, **ADMIN_POLICY}
+        token = Authorizer.sign_authz(claims, SAMPLE_PRIVATE_KEY, compact=True, compress=compress)
+
+        assert "allow" not in jwt.get_unverified_claims(token)
+        assert len(token) < len(Authorizer.sign_authz(claims, SAMPLE_PRIVATE_KEY))
+        assert unpack_claims(decode_jwt(token)) == claims
+        authorizer = Authorizer(token, "resource-1", "permission-1")
+        authorizer.check_access()
+        assert authorizer.restrictions == RESTRICTIONS
+        assert CompiledPolicy.merge({}, decode_jwt(token)).check("resource-3", "own") == {
+            "allow": {"uid": "self"},
+            "deny": None,
+        }
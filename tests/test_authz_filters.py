@@ -0,0 +1,93 @@
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+import pytest
+
+from lbz.authz.filters import RestrictionFilter
+from lbz.authz.policy import CompiledPolicy
+
+RECORDS = [
+    {"id": 1, "uid": "u1", "status": "active", "tags": ["a"]},
+    {"id": 2, "uid": "u2", "status": "archived", "tags": ["b"]},
+    {"id": 3, "uid": "u1", "status": "archived"},
+    {"id": 4, "status": "active"},
+]
+
+
+def ids(records: Iterable[Mapping[str, Any]]) -> list[int]:
+    return [record["id"] for record in records]
+
+
+class TestRestrictionFilter:
+    @pytest.mark.parametrize(
+        "restrictions, expected_ids",
+        [
+            ({"allow": "*", "deny": None}, [1, 2, 3, 4]),
+            ({"allow": None, "deny": {}}, [1, 2, 3, 4]),
+            ({"allow": "*", "deny": "*"}, []),
+            ({"allow": {"uid": "u1"}, "deny": None}, [1, 3]),
+            ({"allow": {"uid": ["u1", "u2"]}, "deny": None}, [1, 2, 3]),
+            ({"allow": {"uid": "*"}, "deny": None}, [1, 2, 3]),
+            ({"allow": "*", "deny": {"status": "archived"}}, [1, 4]),
+            ({"allow": "*", "deny": {"uid": "u1", "status": "archived"}}, [1, 2, 4]),
+            ({"allow": {"uid": "u1", "status": "active"}, "deny": None}, [1]),
+            ({"allow": {"tags": "a"}, "deny": None}, []),
+        ],
+    )
+    def test_records_are_filtered(self, restrictions: dict, expected_ids: list[int]) -> None:
+        restriction_filter = RestrictionFilter(restrictions)
+
+        assert ids(restriction_filter.filter_list(RECORDS)) == expected_ids
+        assert ids(restriction_filter.filter(RECORDS)) == expected_ids
+        assert ids([r for r in RECORDS if restriction_filter(r)]) == expected_ids
+
+    @pytest.mark.parametrize(
+        "restrictions, expected_ids",
+        [
+            ({"allow": {"uid": "self"}, "deny": None}, [1, 3]),
+            ({"allow": {"uid": ["self", "u2"]}, "deny": None}, [1, 2, 3]),
+            ({"allow": "self", "deny": None}, [1, 3]),
+            ({"allow": "*", "deny": "self"}, [2, 4]),
+        ],
+    )
+    def test_self_stands_for_self_value(self, restrictions: dict, expected_ids: list[int]) -> None:
+        restriction_filter = RestrictionFilter(restrictions, self_value="u1", owner_field="uid")
+
+        assert ids(restriction_filter.filter_list(RECORDS)) == expected_ids
+
+    def test_filtering_is_lazy(self) -> None:
+        def records() -> Iterator[dict]:
+            yield from RECORDS
+            raise AssertionError("Records are consumed too eagerly")
+
+        filtered = RestrictionFilter({"allow": {"uid": "u1"}, "deny": None}).filter(records())
+
+        assert next(filtered)["id"] == 1
+
+    def test_unrestricted_list_is_copied(self) -> None:
+        restriction_filter = RestrictionFilter({"allow": "*", "deny": None})
+
+        assert restriction_filter.allows_all
+        assert restriction_filter.filter_list(RECORDS) == RECORDS
+        assert restriction_filter.filter_list(RECORDS) is not RECORDS
+
+    def test_restrictions_of_compiled_policy(self) -> None:
+        policy = CompiledPolicy(
+            {"allow": {"orders": {"list": {"allow": {"uid": "self"}}}}, "deny": {}}
+        )
+
+        restriction_filter = RestrictionFilter(policy.check("orders", "list"), self_value="u2")
+
+        assert ids(restriction_filter.filter_list(RECORDS)) == [2]
+
+    @pytest.mark.parametrize(
+        "restrictions, error",
+        [
+            ({"allow": "self"}, "owner_field is required"),
+            ({"allow": {"uid": "self"}}, "self_value is required"),
+            ({"allow": ["uid"]}, "Unsupported restriction: \\['uid'\\]"),
+        ],
+    )
+    def test_invalid_restrictions(self, restrictions: dict, error: str) -> None:
+        with pytest.raises(ValueError, match=error):
+            RestrictionFilter(restrictions)
@@ -0,0 +1,167 @@
+from collections.abc import Mapping
+from os import environ
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from lbz._cfg import AUTHZ_CACHE_SIZE
+from lbz.authz.authorizer import DENY, Authorizer
+from lbz.authz.policy import CompiledPolicy, compiled_policies
+from lbz.authz.utils import check_permission
+from lbz.exceptions import PermissionDenied
+from lbz.resource import Resource
+from lbz.rest import APIGatewayEvent
+
+RESTRICTIONS = {"allow": {"uid": "self"}, "deny": {"status": "archived"}}
+ALLOW_ALL = {"allow": "*"}
+POLICIES: list[dict] = [
+    {"allow": {"*": "*"}, "deny": {}},
+    {"allow": "*", "deny": {}},
+    {"allow": {}, "deny": {}},
+    {"allow": {"*": "*"}, "deny": {"*": "*"}},
+    {"allow": {"*": "*"}, "deny": {"orders": "*"}},
+    {"allow": {"orders": "*"}, "deny": {"orders": {"delete": {"uid": "1"}}}},
+    {"allow": {"orders": "*"}, "deny": {"orders": {"delete": "*"}}},
+    {"allow": {"orders": {"list": ALLOW_ALL, "get": RESTRICTIONS}}, "deny": {}},
+    {"allow": {"orders": {"list": ALLOW_ALL}}, "deny": {"orders": {"list": {"status": "x"}}}},
+    {"allow": {"orders": {"list": {"ref": "own"}}}, "deny": {}, "refs": {"own": RESTRICTIONS}},
+    {"allow": {"orders": {"list": {"ref": "missing"}}}, "deny": {}},
+    {"allow": {"orders": {"list": ALLOW_ALL}, "users": "*"}, "deny": {"invoices": "*"}},
+    {"allow": {"orders": {"list": {"deny": "self"}}}, "deny": {"users": {"get": "self"}}},
+]
+CHECKS = [
+    (resource, permission)
+    for resource in ("orders", "users", "invoices", "other")
+    for permission in ("list", "get", "delete", "other")
+]
+
+
+def authorize(policy: dict, resource: str, permission: str) -> dict | None:
+    authorizer = Authorizer(None, resource, permission, base_permission_policy=policy)
+    try:
+        authorizer.check_access()
+    except PermissionDenied:
+        return None
+    return authorizer.restrictions
+
+
+def check_compiled(
+    policy: CompiledPolicy, resource: str, permission: str
+) -> Mapping[str, Any] | None:
+    try:
+        return policy.check(resource, permission)
+    except PermissionDenied:
+        return None
+
+
+class TestCompiledPolicy:
+    @pytest.mark.parametrize("policy", POLICIES)
+    def test_decisions_are_the_same_as_authorizer_ones(self, policy: dict) -> None:
+        compiled_policy = CompiledPolicy(policy)
+
+        for resource, permission in CHECKS:
+            assert check_compiled(compiled_policy, resource, permission) == authorize(
+                policy, resource, permission
+            ), (resource, permission)
+
+    @pytest.mark.parametrize("policy", POLICIES)
+    def test_evaluated_outcomes_are_the_same_as_authorizer_ones(self, policy: dict) -> None:
+        compiled_policy = CompiledPolicy(policy)
+
+        for resource, permission in CHECKS:
+            authorizer = Authorizer(None, resource, permission, base_permission_policy=policy)
+            try:
+                authorizer.check_access()
+            except PermissionDenied:
+                pass
+            decision = compiled_policy.evaluate(resource, permission)
+            assert decision.outcome == authorizer.outcome, (resource, permission)
+            assert decision.allowed == (authorizer.outcome != DENY)
+
+    def test_restrictions_are_read_only_and_shared(self) -> None:
+        compiled_policy = CompiledPolicy(POLICIES[7])
+        restrictions = compiled_policy.check("orders", "get")
+
+        with pytest.raises(TypeError):
+            restrictions["allow"]["uid"] = "other"
+
+        assert restrictions == RESTRICTIONS
+        assert compiled_policy.check("orders", "get") is restrictions
+
+    def test_malformed_entries_fail_only_when_checked(self) -> None:
+        compiled_policy = CompiledPolicy({"allow": {"orders": {"list": "*"}}, "deny": {}})
+
+        assert not compiled_policy.is_allowed("users", "list")
+        for _ in range(2):
+            with pytest.raises(AttributeError):
+                compiled_policy.check("orders", "list")
+
+    def test_is_allowed(self) -> None:
+        compiled_policy = CompiledPolicy(POLICIES[7])
+
+        assert compiled_policy.is_allowed("orders", "list")
+        assert not compiled_policy.is_allowed("orders", "delete")
+
+    @pytest.mark.parametrize("policy", [{}, {"allow": "*"}, {"deny": {}}])
+    def test_invalid_policy(self, policy: dict) -> None:
+        with pytest.raises(PermissionDenied, match="Invalid policy in the authorization token"):
+            CompiledPolicy(policy)
+
+    def test_merge_does_not_change_guest_policy(self) -> None:
+        guest_policy = {"allow": {"orders": {"list": ALLOW_ALL}}, "deny": {}}
+
+        compiled_policy = CompiledPolicy.merge(
+            guest_policy, {"allow": {"orders": {"get": ALLOW_ALL}}}
+        )
+
+        assert compiled_policy.is_allowed("orders", "get")
+        assert compiled_policy.is_allowed("orders", "list")
+        assert guest_policy == {"allow": {"orders": {"list": ALLOW_ALL}}, "deny": {}}
+
+
+class TestCompiledPoliciesCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        compiled_policies.clear()
+
+    def test_policies_are_compiled_once_per_token_and_guest_policy(self) -> None:
+        guest_policy = {"allow": {"orders": {"list": ALLOW_ALL}}, "deny": {}}
+        claims = {"allow": {"orders": "*"}, "deny": {}}
+
+        with patch.object(CompiledPolicy, "merge", wraps=CompiledPolicy.merge) as merge_mock:
+            policy = compiled_policies.get("token", claims, guest_policy)
+            assert compiled_policies.get("token", claims, dict(guest_policy)) is policy
+            assert compiled_policies.get("other", claims, guest_policy) is not policy
+            assert compiled_policies.get(None, None, guest_policy) is not policy
+            assert compiled_policies.get(None, None, {"allow": "*", "deny": {}}) is not policy
+
+        assert merge_mock.call_count == 4
+        assert compiled_policies.stats()["hits"] == 1
+
+    @patch.dict(environ, {"AUTHZ_CACHE_SIZE": "0"})
+    def test_cache_can_be_disabled(self) -> None:
+        AUTHZ_CACHE_SIZE.reset()
+        guest_policy = {"allow": "*", "deny": {}}
+
+        assert compiled_policies.get(None, None, guest_policy) is not compiled_policies.get(
+            None, None, guest_policy
+        )
+
+    def test_check_permission_uses_compiled_policies(
+        self, limited_access_auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": limited_access_auth_header})
+        )
+
+        with patch.object(
+            Authorizer, "check_access", autospec=True, side_effect=Authorizer.check_access
+        ) as checks:
+            for _ in range(3):
+                assert check_permission(resource, "perm-name") == {"allow": "*", "deny": None}
+                with pytest.raises(PermissionDenied):
+                    check_permission(resource, "garbage")
+
+        assert checks.call_count == 2
+        assert compiled_policies.stats() == {"hits": 5, "misses": 1, "size": 1, "maxsize": 1024}
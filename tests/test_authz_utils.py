@@ -1,10 +1,18 @@
 # coding=utf-8
+import json
+from unittest.mock import patch
+
 import pytest
 
-from lbz.authz.utils import check_permission, has_permission
+from lbz.authz.authorizer import ALLOW, DENY, LIMITED_ALLOW, Authorizer
+from lbz.authz.policy import Decision, dump_guest_policy
+from lbz.authz.utils import check_permission, check_permissions, evaluate_all, has_permission
 from lbz.exceptions import PermissionDenied, Unauthorized
+from lbz.jwt_utils import decode_jwt
 from lbz.resource import Resource
+from lbz.response import Response
 from lbz.rest import APIGatewayEvent
+from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY
 
 
 class TestAuthorizationUtils:
@@ -51,3 +59,138 @@ class TestAuthorizationUtils:
             )
         )
         assert not has_permission(res_instance, "garbage")
+
+    def test_token_is_decoded_once_per_request(
+        self, limited_access_auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        res_instance = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": limited_access_auth_header})
+        )
+        with patch("lbz.request.decode_jwt", wraps=decode_jwt) as mocked_decode_jwt:
+            for _ in range(3):
+                assert has_permission(res_instance, "perm-name")
+            assert not has_permission(res_instance, "garbage")
+            check_permission(res_instance, "perm-name")
+
+        mocked_decode_jwt.assert_called_once_with(limited_access_auth_header)
+
+    def test_guest_policy_is_dumped_once_per_request(
+        self, limited_access_auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        res_instance = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": limited_access_auth_header})
+        )
+        with patch(
+            "lbz.authz.utils.dump_guest_policy", wraps=dump_guest_policy
+        ) as mocked_dump_guest_policy:
+            for _ in range(3):
+                assert has_permission(res_instance, "perm-name")
+            check_permissions(res_instance, ["perm-name", "garbage"])
+
+        mocked_dump_guest_policy.assert_called_once_with({})
+
+
+class TestBulkPermissionEvaluation:
+    @pytest.fixture(name="auth_header")
+    def auth_header_fixture(self, full_access_authz_payload: dict) -> str:
+        return Authorizer.sign_authz(
+            {
+                **full_access_authz_payload,
+                "allow": {
+                    "test_res": {
+                        "perm-name": {"allow": "*"},
+                        "garbage": {"allow": "*", "deny": {"uid": "1"}},
+                    },
+                    "orders": {"list": {"allow": "*"}},
+                },
+                "deny": {},
+            },
+            SAMPLE_PRIVATE_KEY,
+        )
+
+    def test_check_permissions(
+        self, auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": auth_header})
+        )
+
+        decisions = check_permissions(resource, ["perm-name", "garbage"])
+
+        assert decisions == {
+            "perm-name": Decision(ALLOW, {"allow": "*", "deny": None}),
+            "garbage": Decision(LIMITED_ALLOW, {"allow": "*", "deny": {"uid": "1"}}),
+        }
+        assert all(decision.allowed for decision in decisions.values())
+
+    def test_denied_permissions_do_not_raise(
+        self, limited_access_auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": limited_access_auth_header})
+        )
+
+        decision = check_permissions(resource, ["garbage"])["garbage"]
+
+        assert decision == Decision(DENY, None)
+        assert not decision.allowed
+
+    def test_evaluate_all_defaults_to_permissions_of_the_resource(
+        self, limited_access_auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": limited_access_auth_header})
+        )
+
+        assert evaluate_all(resource) == {
+            "test_res": {
+                "perm-name": Decision(ALLOW, {"allow": "*", "deny": None}),
+                "garbage": Decision(DENY, None),
+            }
+        }
+
+    def test_evaluate_all_many_resources_with_token_decoded_once(
+        self, auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": auth_header})
+        )
+
+        with patch("lbz.request.decode_jwt", wraps=decode_jwt) as mocked_decode_jwt:
+            decisions = evaluate_all(resource, {"orders": ["list", "delete"], "users": ["list"]})
+
+        assert decisions == {
+            "orders": {
+                "list": Decision(ALLOW, {"allow": "*", "deny": None}),
+                "delete": Decision(DENY, None),
+            },
+            "users": {"list": Decision(DENY, None)},
+        }
+        mocked_decode_jwt.assert_called_once_with(auth_header)
+
+    def test_decisions_can_be_dumped_into_response(
+        self, auth_header: str, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(
+            APIGatewayEvent("GET", "/", headers={"authorization": auth_header})
+        )
+
+        decisions = evaluate_all(resource, {"orders": ["list", "delete"]})
+        body = {name: decision.to_dict() for name, decision in decisions["orders"].items()}
+
+        assert json.loads(Response(body).to_dict()["body"]) == {
+            "list": {
+                "allowed": True,
+                "outcome": ALLOW,
+                "restrictions": {"allow": "*", "deny": None},
+            },
+            "delete": {"allowed": False, "outcome": DENY, "restrictions": None},
+        }
+
+    def test_evaluate_all_unauthorised(
+        self, sample_event: APIGatewayEvent, sample_resource_with_authorization: type[Resource]
+    ) -> None:
+        resource = sample_resource_with_authorization(sample_event)
+
+        with pytest.raises(Unauthorized):
+            evaluate_all(resource)
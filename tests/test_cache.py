@@ -0,0 +1,147 @@
+import json
+from http import HTTPStatus
+from unittest.mock import MagicMock
+
+import pytest
+
+from lbz.authz.authorizer import Authorizer
+from lbz.authz.decorators import authorization
+from lbz.cache import cache_response, get_response_cache
+from lbz.resource import Resource
+from lbz.response import Response
+from lbz.rest import APIGatewayEvent
+from lbz.router import add_route
+from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY
+
+
+class CountriesResource(Resource):
+    _name = "test_res"
+    loader = MagicMock(return_value=["PL", "DE"])
+
+    @add_route("/countries")
+    @add_route("/countries", method="POST")
+    @cache_response(ttl=60, vary_headers=["Accept-Language"])
+    def list_countries(self) -> Response:
+        if self.request.query_params.get("fail"):
+            return Response({"message": "failed"}, status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+        return Response({"countries": self.loader()})
+
+    @add_route("/countries/{code}")
+    @authorization("perm-name")
+    @cache_response(ttl=60, maxsize=1)
+    def get_country(self, code: str, restrictions: dict) -> Response:
+        return Response({"code": code, "restrictions": restrictions, "n": self.loader()})
+
+    @add_route("/orders")
+    @authorization("perm-name")
+    @cache_response(ttl=60)
+    def list_orders(self, restrictions: dict) -> Response:  # pylint: disable=unused-argument
+        return Response({"n": self.loader()})
+
+
+def get_countries(query_params: dict | None = None, headers: dict | None = None) -> Response:
+    event = APIGatewayEvent("GET", "/countries", query_params=query_params, headers=headers)
+    return CountriesResource(event)()
+
+
+class TestCacheResponse:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        get_response_cache(CountriesResource.list_countries).clear()
+        get_response_cache(CountriesResource.get_country).clear()
+        get_response_cache(CountriesResource.list_orders).clear()
+        CountriesResource.loader.reset_mock(side_effect=True)
+
+    def test_returns_cached_response_without_calling_handler_again(self) -> None:
+        first_response = get_countries()
+        second_response = get_countries()
+
+        assert first_response.to_dict() == second_response.to_dict()
+        assert first_response is not second_response
+        CountriesResource.loader.assert_called_once()
+        cache = get_response_cache(CountriesResource.list_countries)
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 128}
+
+    def test_returns_copies_of_cached_response(self) -> None:
+        get_countries().headers["X-Changed"] = "yes"
+
+        assert "X-Changed" not in get_countries().headers
+
+    def test_keys_responses_by_query_params_and_vary_headers(self) -> None:
+        get_countries(query_params={"page": "1"})
+        get_countries(query_params={"page": "2"})
+        get_countries(query_params={"page": "1"}, headers={"Accept-Language": "pl"})
+        get_countries(query_params={"page": "1"}, headers={"Accept-Language": "pl"})
+
+        assert CountriesResource.loader.call_count == 3
+
+    def test_does_not_cache_unsuccessful_responses(self) -> None:
+        get_countries(query_params={"fail": "1"})
+        get_countries(query_params={"fail": "1"})
+
+        assert len(get_response_cache(CountriesResource.list_countries)) == 0
+
+    def test_does_not_cache_responses_of_other_methods(self) -> None:
+        CountriesResource(APIGatewayEvent("POST", "/countries"))()
+        CountriesResource(APIGatewayEvent("POST", "/countries"))()
+
+        assert CountriesResource.loader.call_count == 2
+
+    def test_checks_permissions_before_returning_cached_response(
+        self, limited_access_auth_header: str
+    ) -> None:
+        headers = {"Authorization": limited_access_auth_header}
+        path_params = {"code": "pl"}
+
+        cached = CountriesResource(
+            APIGatewayEvent("GET", "/countries/{code}", path_params, headers=headers)
+        )()
+        response = CountriesResource(APIGatewayEvent("GET", "/countries/{code}", path_params))()
+
+        assert cached.status_code == HTTPStatus.OK
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        CountriesResource.loader.assert_called_once()
+
+    def test_keys_responses_by_path_params_and_evicts_least_recently_used(
+        self, limited_access_auth_header: str
+    ) -> None:
+        headers = {"Authorization": limited_access_auth_header}
+        for code in ("pl", "de", "pl"):
+            CountriesResource(
+                APIGatewayEvent("GET", "/countries/{code}", {"code": code}, headers=headers)
+            )()
+
+        assert CountriesResource.loader.call_count == 3
+
+    @pytest.mark.parametrize("restriction", [{"owner": "self"}, "self", {"owner": ["self"]}])
+    def test_keys_responses_by_requester_when_restricted_to_self(
+        self, jwt_partial_payload: dict, restriction: dict | str
+    ) -> None:
+        CountriesResource.loader.side_effect = [1, 2, 3]
+        role = {"allow": {"test_res": {"perm-name": {"allow": restriction}}}, "deny": {}}
+        owners = ["alice", "bob", "alice"]
+        tokens = [
+            Authorizer.sign_authz(
+                {**jwt_partial_payload, **role, "username": owner}, SAMPLE_PRIVATE_KEY
+            )
+            for owner in owners
+        ]
+
+        bodies = [
+            CountriesResource(
+                APIGatewayEvent("GET", "/orders", headers={"Authorization": token})
+            )().to_dict()["body"]
+            for token in tokens
+        ]
+
+        assert [json.loads(body)["n"] for body in bodies] == [1, 2, 1]
+
+    def test_raises_when_placed_above_authorization(self) -> None:
+        with pytest.raises(ValueError, match="must be placed below authorization"):
+
+            class WrongResource(Resource):  # pylint: disable=unused-variable
+                @add_route("/")
+                @cache_response(ttl=60)
+                @authorization()
+                def handler(self, restrictions: dict) -> Response:
+                    return Response(dict(restrictions))
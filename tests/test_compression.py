@@ -0,0 +1,119 @@
+import gzip
+import tracemalloc
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from lbz.compression import (
+    BROTLI,
+    GZIP,
+    ZSTD,
+    compress,
+    decompress,
+    get_available_encodings,
+    negotiate,
+    parse_accept_encoding,
+)
+
+
+def test__parse_accept_encoding__reads_quality_values() -> None:
+    assert parse_accept_encoding("gzip;q=0.5, BR, zstd;q=x, , *;q=0") == {
+        "gzip": 0.5,
+        "br": 1.0,
+        "zstd": 0.0,
+        "*": 0.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", GZIP),
+        ("gzip, br", BROTLI),
+        ("gzip, br;q=0.5", GZIP),
+        ("gzip;q=0, br;q=0", None),
+        ("*", BROTLI),
+        ("*, br;q=0", ZSTD),
+    ],
+)
+def test__negotiate__picks_accepted_encoding_with_highest_quality(
+    accept_encoding: str | None, expected: str | None
+) -> None:
+    assert negotiate(accept_encoding, [BROTLI, ZSTD, GZIP]) == expected
+
+
+def test__get_available_encodings__skips_encodings_without_their_modules() -> None:
+    with patch("lbz.compression.find_spec", return_value=None):
+        assert get_available_encodings() == (GZIP,)
+
+
+def test__compress__produces_gzip_readable_data() -> None:
+    assert gzip.decompress(compress(b"x" * 100, GZIP)) == b"x" * 100
+
+
+def test__decompress__accepts_gzip_and_zlib_data() -> None:
+    assert decompress(gzip.compress(b"data"), GZIP, max_size=10) == b"data"
+    assert decompress(zlib.compress(b"data"), "GZIP", max_size=10) == b"data"
+
+
+def test__decompress__raises_when_data_exceeds_size_limit() -> None:
+    with pytest.raises(ValueError, match="exceeds the size limit"):
+        decompress(gzip.compress(b"x" * 100), GZIP, max_size=99)
+
+
+def test__decompress__raises_when_data_is_invalid() -> None:
+    with pytest.raises(ValueError, match="Invalid gzip data"):
+        decompress(b"not gzip", GZIP, max_size=100)
+
+
+def test__decompress__raises_when_encoding_is_unsupported() -> None:
+    with pytest.raises(ValueError, match="Unsupported content encoding: compress"):
+        decompress(b"data", "compress", max_size=100)
+
+
+@pytest.mark.parametrize("encoding", [BROTLI, ZSTD, GZIP])
+class TestCodecs:
+    def test_round_trip(self, encoding: str) -> None:
+        data = b'{"items": ["x", "y"]}' * 100
+
+        assert len(compressed := compress(data, encoding)) < len(data)
+        assert decompress(compressed, encoding, max_size=len(data)) == data
+
+    def test_decompression_bombs_are_stopped_at_size_limit(self, encoding: str) -> None:
+        bomb = compress(b" " * 64 * 1024 * 1024, encoding)
+
+        tracemalloc.start()
+        try:
+            with pytest.raises(ValueError, match="exceeds the size limit"):
+                decompress(bomb, encoding, max_size=1024)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < 8 * 1024 * 1024
+
+    def test_truncated_data_is_invalid(self, encoding: str) -> None:
+        with pytest.raises(ValueError):
+            decompress(compress(b"x" * 100, encoding)[:-4], encoding, max_size=1000)
+
+
+@pytest.mark.parametrize("encoding", [ZSTD, GZIP])
+class TestConcatenatedCodecs:
+    def test_all_members_are_decompressed(self, encoding: str) -> None:
+        data = compress(b"first,", encoding) + compress(b"second", encoding)
+
+        assert decompress(data, encoding, max_size=12) == b"first,second"
+
+    def test_size_limit_covers_all_members(self, encoding: str) -> None:
+        data = compress(b"first,", encoding) + compress(b"second", encoding)
+
+        with pytest.raises(ValueError, match="exceeds the size limit"):
+            decompress(data, encoding, max_size=11)
+
+    def test_trailing_data_is_invalid(self, encoding: str) -> None:
+        with pytest.raises(ValueError):
+            decompress(compress(b"data", encoding) + b"garbage", encoding, max_size=100)
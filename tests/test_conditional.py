@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from lbz.conditional import (
+    compute_etag,
+    etag_matches,
+    format_http_date,
+    is_not_modified,
+    parse_http_date,
+    quote_etag,
+    weaken_etag,
+)
+
+LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def test__compute_etag__returns_quoted_hash_of_data() -> None:
+    etag = compute_etag(b"data")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert len(etag) == 34
+    assert etag == compute_etag(b"data") != compute_etag(b"other data")
+    assert compute_etag(b"data", weak=True) == f"W/{etag}"
+
+
+@pytest.mark.parametrize(
+    "etag, expected",
+    [("v1", '"v1"'), ('"v1"', '"v1"'), ('W/"v1"', 'W/"v1"')],
+)
+def test__quote_etag__quotes_only_unquoted_tags(etag: str, expected: str) -> None:
+    assert quote_etag(etag) == expected
+
+
+def test__weaken_etag__marks_etag_as_weak_once() -> None:
+    assert weaken_etag('"v1"') == 'W/"v1"'
+    assert weaken_etag('W/"v1"') == 'W/"v1"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match, etag, expected",
+    [
+        ('"v1"', '"v1"', True),
+        ('"v0", W/"v1"', '"v1"', True),
+        ('"v1"', 'W/"v1"', True),
+        ("*", '"v1"', True),
+        ('"v0"', '"v1"', False),
+        ('"v1', '"v1"', False),
+    ],
+)
+def test__etag_matches__uses_weak_comparison(
+    if_none_match: str, etag: str, expected: bool
+) -> None:
+    assert etag_matches(if_none_match, etag) is expected
+
+
+def test__format_http_date__formats_dates_in_gmt() -> None:
+    assert format_http_date(datetime(2015, 10, 21, 7, 28)) == LAST_MODIFIED
+    warsaw = timezone(timedelta(hours=2))
+    assert format_http_date(datetime(2015, 10, 21, 9, 28, tzinfo=warsaw)) == LAST_MODIFIED
+
+
+def test__parse_http_date__returns_none_for_invalid_dates() -> None:
+    assert parse_http_date(LAST_MODIFIED) == datetime(2015, 10, 21, 7, 28, tzinfo=timezone.utc)
+    assert parse_http_date("yesterday") is None
+
+
+@pytest.mark.parametrize(
+    "headers, etag, last_modified, expected",
+    [
+        ({}, '"v1"', LAST_MODIFIED, False),
+        ({"If-None-Match": '"v1"'}, '"v1"', None, True),
+        ({"If-None-Match": '"v1"'}, None, None, False),
+        ({"If-Modified-Since": LAST_MODIFIED}, None, LAST_MODIFIED, True),
+        ({"If-Modified-Since": "Thu, 22 Oct 2015 07:28:00 GMT"}, None, LAST_MODIFIED, True),
+        ({"If-Modified-Since": "Tue, 20 Oct 2015 07:28:00 GMT"}, None, LAST_MODIFIED, False),
+        ({"If-Modified-Since": "yesterday"}, None, LAST_MODIFIED, False),
+        ({"If-Modified-Since": LAST_MODIFIED}, None, None, False),
+        # If-None-Match takes precedence over If-Modified-Since
+        (
+            {"If-None-Match": '"v0"', "If-Modified-Since": LAST_MODIFIED},
+            '"v1"',
+            LAST_MODIFIED,
+            False,
+        ),
+    ],
+)
+def test__is_not_modified__evaluates_conditional_headers(
+    headers: dict, etag: str | None, last_modified: str | None, expected: bool
+) -> None:
+    assert is_not_modified(headers, etag, last_modified) is expected
@@ -2,9 +2,20 @@
 from lbz.dev.test import Client
 from lbz.resource import Resource
 from lbz.response import Response
+from lbz.router import add_route
 
 
 def test_client(sample_resource: type[Resource]) -> None:
     client = Client(sample_resource)
     resp = client.get("/")
     assert isinstance(resp, Response)
+
+
+def test_client_resolves_concrete_uri() -> None:
+    class XResource(Resource):
+        @add_route("/t/{id}", method="GET")
+        def get(self, id: str) -> Response:  # pylint: disable=redefined-builtin
+            return Response({"id": id})
+
+    resp = Client(XResource).get("/t/123")
+    assert resp.body == {"id": "123"}
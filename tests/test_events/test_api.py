@@ -1,6 +1,9 @@
+import json
 import logging
-from collections.abc import Callable
-from unittest.mock import MagicMock, patch
+import threading
+import time
+from collections.abc import Callable, Iterable
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import pytest
 from pytest import LogCaptureFixture
@@ -15,6 +18,20 @@ class MyTestEvent(Event):
     type = "MY_TEST_EVENT"
 
 
+def put_events_response(entries: list[dict], failed: Iterable[int] = ()) -> dict:
+    results = [
+        {"ErrorCode": "InternalFailure"} if index in failed else {"EventId": str(index)}
+        for index in range(len(entries))
+    ]
+    return {"FailedEntryCount": len(set(failed)), "Entries": results}
+
+
+def eventbridge_mock() -> MagicMock:
+    mock = MagicMock()
+    mock.put_events.side_effect = lambda **kwargs: put_events_response(kwargs["Entries"])
+    return mock
+
+
 class TestEventAPI:
     def setup_method(self) -> None:
         # pylint: disable= attribute-defined-outside-init
@@ -23,7 +40,7 @@ class TestEventAPI:
     def teardown_method(self, _test_method: Callable) -> None:
         Singleton.drop_instance(cls=EventAPI)
 
-    @patch.object(Boto3Client, "eventbridge", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", eventbridge_mock())
     def test___repr__(self) -> None:
         expected_repr = (
             "<EventAPI bus: million-dollar-lambda-event-bus Events: pending=0 sent=0 failed=0>"
@@ -41,7 +58,7 @@ class TestEventAPI:
         )
         assert str(self.event_api) == expected_repr
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test_settters(self, mock_send: MagicMock) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -78,6 +95,15 @@ class TestEventAPI:
 
         assert self.event_api.failed_events == []
 
+    def test__pending_events__shares_frozen_events_copying_mutable_ones(self) -> None:
+        self.event_api.register(frozen_event := MyTestEvent({"x": 0}, frozen=True))
+        self.event_api.register(event := MyTestEvent({"x": 0}))
+
+        pending_events = self.event_api.pending_events
+
+        assert pending_events[0] is frozen_event
+        assert pending_events[1] == event and pending_events[1] is not event
+
     def test_register_saves_event_in_right_place(self) -> None:
         assert self.event_api.pending_events == []
 
@@ -89,7 +115,7 @@ class TestEventAPI:
 
         assert self.event_api.pending_events == [event_1, event_2]
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test_send(self, mock_send: MagicMock) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -109,7 +135,7 @@ class TestEventAPI:
         )
         assert self.event_api.sent_events == [event]
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test__send__sends_events_in_chunks_respecting_limits(self, mock_send: MagicMock) -> None:
         for i in range(33):  # AWS allows sending maximum 10 events at once
             self.event_api.register(MyTestEvent({"x": i}))
@@ -125,16 +151,110 @@ class TestEventAPI:
         assert not self.event_api.pending_events
         assert not self.event_api.failed_events
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send__packs_chunks_by_size(self, mock_send: MagicMock) -> None:
+        for i in range(5):
+            self.event_api.register(MyTestEvent({"x": i, "data": "a" * 100 * 1024}))
+
+        self.event_api.send()
+
+        assert sorted(len(c.kwargs["Entries"]) for c in mock_send.put_events.call_args_list) == [
+            1,
+            2,
+            2,
+        ]
+        assert len(self.event_api.sent_events) == 5
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send__fails_events_too_big_to_be_sent(
+        self, mock_send: MagicMock, caplog: LogCaptureFixture
+    ) -> None:
+        too_big_event = MyTestEvent({"data": "a" * 256 * 1024})
+        self.event_api.register(MyTestEvent({"x": 1}))
+        self.event_api.register(too_big_event)
+
+        with pytest.raises(RuntimeError):
+            self.event_api.send()
+
+        assert mock_send.put_events.call_count == 1
+        assert self.event_api.sent_events == [MyTestEvent({"x": 1})]
+        assert self.event_api.failed_events == [too_big_event]
+        assert "Event MY_TEST_EVENT is too big to be sent" in caplog.text
+
+    @patch("lbz.events.api.time.sleep")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send__retries_only_failed_entries_with_jittered_backoff(
+        self, mock_send: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        mock_send.put_events.side_effect = [
+            put_events_response([{}] * 4, failed=[1, 3]),
+            put_events_response([{}] * 2, failed=[1]),
+            put_events_response([{}], failed=[0]),
+        ]
+        events = [MyTestEvent({"x": i}) for i in range(4)]
+        for event in events:
+            self.event_api.register(event)
+
+        with pytest.raises(RuntimeError):
+            self.event_api.send()
+
+        sent_details = [
+            [entry["Detail"] for entry in c.kwargs["Entries"]]
+            for c in mock_send.put_events.call_args_list
+        ]
+        assert sent_details == [
+            ['{"x": 0}', '{"x": 1}', '{"x": 2}', '{"x": 3}'],
+            ['{"x": 1}', '{"x": 3}'],
+            ['{"x": 3}'],
+        ]
+        assert self.event_api.sent_events == [events[0], events[1], events[2]]
+        assert self.event_api.failed_events == [events[3]]
+        assert mock_sleep.call_count == 2
+        assert 0 <= mock_sleep.call_args_list[0].args[0] <= 0.1
+        assert 0 <= mock_sleep.call_args_list[1].args[0] <= 0.2
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send__sends_chunks_concurrently(self, mock_send: MagicMock) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def put_events(Entries: list[dict]) -> dict:  # pylint: disable=invalid-name
+            barrier.wait()
+            return put_events_response(Entries)
+
+        mock_send.put_events.side_effect = put_events
+        for i in range(30):
+            self.event_api.register(MyTestEvent({"x": i}))
+
+        self.event_api.send()
+
+        assert self.event_api.sent_events == [MyTestEvent({"x": i}) for i in range(30)]
+
+    def test__send__gets_client_once_before_sending_chunks_concurrently(self) -> None:
+        client_mock = eventbridge_mock()
+        for i in range(30):
+            self.event_api.register(MyTestEvent({"x": i}))
+
+        with patch.object(
+            Boto3Client, "eventbridge", new_callable=PropertyMock, return_value=client_mock
+        ) as eventbridge_property:
+            self.event_api.send()
+
+        eventbridge_property.assert_called_once_with()
+        assert client_mock.put_events.call_count == 3
+
+    @patch("lbz.events.api.time.sleep", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test__send__always_tries_to_send_all_events_treating_each_chunk_individually(
         self, mock_send: MagicMock, caplog: LogCaptureFixture
     ) -> None:
-        mock_send.put_events.side_effect = (
-            None,  # no error == success
-            ValueError("Event data is too big to be sent"),
-            None,  # no error == success
-            ValueError("Event type cannot be recognized"),
-        )
+        def put_events(Entries: list[dict]) -> dict:  # pylint: disable=invalid-name
+            if json.loads(Entries[0]["Detail"])["x"] == 10:
+                raise ValueError("Event data is too big to be sent")
+            if json.loads(Entries[0]["Detail"])["x"] == 30:
+                raise ValueError("Event type cannot be recognized")
+            return put_events_response(Entries)
+
+        mock_send.put_events.side_effect = put_events
         for i in range(33):  # AWS allows sending maximum 10 events at once
             self.event_api.register(MyTestEvent({"x": i}))
 
@@ -142,16 +262,148 @@ class TestEventAPI:
         with pytest.raises(RuntimeError, match=error_message):
             self.event_api.send()
 
-        assert mock_send.put_events.call_count == 4
-        assert len(self.event_api.sent_events) == 20
+        assert mock_send.put_events.call_count == 2 + 2 * 3  # failed chunks were retried
+        assert self.event_api.sent_events == [
+            MyTestEvent({"x": i}) for i in (*range(10), *range(20, 30))
+        ]
         assert not self.event_api.pending_events
-        assert len(self.event_api.failed_events) == 13
-        assert caplog.record_tuples == [
+        assert self.event_api.failed_events == [
+            MyTestEvent({"x": i}) for i in (*range(10, 20), *range(30, 33))
+        ]
+        assert sorted(caplog.record_tuples) == [
             ("lbz.events.api", logging.ERROR, "Event data is too big to be sent"),
             ("lbz.events.api", logging.ERROR, "Event type cannot be recognized"),
         ]
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch("lbz.events.api.time.sleep", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send_in_background__sends_events_until_joined(self, mock_send: MagicMock) -> None:
+        started, release = threading.Event(), threading.Event()
+
+        def put_events(Entries: list[dict]) -> dict:  # pylint: disable=invalid-name
+            started.set()
+            release.wait(5)
+            return put_events_response(Entries)
+
+        mock_send.put_events.side_effect = put_events
+        self.event_api.register(MyTestEvent({"x": 1}))
+
+        self.event_api.send_in_background()
+        assert started.wait(5)
+        assert self.event_api.sent_events == []
+        release.set()
+
+        assert self.event_api.join()
+        assert self.event_api.sent_events == [MyTestEvent({"x": 1})]
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__join__waits_until_lambda_is_about_to_time_out(
+        self, mock_send: MagicMock, caplog: LogCaptureFixture
+    ) -> None:
+        release = threading.Event()
+        mock_send.put_events.side_effect = lambda **kwargs: release.wait(5) and {}
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 250
+        self.event_api.register(MyTestEvent({"x": 1}))
+        self.event_api.send_in_background()
+
+        assert not self.event_api.join(context)
+        assert "Sending events has not finished before the deadline" in caplog.text
+        release.set()
+        assert self.event_api.join()
+
+    @patch("lbz.events.api.time.sleep", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send_in_background__reports_errors_to_error_handler(
+        self, mock_send: MagicMock
+    ) -> None:
+        mock_send.put_events.side_effect = NotADirectoryError
+        error_handler = MagicMock()
+        self.event_api.set_error_handler(error_handler)
+        self.event_api.register(MyTestEvent({"x": 1}))
+
+        self.event_api.send_in_background()
+        self.event_api.join()
+
+        error_handler.assert_called_once()
+        assert isinstance(error_handler.call_args.args[0], RuntimeError)
+        assert self.event_api.failed_events == [MyTestEvent({"x": 1})]
+
+    @patch("lbz.events.api.time.sleep", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send_in_background__logs_errors_by_default(
+        self, mock_send: MagicMock, caplog: LogCaptureFixture
+    ) -> None:
+        mock_send.put_events.side_effect = NotADirectoryError
+        self.event_api.register(MyTestEvent({"x": 1}))
+
+        self.event_api.send_in_background()
+        self.event_api.join()
+
+        assert "Sending events in the background has failed" in caplog.text
+
+    @pytest.mark.parametrize("remaining_ms", [10000, 250])
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__join__waits_at_most_timeout_and_until_lambda_is_about_to_time_out(
+        self, mock_send: MagicMock, remaining_ms: int
+    ) -> None:
+        release = threading.Event()
+        mock_send.put_events.side_effect = lambda **kwargs: release.wait(5) and {}
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = remaining_ms
+        self.event_api.register(MyTestEvent({"x": 1}))
+        self.event_api.send_in_background()
+
+        started_at = time.monotonic()
+        assert not self.event_api.join(context, timeout=0.1)
+        assert time.monotonic() - started_at < 1
+        release.set()
+        assert self.event_api.join()
+
+    @patch("lbz.events.api.PREVIOUS_SENDING_TIMEOUT", 0.1)
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send_in_background__waits_for_previous_sending_at_most_timeout(
+        self, mock_send: MagicMock
+    ) -> None:
+        release = threading.Event()
+        mock_send.put_events.side_effect = lambda **kwargs: release.wait(5) and {}
+        self.event_api.register(MyTestEvent({"x": 1}))
+        self.event_api.send_in_background()
+        self.event_api.register(MyTestEvent({"x": 2}))
+
+        started_at = time.monotonic()
+        self.event_api.send_in_background()
+
+        assert time.monotonic() - started_at < 1
+        assert self.event_api.pending_events == []
+        release.set()
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test__send_in_background__reports_events_in_lists_of_its_start(
+        self, mock_send: MagicMock
+    ) -> None:
+        release = threading.Event()
+        put_events = mock_send.put_events.side_effect
+        mock_send.put_events.side_effect = lambda **kwargs: release.wait(5) and put_events(
+            **kwargs
+        )
+        self.event_api.register(MyTestEvent({"x": 1}))
+        self.event_api.send_in_background()
+
+        assert self.event_api.pending_events == []
+        self.event_api.register(pending := MyTestEvent({"x": 2}))
+        self.event_api.clear_sent()
+        release.set()
+
+        assert self.event_api.join()
+        assert self.event_api.sent_events == []
+        assert self.event_api.pending_events == [pending]
+        assert len(mock_send.put_events.call_args.kwargs["Entries"]) == 1
+
+    def test__join__does_nothing_when_nothing_is_sent_in_background(self) -> None:
+        assert self.event_api.join(MagicMock())
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test_sent_fail_saves_events_in_right_place(self, mock_send: MagicMock) -> None:
         assert self.event_api.failed_events == []
 
@@ -164,7 +416,7 @@ class TestEventAPI:
 
         assert self.event_api.failed_events == [event]
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test_send_no_events(self, mock_send: MagicMock) -> None:
         self.event_api.send()
 
@@ -173,7 +425,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == []
         assert self.event_api.pending_events == []
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test_singleton_pattern_working_correctly_for_event_api(self, mock_send: MagicMock) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -198,11 +450,14 @@ class TestEventAPI:
             ]
         )
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch("lbz.events.api.time.sleep", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test__send__raises_error_only_when_particular_attempt_failed(
         self, mock_send: MagicMock
     ) -> None:
-        mock_send.put_events.side_effect = [NotADirectoryError, None]
+        mock_send.put_events.side_effect = [NotADirectoryError] * 3 + [
+            put_events_response([{}, {}])
+        ]
         event = MyTestEvent({"x": 1})
 
         self.event_api.register(event)
@@ -216,7 +471,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == [event, event]
         assert self.event_api.pending_events == []
 
-    @patch.object(Boto3Client, "eventbridge", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", eventbridge_mock())
     def test__send__continuously_extends_lists_of_events_during_next_attempts(self) -> None:
         event_1 = MyTestEvent({"x": 1})
         event_2 = MyTestEvent({"x": 1})
@@ -232,7 +487,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == [event_1, event_2, event_3]
         assert self.event_api.pending_events == []
 
-    @patch.object(Boto3Client, "eventbridge", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", eventbridge_mock())
     def test_clear(self) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -245,7 +500,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == []
         assert self.event_api.pending_events == []
 
-    @patch.object(Boto3Client, "eventbridge", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", eventbridge_mock())
     def test__clear_pending__clears_only_pending_events(self) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -258,7 +513,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == [event]
         assert self.event_api.pending_events == []
 
-    @patch.object(Boto3Client, "eventbridge", MagicMock())
+    @patch.object(Boto3Client, "eventbridge", eventbridge_mock())
     def test__clear_sent__clears_only_sent_events(self) -> None:
         event = MyTestEvent({"x": 1})
         self.event_api.register(event)
@@ -271,7 +526,7 @@ class TestEventAPI:
         assert self.event_api.sent_events == []
         assert self.event_api.pending_events == [event]
 
-    @patch.object(Boto3Client, "eventbridge")
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
     def test__clear_failed__clears_only_failed_events(self, mock_send: MagicMock) -> None:
         mock_send.put_events.side_effect = NotADirectoryError
         event = MyTestEvent({"x": 1})
@@ -287,7 +542,7 @@ class TestEventAPI:
         assert self.event_api.pending_events == [event]
 
 
-@patch.object(Boto3Client, "eventbridge", MagicMock())
+@patch.object(Boto3Client, "eventbridge", eventbridge_mock())
 class TestEventEmitter:
     def test_does_nothing_when_thera_are_no_pending_events(self) -> None:
         @event_emitter
@@ -29,6 +29,13 @@ class TestBaseEventBroker:
         func_1.assert_called_once_with(expected_event)
         func_2.assert_called_once_with(expected_event)
 
+    def test_broker_keeps_id_of_the_event(self) -> None:
+        event = {"my-type": "x", "data": {"y": 1}, "id": "event-id"}
+
+        broker = BaseEventBroker({}, event, LambdaContext(), type_key="my-type", data_key="data")
+
+        assert broker.event.id == "event-id"
+
     def test_broker_raises_not_implemented_when_event_type_is_not_recognized(self) -> None:
         func_1 = MagicMock()
         func_2 = MagicMock()
@@ -96,6 +103,24 @@ class TestBaseEventBroker:
 
         assert passed_events == expected_events
 
+    def test_broker_passes_the_same_frozen_event_to_all_handlers(self) -> None:
+        passed_events: list[Event] = []
+        mapper: dict[str, list] = {"x": [passed_events.append, passed_events.append]}
+
+        class FrozenEventBroker(BaseEventBroker):
+            frozen_events = True
+
+        FrozenEventBroker(
+            mapper,
+            {"my-type": "x", "data": {"y": 1}},
+            LambdaContext(),
+            type_key="my-type",
+            data_key="data",
+        ).react()
+
+        assert passed_events[0] is passed_events[1]
+        assert passed_events[0].frozen
+
 
 class TestCognitoEventBroker:
     def test_broker_works_properly(self) -> None:
@@ -1,4 +1,10 @@
+from copy import deepcopy
+from unittest.mock import patch
+
+import pytest
+
 from lbz.events.event import Event
+from lbz.misc import FrozenSequence
 
 
 class MyTestEvent(Event):
@@ -34,3 +40,62 @@ class TestEvent:
         new_event_2 = MySecondTestEvent({"x": 1})
 
         assert new_event_1 != new_event_2
+
+    def test_events_have_unique_ids_unless_given(self) -> None:
+        assert MyTestEvent({"x": 1}).id != MyTestEvent({"x": 1}).id
+        assert MyTestEvent({"x": 1}, event_id="event-id").id == "event-id"
+
+
+class TestFrozenEvent:
+    def test_data_is_read_only(self) -> None:
+        event = MyTestEvent({"x": {"y": [1, {"z": 2}]}}, frozen=True)
+
+        assert event.data == {"x": {"y": [1, {"z": 2}]}}
+        assert event.data["x"]["y"][1]["z"] == 2
+        assert isinstance(event.data["x"]["y"], FrozenSequence)
+        with pytest.raises(TypeError):
+            event.data["x"] = 1
+        with pytest.raises(TypeError):
+            event.data["x"]["y"][0] = 3  # type: ignore[index]
+        with pytest.raises(TypeError):
+            event.data = {}
+
+    def test_data_can_be_forwarded_to_new_event(self) -> None:
+        frozen = MyTestEvent({"a": {"b": [1, 2]}}, frozen=True)
+
+        event = Event(frozen.data, event_type="Y")
+        event.data["a"]["b"].append(3)
+
+        assert event.serialized_data == '{"a": {"b": [1, 2, 3]}}'
+        assert frozen.serialized_data == '{"a": {"b": [1, 2]}}'
+        assert Event(frozen.data, event_type="Y", frozen=True) == Event(
+            frozen.data, event_type="Y"
+        )
+
+    def test_equals_mutable_event(self) -> None:
+        assert MyTestEvent({"x": [1]}, frozen=True) == MyTestEvent({"x": [1]})
+
+    def test_is_hashable_unlike_mutable_event(self) -> None:
+        event = MyTestEvent({"x": [1], "y": {"z": 1}}, frozen=True)
+
+        assert hash(event) == hash(MyTestEvent({"y": {"z": 1}, "x": [1]}, frozen=True))
+        assert len({event, MyTestEvent({"x": [1], "y": {"z": 1}}).freeze()}) == 1
+        with pytest.raises(TypeError, match="unhashable mutable event: MY_TEST_EVENT"):
+            hash(MyTestEvent({"x": 1}))
+
+    def test_data_is_serialized_once(self) -> None:
+        event = MyTestEvent({"x": 1}, frozen=True)
+
+        with patch.object(MyTestEvent, "serialize", return_value='{"x": 1}') as serialize:
+            assert event.serialized_data == event.serialized_data == '{"x": 1}'
+
+        serialize.assert_called_once_with({"x": 1})
+
+    def test_is_shared_instead_of_copied(self) -> None:
+        frozen_event = MyTestEvent({"x": [1]}, frozen=True)
+        event = MyTestEvent({"x": [1]})
+
+        assert deepcopy(frozen_event) is frozen_event
+        assert (copied := deepcopy(event)) == event
+        assert copied.data["x"] is not event.data["x"]
+        assert copied.id == event.id
@@ -0,0 +1,270 @@
+import time
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pytest import LogCaptureFixture
+
+from lbz.aws_boto3 import Boto3Client
+from lbz.events.api import EventAPI
+from lbz.events.event import Event
+from lbz.events.outbox import MAX_AGE, DynamoDBOutboxStore, Outbox, SQLiteOutboxStore
+from lbz.misc import Singleton
+from tests.test_events.test_api import eventbridge_mock, put_events_response
+
+
+class MyTestEvent(Event):
+    type = "MY_TEST_EVENT"
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path: Path) -> SQLiteOutboxStore:
+    return SQLiteOutboxStore(str(tmp_path / "outbox.sqlite3"))
+
+
+class TestSQLiteOutboxStore:
+    def test_events_are_restored_oldest_first(self, store: SQLiteOutboxStore) -> None:
+        events = [MyTestEvent({"x": index}) for index in range(3)]
+
+        store.put(events)
+
+        restored = store.get(10)
+        assert restored == events
+        assert [event.id for event in restored] == [event.id for event in events]
+        assert store.get(2) == events[:2]
+
+    def test_events_are_stored_once(self, store: SQLiteOutboxStore) -> None:
+        event = MyTestEvent({"x": 1})
+
+        store.put([event])
+        store.put([event, event])
+
+        assert store.get(10) == [event]
+
+    def test_delete(self, store: SQLiteOutboxStore) -> None:
+        events = [MyTestEvent({"x": index}) for index in range(3)]
+        store.put(events)
+
+        store.delete([events[0].id, events[2].id, "unknown"])
+
+        assert store.get(10) == [events[1]]
+
+    def test_events_survive_new_store(self, store: SQLiteOutboxStore) -> None:
+        store.put([event := MyTestEvent({"x": 1})])
+
+        assert SQLiteOutboxStore(store.path).get(10) == [event]
+
+    def test_expired_events_are_dropped(
+        self, store: SQLiteOutboxStore, caplog: LogCaptureFixture
+    ) -> None:
+        with patch("lbz.events.outbox.time.time", return_value=time.time() - MAX_AGE - 1):
+            store.put([expired := MyTestEvent({"x": 1})])
+        store.put([event := MyTestEvent({"x": 2})])
+
+        assert store.get(10) == [event]
+        assert store.get(10) == [event]
+        assert f"Dropped 1 expired events from the outbox: ['{expired.id}']" in caplog.text
+
+
+class TestDynamoDBOutboxStore:
+    @patch.object(Boto3Client, "dynamodb")
+    def test_put_writes_chunks_retrying_unprocessed_items(self, dynamodb_mock: MagicMock) -> None:
+        events = [MyTestEvent({"x": index}) for index in range(30)]
+        unprocessed = {"UnprocessedItems": {"outbox": ["unprocessed-item"]}}
+        dynamodb_mock.batch_write_item.side_effect = [unprocessed, {}, {}]
+
+        DynamoDBOutboxStore("outbox").put(events)
+
+        assert [
+            len(c.kwargs["RequestItems"]["outbox"])
+            for c in dynamodb_mock.batch_write_item.call_args_list
+        ] == [
+            25,
+            1,
+            5,
+        ]
+        assert dynamodb_mock.batch_write_item.call_args_list[1].kwargs["RequestItems"] == {
+            "outbox": ["unprocessed-item"]
+        }
+        item = dynamodb_mock.batch_write_item.call_args_list[0].kwargs["RequestItems"]["outbox"][
+            0
+        ]["PutRequest"]
+        assert item["Item"]["id"] == {"S": events[0].id}
+        assert item["Item"]["data"] == {"S": '{"x": 0}'}
+
+    @patch.object(Boto3Client, "dynamodb")
+    def test_put_fails_when_items_stay_unprocessed(self, dynamodb_mock: MagicMock) -> None:
+        dynamodb_mock.batch_write_item.return_value = {
+            "UnprocessedItems": {"outbox": ["unprocessed-item"]}
+        }
+
+        with pytest.raises(RuntimeError, match="Writing 1 items to outbox has failed"):
+            DynamoDBOutboxStore("outbox").put([MyTestEvent({"x": 1})])
+
+        assert dynamodb_mock.batch_write_item.call_count == 3
+
+    @patch.object(Boto3Client, "dynamodb")
+    def test_get_restores_oldest_events_first(self, dynamodb_mock: MagicMock) -> None:
+        now = time.time()
+        dynamodb_mock.scan.return_value = {
+            "Items": [
+                {
+                    "id": {"S": f"id-{index}"},
+                    "type": {"S": "MY_TEST_EVENT"},
+                    "data": {"S": f'{{"x": {index}}}'},
+                    "created_at": {"N": str(created_at)},
+                }
+                for index, created_at in enumerate([now - 10, now - 20.5])
+            ]
+        }
+
+        events = DynamoDBOutboxStore("outbox").get(10)
+
+        assert events == [MyTestEvent({"x": 1}), MyTestEvent({"x": 0})]
+        assert [event.id for event in events] == ["id-1", "id-0"]
+        dynamodb_mock.scan.assert_called_once_with(TableName="outbox", Limit=10)
+        dynamodb_mock.batch_write_item.assert_not_called()
+
+    @patch.object(Boto3Client, "dynamodb")
+    def test_get_drops_expired_events(
+        self, dynamodb_mock: MagicMock, caplog: LogCaptureFixture
+    ) -> None:
+        dynamodb_mock.scan.return_value = {
+            "Items": [
+                {
+                    "id": {"S": f"id-{index}"},
+                    "type": {"S": "MY_TEST_EVENT"},
+                    "data": {"S": f'{{"x": {index}}}'},
+                    "created_at": {"N": str(created_at)},
+                }
+                for index, created_at in enumerate([time.time(), time.time() - MAX_AGE - 1])
+            ]
+        }
+        dynamodb_mock.batch_write_item.return_value = {}
+
+        assert DynamoDBOutboxStore("outbox").get(10) == [MyTestEvent({"x": 0})]
+        dynamodb_mock.batch_write_item.assert_called_once_with(
+            RequestItems={"outbox": [{"DeleteRequest": {"Key": {"id": {"S": "id-1"}}}}]}
+        )
+        assert "Dropped 1 expired events from the outbox: ['id-1']" in caplog.text
+
+    @patch.object(Boto3Client, "dynamodb")
+    def test_delete(self, dynamodb_mock: MagicMock) -> None:
+        dynamodb_mock.batch_write_item.return_value = {}
+
+        DynamoDBOutboxStore("outbox").delete(["id-1"])
+
+        dynamodb_mock.batch_write_item.assert_called_once_with(
+            RequestItems={"outbox": [{"DeleteRequest": {"Key": {"id": {"S": "id-1"}}}}]}
+        )
+
+
+class TestOutbox:
+    def test_store_is_read_again_only_after_saving(self, store: SQLiteOutboxStore) -> None:
+        outbox = Outbox(store)
+        with patch.object(store, "get", wraps=store.get) as get_mock:
+            assert outbox.take() == []
+            assert outbox.take() == []
+            outbox.save([event := MyTestEvent({"x": 1})])
+            assert outbox.take() == [event]
+
+        assert get_mock.call_count == 2
+
+    def test_store_is_read_again_after_check_interval(self, store: SQLiteOutboxStore) -> None:
+        timer = MagicMock(return_value=100.0)
+        outbox = Outbox(store, check_interval=60, timer=timer)
+        assert outbox.take() == []
+        store.put([event := MyTestEvent({"x": 1})])  # e.g. by another container
+
+        assert outbox.take() == []
+        timer.return_value = 160.0
+        assert outbox.take() == [event]
+
+    def test_store_is_read_again_after_returning_events(self, store: SQLiteOutboxStore) -> None:
+        outbox = Outbox(store, replay_limit=2)
+        outbox.save([event := MyTestEvent({"x": 1})])
+
+        assert outbox.take() == [event]
+        assert outbox.take() == [event]
+        outbox.delete([event])
+        assert outbox.take() == []
+
+    def test_events_are_taken_in_limited_numbers(self, store: SQLiteOutboxStore) -> None:
+        outbox = Outbox(store, replay_limit=2)
+        outbox.save(events := [MyTestEvent({"x": index}) for index in range(3)])
+
+        assert outbox.take() == events[:2]
+        outbox.delete(events[:2])
+        assert outbox.take() == events[2:]
+        outbox.delete(events[2:])
+        assert outbox.take() == []
+
+
+class TestEventAPIWithOutbox:
+    @pytest.fixture(name="outbox")
+    def outbox_fixture(self, store: SQLiteOutboxStore) -> Outbox:
+        outbox = Outbox(store)
+        EventAPI().set_outbox(outbox)
+        return outbox
+
+    def teardown_method(self, _test_method: Callable) -> None:
+        Singleton.drop_instance(cls=EventAPI)
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test_failed_events_are_saved_and_replayed_once(
+        self, mock_send: MagicMock, outbox: Outbox, store: SQLiteOutboxStore
+    ) -> None:
+        mock_send.put_events.side_effect = lambda **kwargs: put_events_response(
+            kwargs["Entries"],
+            failed=[i for i, e in enumerate(kwargs["Entries"]) if e["Detail"] == '{"x": 2}'],
+        )
+        EventAPI().register(first := MyTestEvent({"x": 1}))
+        EventAPI().register(second := MyTestEvent({"x": 2}))
+        with patch("lbz.events.api.time.sleep"):
+            with pytest.raises(RuntimeError):
+                EventAPI().send()
+        assert store.get(10) == [second]
+
+        mock_send.reset_mock(side_effect=True)
+        mock_send.put_events.side_effect = lambda **kwargs: put_events_response(kwargs["Entries"])
+        EventAPI().register(third := MyTestEvent({"x": 3}))
+        EventAPI().send()
+        EventAPI().send()
+
+        mock_send.put_events.assert_called_once()
+        entries = mock_send.put_events.call_args.kwargs["Entries"]
+        assert [entry["Detail"] for entry in entries] == ['{"x": 2}', '{"x": 3}']
+        assert EventAPI().sent_events == [first, third]
+        assert store.get(10) == []
+        assert outbox.take() == []
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test_replayed_events_which_failed_again_stay_in_outbox(
+        self, mock_send: MagicMock, outbox: Outbox, store: SQLiteOutboxStore
+    ) -> None:
+        outbox.save([saved := MyTestEvent({"x": 1})])
+        mock_send.put_events.side_effect = lambda **kwargs: put_events_response(
+            kwargs["Entries"], failed=[0]
+        )
+
+        with patch("lbz.events.api.time.sleep"), patch.object(store, "put") as put_mock:
+            EventAPI().send()
+
+        assert store.get(10) == [saved]
+        assert not EventAPI().failed_events
+        # so the event keeps its age
+        put_mock.assert_not_called()
+
+    @patch.object(Boto3Client, "eventbridge", new_callable=eventbridge_mock)
+    def test_sending_does_not_depend_on_outbox(
+        self, mock_send: MagicMock, outbox: Outbox, caplog: LogCaptureFixture
+    ) -> None:
+        EventAPI().register(event := MyTestEvent({"x": 1}))
+
+        with patch.object(outbox.store, "get", side_effect=OSError):
+            EventAPI().send()
+
+        mock_send.put_events.assert_called_once()
+        assert EventAPI().sent_events == [event]
+        assert "Reading events from the outbox has failed" in caplog.text
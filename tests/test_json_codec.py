@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from os import environ
+from unittest.mock import ANY, patch
+from uuid import UUID
+
+import pytest
+
+from lbz import json_codec
+from lbz.json_codec import JSONCodec, OrjsonCodec, get_codec, json_default
+from lbz.misc import FrozenMapping
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+SAMPLE = {
+    "price": Decimal("10.10"),
+    "created": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "day": date(2024, 1, 2),
+    "id": UUID("2c5ea4c0-4067-11e9-8bad-9b1deb4d3b7d"),
+    "tags": {"a"},
+    "point": Point(1, 2),
+}
+EXPECTED = {
+    "price": "10.10",
+    "created": "2024-01-02T03:04:05+00:00",
+    "day": "2024-01-02",
+    "id": "2c5ea4c0-4067-11e9-8bad-9b1deb4d3b7d",
+    "tags": ["a"],
+    "point": {"x": 1, "y": 2},
+}
+
+
+class TestJSONDefault:
+    def test_falls_back_to_string_representation(self) -> None:
+        assert json_default(object) == "<class 'object'>"
+
+    def test_converts_dataclass_instances_only(self) -> None:
+        assert json_default(Point(1, 2)) == {"x": 1, "y": 2}
+        assert json_default(Point) == str(Point)
+
+
+class TestJSONCodec:
+    def test_dumps_compact_by_default(self) -> None:
+        assert JSONCodec().dumps({"x": [1, 2]}) == '{"x":[1,2]}'
+        assert JSONCodec().dumps({"x": [1, 2]}, compact=False) == '{"x": [1, 2]}'
+
+    def test_dumps_handles_non_native_types(self) -> None:
+        codec = JSONCodec()
+        assert codec.loads(codec.dumpb(SAMPLE)) == EXPECTED
+
+    def test_loads_raises_value_error(self) -> None:
+        with pytest.raises(ValueError):
+            JSONCodec().loads("{x}")
+
+
+class TestOrjsonCodec:
+    @pytest.fixture(autouse=True)
+    def require_orjson(self) -> None:
+        pytest.importorskip("orjson")
+
+    def test_dumps_handles_non_native_types(self) -> None:
+        codec = OrjsonCodec()
+        assert codec.loads(codec.dumps(SAMPLE)) == EXPECTED
+
+    def test_dumps_non_string_keys(self) -> None:
+        assert OrjsonCodec().dumps({1: "x"}) == '{"1":"x"}'
+
+    def test_loads_raises_value_error(self) -> None:
+        with pytest.raises(ValueError):
+            OrjsonCodec().loads(b"{x}")
+
+    @patch.dict(environ, {"JSON_CODEC": "auto"})
+    def test_auto_prefers_orjson(self) -> None:
+        assert isinstance(get_codec(), OrjsonCodec)
+
+
+class TestGetCodec:
+    def test_uses_standard_library_by_default(self) -> None:
+        assert type(get_codec()) is JSONCodec  # pylint: disable=unidiomatic-typecheck
+        assert json_codec.dumps({"x": 1}) == '{"x":1}'
+        assert json_codec.dumpb({"x": 1}, compact=False) == b'{"x": 1}'
+        assert json_codec.loads('{"x": 1}') == {"x": 1}
+
+    def test_returns_the_same_instance(self) -> None:
+        assert get_codec() is get_codec()
+
+    @patch.dict(environ, {"JSON_CODEC": "yaml"})
+    def test_raises_for_unsupported_codec(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported JSON codec: yaml"):
+            get_codec()
+
+
+@pytest.mark.parametrize("codec_class", json_codec.CODECS.values(), ids=json_codec.CODECS)
+class TestAllCodecs:
+    def test_dumps_handles_non_native_types(self, codec_class: type[JSONCodec]) -> None:
+        codec = codec_class()
+
+        for dumped in (codec.dumps(SAMPLE), codec.dumpb(SAMPLE, compact=False)):
+            loaded = codec.loads(dumped)
+            # msgspec writes UTC offsets as "Z", which is ISO 8601 all the same
+            assert datetime.fromisoformat(loaded["created"]) == SAMPLE["created"]
+            assert loaded == {**EXPECTED, "created": ANY}
+
+    def test_dumps_decimals_as_strings(self, codec_class: type[JSONCodec]) -> None:
+        dumped = codec_class().dumps({"x": [Decimal("0.10")], "y": (Decimal("1"),)})
+
+        assert dumped.replace(" ", "") == '{"x":["0.10"],"y":["1"]}'
+
+    def test_dumps_frozen_views_as_viewed_data(self, codec_class: type[JSONCodec]) -> None:
+        frozen = FrozenMapping({"x": {"y": [1, Decimal("0.10")]}})
+
+        dumped = codec_class().dumps({"frozen": frozen, "list": frozen["x"]["y"]})
+
+        assert dumped.replace(" ", "") == '{"frozen":{"x":{"y":[1,"0.10"]}},"list":[1,"0.10"]}'
+
+    def test_loads_raises_value_error(self, codec_class: type[JSONCodec]) -> None:
+        with pytest.raises(ValueError):
+            codec_class().loads(b"{x}")
@@ -0,0 +1,242 @@
+import json
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os import environ
+from threading import Thread
+from unittest.mock import patch
+
+import pytest
+
+from lbz._cfg import ALLOWED_PUBLIC_KEYS, JWKS_MIN_REFETCH_INTERVAL, JWKS_URL
+from lbz.authz.authorizer import Authorizer
+from lbz.exceptions import Unauthorized
+from lbz.jwks import JWKSource, get_jwks_source
+from lbz.jwt_utils import decode_jwt, key_registry
+from tests.fixtures.ec_pair import SAMPLE_EC_PRIVATE_KEY, SAMPLE_EC_PUBLIC_KEY
+from tests.fixtures.rsa_pair import SAMPLE_PUBLIC_KEY
+
+
+class JWKSServer(HTTPServer):
+    """Local stand-in of an endpoint publishing keys, counting requests it received."""
+
+    jwks: dict = {"keys": [SAMPLE_EC_PUBLIC_KEY]}
+    status = 200
+    requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/.well-known/jwks.json"
+
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    server: JWKSServer
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        self.server.requests += 1
+        body = json.dumps(self.server.jwks).encode("utf-8")
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="jwks_server")
+def jwks_server_fixture() -> Iterator[JWKSServer]:
+    server = JWKSServer(("127.0.0.1", 0), JWKSHandler)
+    thread = Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture(name="timer")
+def timer_fixture() -> FakeTimer:
+    return FakeTimer()
+
+
+@pytest.fixture(name="jwks_source")
+def jwks_source_fixture(jwks_server: JWKSServer, timer: FakeTimer) -> JWKSource:
+    return JWKSource(jwks_server.url, ttl=100, min_refetch_interval=10, timer=timer)
+
+
+class TestJWKSource:
+    def test_keys_are_fetched_once(self, jwks_source: JWKSource, jwks_server: JWKSServer) -> None:
+        assert jwks_source.keys == [SAMPLE_EC_PUBLIC_KEY]
+        assert jwks_source.keys == [SAMPLE_EC_PUBLIC_KEY]
+
+        assert jwks_server.requests == 1
+
+    def test_stale_keys_are_served_while_refreshed_in_background(
+        self, jwks_source: JWKSource, jwks_server: JWKSServer, timer: FakeTimer
+    ) -> None:
+        assert jwks_source.keys == [SAMPLE_EC_PUBLIC_KEY]
+        jwks_server.jwks = {"keys": [SAMPLE_PUBLIC_KEY]}
+        timer.now = 100
+
+        assert jwks_source.keys == [SAMPLE_EC_PUBLIC_KEY]
+        jwks_source.join()
+
+        assert jwks_source.keys == [SAMPLE_PUBLIC_KEY]
+        assert jwks_server.requests == 2
+
+    def test_keys_are_replaced_only_when_changed(
+        self, jwks_source: JWKSource, timer: FakeTimer
+    ) -> None:
+        keys = jwks_source.keys
+        timer.now = 10
+
+        assert not jwks_source.refetch()
+        assert jwks_source.keys is keys
+
+    def test_refetching_is_rate_limited(
+        self, jwks_source: JWKSource, jwks_server: JWKSServer, timer: FakeTimer
+    ) -> None:
+        assert jwks_source.keys
+        jwks_server.jwks = {"keys": [SAMPLE_PUBLIC_KEY]}
+
+        for _ in range(5):
+            assert not jwks_source.refetch()
+        timer.now = 10
+
+        assert jwks_source.refetch()
+        assert jwks_source.keys == [SAMPLE_PUBLIC_KEY]
+        assert jwks_server.requests == 2
+
+    @pytest.mark.parametrize("status, jwks", [(500, {}), (200, {"keys": "x"}), (200, {})])
+    def test_failed_fetch_keeps_keys(
+        self,
+        status: int,
+        jwks: dict,
+        jwks_source: JWKSource,
+        jwks_server: JWKSServer,
+        timer: FakeTimer,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        assert jwks_source.keys
+        jwks_server.status, jwks_server.jwks = status, jwks
+        timer.now = 10
+
+        assert not jwks_source.refetch()
+        assert jwks_source.keys == [SAMPLE_EC_PUBLIC_KEY]
+        assert "Failed fetching JWKS from" in caplog.text
+
+    def test_failed_first_fetch_is_not_retried_right_away(
+        self, jwks_source: JWKSource, jwks_server: JWKSServer
+    ) -> None:
+        jwks_server.status = 503
+
+        assert jwks_source.keys == []
+        assert jwks_source.keys == []
+
+        assert jwks_server.requests == 1
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "file:///etc/passwd",
+            "http://example.com/.well-known/jwks.json",
+            "http://127.0.0.1.example.com/jwks.json",
+            "http://10.0.0.1/jwks.json",
+            "ftp://127.0.0.1/jwks.json",
+        ],
+    )
+    def test_unsupported_url(self, url: str) -> None:
+        with pytest.raises(ValueError, match=f"Unsupported JWKS URL: {url}"):
+            JWKSource(url)
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://example.com/.well-known/jwks.json",
+            "http://localhost:8000/jwks.json",
+            "http://127.0.0.1:8000/jwks.json",
+            "http://[::1]:8000/jwks.json",
+        ],
+    )
+    def test_supported_url(self, url: str) -> None:
+        assert JWKSource(url).url == url
+
+
+class TestGetJWKSource:
+    def test_no_source_when_url_is_not_set(self) -> None:
+        assert get_jwks_source() is None
+
+    @patch.dict(environ, {"JWKS_URL": "https://example.com/.well-known/jwks.json"})
+    def test_source_is_shared(self) -> None:
+        JWKS_URL.reset()
+
+        source = get_jwks_source()
+
+        assert source is not None
+        assert source.url == "https://example.com/.well-known/jwks.json"
+        assert source is get_jwks_source()
+
+
+class TestPublishedKeys:
+    @pytest.fixture(autouse=True)
+    def use_jwks_server(self, jwks_server: JWKSServer) -> Iterator[None]:
+        patched_environ = {
+            "ALLOWED_PUBLIC_KEYS": json.dumps({"keys": []}),
+            "JWKS_URL": jwks_server.url,
+            "JWKS_MIN_REFETCH_INTERVAL": "0",
+        }
+        with patch.dict(environ, patched_environ):
+            ALLOWED_PUBLIC_KEYS.reset()
+            JWKS_URL.reset()
+            JWKS_MIN_REFETCH_INTERVAL.reset()
+            yield
+
+    def test_tokens_are_verified_with_published_keys(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        token = Authorizer.sign_authz(full_access_authz_payload, SAMPLE_EC_PRIVATE_KEY)
+
+        assert decode_jwt(token) == full_access_authz_payload
+
+    def test_unknown_kid_triggers_refetch(
+        self, jwks_server: JWKSServer, full_access_authz_payload: dict
+    ) -> None:
+        jwks_server.jwks = {"keys": []}
+        assert key_registry.get(SAMPLE_EC_PUBLIC_KEY["kid"]) is None
+        jwks_server.jwks = {"keys": [SAMPLE_EC_PUBLIC_KEY]}
+        token = Authorizer.sign_authz(full_access_authz_payload, SAMPLE_EC_PRIVATE_KEY)
+
+        assert decode_jwt(token) == full_access_authz_payload
+        assert jwks_server.requests == 2
+
+    @patch.dict(environ, {"JWKS_MIN_REFETCH_INTERVAL": "60"})
+    def test_unknown_kids_do_not_flood_endpoint(
+        self, jwks_server: JWKSServer, full_access_authz_payload: dict
+    ) -> None:
+        JWKS_MIN_REFETCH_INTERVAL.reset()
+        token = Authorizer.sign_authz(
+            full_access_authz_payload, {**SAMPLE_EC_PRIVATE_KEY, "kid": "forged"}
+        )
+
+        for _ in range(5):
+            with pytest.raises(Unauthorized):
+                decode_jwt(token)
+
+        assert jwks_server.requests == 1
+
+    def test_invalid_published_keys_are_skipped(
+        self, jwks_server: JWKSServer, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        jwks_server.jwks = {"keys": [{"kty": "EC"}, {"kty": "XYZ", "kid": "xyz"}]}
+
+        assert key_registry.get("xyz") is None
+        assert "Skipping invalid key published under JWKS_URL" in caplog.text
@@ -0,0 +1,160 @@
+import json
+from os import environ
+from unittest.mock import patch
+
+import pytest
+from jose import jwt
+from jose.exceptions import JWKError
+
+from lbz import jwt_backends
+from lbz._cfg import ALLOWED_PUBLIC_KEYS, JWT_BACKEND
+from lbz.authz.authorizer import Authorizer
+from lbz.jwt_backends import CryptographyBackend, Ed25519Key, JoseBackend, get_algorithm
+from lbz.jwt_utils import decode_jwt
+from tests.fixtures.ec_pair import SAMPLE_EC_PRIVATE_KEY, SAMPLE_EC_PUBLIC_KEY
+from tests.fixtures.ed25519_pair import SAMPLE_ED25519_PRIVATE_KEY, SAMPLE_ED25519_PUBLIC_KEY
+from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY
+
+KEY_PAIRS = {
+    "RS256": (SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY),
+    "ES256": (SAMPLE_EC_PRIVATE_KEY, SAMPLE_EC_PUBLIC_KEY),
+    "EdDSA": (SAMPLE_ED25519_PRIVATE_KEY, SAMPLE_ED25519_PUBLIC_KEY),
+}
+
+
+@pytest.fixture(name="cryptography_backend")
+def cryptography_backend_fixture() -> CryptographyBackend:
+    pytest.importorskip("cryptography")
+    return CryptographyBackend()
+
+
+@pytest.mark.parametrize(
+    "jwk, expected_algorithm",
+    [
+        ({"kty": "RSA"}, "RS256"),
+        ({"kty": "EC"}, "ES256"),
+        ({"kty": "OKP"}, "EdDSA"),
+        ({"kty": "EC", "alg": "ES256"}, "ES256"),
+        ({"kty": "RSA", "alg": "RS512"}, "RS512"),
+        ({}, "RS256"),
+    ],
+)
+def test_get_algorithm(jwk: dict, expected_algorithm: str) -> None:
+    assert get_algorithm(jwk) == expected_algorithm
+
+
+class TestGetBackend:
+    def test_cryptography_is_picked_when_installed(self) -> None:
+        pytest.importorskip("cryptography")
+
+        assert jwt_backends.get_backend().name == "cryptography"
+
+    def test_jose_is_picked_when_nothing_else_is_installed(self) -> None:
+        with patch("lbz.jwt_backends.find_spec", return_value=None):
+            assert jwt_backends.get_backend().name == "jose"
+
+    @patch.dict(environ, {"JWT_BACKEND": "jose"})
+    def test_backend_can_be_chosen(self) -> None:
+        JWT_BACKEND.reset()
+
+        backend = jwt_backends.get_backend()
+
+        assert isinstance(backend, JoseBackend)
+        assert backend is jwt_backends.get_backend()
+
+    @patch.dict(environ, {"JWT_BACKEND": "pyjwt"})
+    def test_unsupported_backend(self) -> None:
+        JWT_BACKEND.reset()
+
+        with pytest.raises(ValueError, match="Unsupported JWT backend: pyjwt"):
+            jwt_backends.get_backend()
+
+
+class TestJoseBackend:
+    @pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+    def test_signed_message_is_verified(self, algorithm: str) -> None:
+        private_jwk, public_jwk = KEY_PAIRS[algorithm]
+        backend = JoseBackend()
+
+        signature = backend.construct(private_jwk, algorithm).sign(b"message")
+
+        assert backend.construct(public_jwk, algorithm).verify(b"message", signature)
+        assert not backend.construct(public_jwk, algorithm).verify(b"other", signature)
+
+    def test_eddsa_is_not_supported(self) -> None:
+        with pytest.raises(JWKError, match="Unsupported algorithm: EdDSA"):
+            JoseBackend().construct(SAMPLE_ED25519_PUBLIC_KEY, "EdDSA")
+
+
+class TestCryptographyBackend:
+    @pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+    def test_signed_message_is_verified(
+        self, cryptography_backend: CryptographyBackend, algorithm: str
+    ) -> None:
+        private_jwk, public_jwk = KEY_PAIRS[algorithm]
+
+        signature = cryptography_backend.construct(private_jwk, algorithm).sign(b"message")
+
+        public_key = cryptography_backend.construct(public_jwk, algorithm)
+        assert public_key.verify(b"message", signature)
+        assert not public_key.verify(b"other", signature)
+
+    def test_signatures_are_compatible_with_jose_backend(
+        self, cryptography_backend: CryptographyBackend
+    ) -> None:
+        signature = cryptography_backend.construct(SAMPLE_EC_PRIVATE_KEY, "ES256").sign(b"msg")
+
+        assert JoseBackend().construct(SAMPLE_EC_PUBLIC_KEY, "ES256").verify(b"msg", signature)
+
+
+class TestEd25519Key:
+    @pytest.fixture(autouse=True)
+    def require_cryptography(self) -> None:
+        pytest.importorskip("cryptography")
+
+    def test_public_key_cannot_sign(self) -> None:
+        with pytest.raises(JWKError, match="private key is needed"):
+            Ed25519Key(SAMPLE_ED25519_PUBLIC_KEY, "EdDSA").sign(b"message")
+
+    def test_public_key_is_derived_from_private_one(self) -> None:
+        public_key = Ed25519Key(SAMPLE_ED25519_PRIVATE_KEY, "EdDSA").public_key()
+
+        assert public_key.to_dict() == SAMPLE_ED25519_PUBLIC_KEY
+
+    @pytest.mark.parametrize(
+        "jwk",
+        [
+            {"kty": "OKP", "crv": "X25519", "x": SAMPLE_ED25519_PUBLIC_KEY["x"]},
+            {"kty": "EC", "crv": "Ed25519", "x": SAMPLE_ED25519_PUBLIC_KEY["x"]},
+            {"kty": "OKP", "crv": "Ed25519"},
+            {"kty": "OKP", "crv": "Ed25519", "x": "c2hvcnQ"},
+        ],
+    )
+    def test_invalid_key(self, jwk: dict) -> None:
+        with pytest.raises(JWKError):
+            Ed25519Key(jwk, "EdDSA")
+
+
+@pytest.mark.parametrize("backend", ["jose", "cryptography"])
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_tokens_are_signed_and_verified_with_algorithm_of_the_key(
+    backend: str, algorithm: str, full_access_authz_payload: dict
+) -> None:
+    if backend == "cryptography":
+        pytest.importorskip("cryptography")
+    elif algorithm == "EdDSA":
+        pytest.skip("EdDSA requires cryptography")
+    private_jwk, public_jwk = KEY_PAIRS[algorithm]
+    allowed_public_keys = json.dumps({"keys": [public_jwk]})
+
+    with patch.dict(environ, {"JWT_BACKEND": backend, "ALLOWED_PUBLIC_KEYS": allowed_public_keys}):
+        JWT_BACKEND.reset()
+        ALLOWED_PUBLIC_KEYS.reset()
+        token = Authorizer.sign_authz(full_access_authz_payload, private_jwk)
+
+        assert jwt.get_unverified_header(token) == {
+            "alg": algorithm,
+            "kid": private_jwk["kid"],
+            "typ": "JWT",
+        }
+        assert decode_jwt(token) == full_access_authz_payload
@@ -2,15 +2,34 @@ import json
 from datetime import datetime, timedelta, timezone
 from os import environ
 from unittest.mock import MagicMock, patch
+from uuid import uuid4
 
 import pytest
-from jose import jwt
+from jose import jwk, jwt
+from jose.exceptions import JWTClaimsError
 
+from lbz import jwt_backends
+from lbz._cfg import ALLOWED_AUDIENCES, ALLOWED_ISS, ALLOWED_PUBLIC_KEYS, JWT_CACHE_SIZE
 from lbz.authz.authorizer import Authorizer
 from lbz.exceptions import MissingConfigValue, SecurityError, Unauthorized
-from lbz.jwt_utils import decode_jwt, get_matching_jwk, validate_jwt_properties
+from lbz.jwt_utils import (
+    PublicKey,
+    decode_jwt,
+    get_matching_jwk,
+    key_registry,
+    validate_audience,
+    validate_jwt_properties,
+    verified_tokens_cache,
+)
 from tests.fixtures.rsa_pair import SAMPLE_PRIVATE_KEY, SAMPLE_PUBLIC_KEY
 
+SAMPLE_KEY = PublicKey(
+    kid=SAMPLE_PUBLIC_KEY["kid"],
+    alg="RS256",
+    jwk=SAMPLE_PUBLIC_KEY,
+    key=jwk.construct(SAMPLE_PUBLIC_KEY, "RS256"),
+)
+
 
 class TestGetMatchingJWK:
     @patch.object(jwt, "get_unverified_header", return_value=SAMPLE_PUBLIC_KEY)
@@ -30,21 +49,21 @@ class TestGetMatchingJWK:
 
 
 class TestDecodeJWT:
-    @patch("lbz.jwt_utils.get_matching_jwk", return_value={})
+    @patch("lbz.jwt_utils.get_matching_key", return_value=SAMPLE_KEY)
     def test_did_not_find_matching_jwk(
-        self, get_matching_jwk_mock: MagicMock, caplog: pytest.LogCaptureFixture
+        self, get_matching_key_mock: MagicMock, caplog: pytest.LogCaptureFixture
     ) -> None:
         with pytest.raises(Unauthorized):
             decode_jwt("x")
-        get_matching_jwk_mock.assert_called_once_with("x")
+        get_matching_key_mock.assert_called_once_with("x")
         assert "Failed decoding JWT with following details" in caplog.text
 
-    @patch("lbz.jwt_utils.get_matching_jwk", return_value={})
-    def test_invalid_type(self, get_matching_jwk_mock: MagicMock) -> None:
+    @patch("lbz.jwt_utils.get_matching_key", return_value=SAMPLE_KEY)
+    def test_invalid_type(self, get_matching_key_mock: MagicMock) -> None:
         msg = "error occurred during decoding"
         with pytest.raises(RuntimeError, match=msg):
             decode_jwt({"a"})  # type: ignore
-        get_matching_jwk_mock.assert_called_once_with({"a"})
+        get_matching_key_mock.assert_called_once_with({"a"})
 
     def test_proper_jwt(
         self, full_access_authz_payload: dict, full_access_auth_header: str
@@ -74,6 +93,13 @@ class TestDecodeJWT:
             decode_jwt(jwt_token)
         assert "Failed decoding JWT with any of JWK - details" in caplog.text
 
+    def test_token_without_required_claim(self, full_access_authz_payload: dict) -> None:
+        payload = {key: value for key, value in full_access_authz_payload.items() if key != "exp"}
+        jwt_token = Authorizer.sign_authz(payload, SAMPLE_PRIVATE_KEY)
+
+        with pytest.raises(SecurityError, match="'exp'"):
+            decode_jwt(jwt_token)
+
     def test_validate_missing_iss_exception(self) -> None:
         with pytest.raises(SecurityError, match="'exp'"):
             validate_jwt_properties({"allow": "*", "deny": {}})
@@ -103,3 +129,169 @@ class TestDecodeJWT:
     def test_wrong_iss(self, full_access_authz_payload: dict) -> None:
         with pytest.raises(Unauthorized):
             validate_jwt_properties({**full_access_authz_payload, "iss": "test2"})
+
+    def test_iss_must_match_one_of_allowed_issuers_exactly(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        with patch.dict(environ, {"ALLOWED_ISS": "test-issuer,other-issuer"}):
+            ALLOWED_ISS.reset()
+
+            validate_jwt_properties({**full_access_authz_payload, "iss": "other-issuer"})
+            with pytest.raises(Unauthorized):
+                validate_jwt_properties({**full_access_authz_payload, "iss": "test"})
+
+    def test_signature_is_verified_once_for_any_of_audiences(
+        self, full_access_authz_payload: dict, allowed_audiences: list[str]
+    ) -> None:
+        payload = {**full_access_authz_payload, "aud": allowed_audiences[-1]}
+        token = Authorizer.sign_authz(payload, SAMPLE_PRIVATE_KEY)
+
+        with patch.object(jwt, "decode", wraps=jwt.decode) as jwt_decode:
+            assert decode_jwt(token) == payload
+
+        jwt_decode.assert_called_once()
+
+    @pytest.mark.parametrize("aud", [[str(uuid4()), "allowed"], "allowed", None])
+    def test_audience_is_validated(self, aud: list[str] | str | None) -> None:
+        with patch.dict(environ, {"ALLOWED_AUDIENCES": "allowed"}):
+            ALLOWED_AUDIENCES.reset()
+
+            validate_audience({} if aud is None else {"aud": aud})
+
+    @pytest.mark.parametrize(
+        "aud, message",
+        [
+            ("other", "Invalid audience"),
+            ([str(uuid4())], "Invalid audience"),
+            ({"aud": "allowed"}, "Invalid claim format in token"),
+            ([1], "Invalid claim format in token"),
+        ],
+    )
+    def test_wrong_audience_is_rejected(self, aud: object, message: str) -> None:
+        with patch.dict(environ, {"ALLOWED_AUDIENCES": "allowed"}):
+            ALLOWED_AUDIENCES.reset()
+
+            with pytest.raises(JWTClaimsError, match=message):
+                validate_audience({"aud": aud})
+
+
+class TestKeyRegistry:
+    def test_keys_are_indexed_by_kid(self) -> None:
+        public_key = key_registry.get(SAMPLE_PUBLIC_KEY["kid"])
+
+        assert public_key is not None
+        assert public_key.alg == "RS256"
+        assert public_key.jwk == SAMPLE_PUBLIC_KEY
+        assert key_registry.get("unknown") is None
+
+    def test_keys_are_parsed_once(self, full_access_auth_header: str) -> None:
+        backend = jwt_backends.get_backend()
+        with patch.object(backend, "construct", wraps=backend.construct) as construct_mock:
+            for _ in range(2):
+                verified_tokens_cache.clear()
+                decode_jwt(full_access_auth_header)
+
+        construct_mock.assert_called_once_with(SAMPLE_PUBLIC_KEY, "RS256")
+
+    def test_keys_are_loaded_again_once_configuration_changes(self) -> None:
+        key_registry.get(SAMPLE_PUBLIC_KEY["kid"])
+        other_key = {**SAMPLE_PUBLIC_KEY, "kid": "other"}
+
+        with patch.dict(environ, {"ALLOWED_PUBLIC_KEYS": json.dumps({"keys": [other_key]})}):
+            ALLOWED_PUBLIC_KEYS.reset()
+
+            assert key_registry.get(SAMPLE_PUBLIC_KEY["kid"]) is None
+            assert key_registry.get("other") is not None
+
+    def test_algorithm_of_the_key_is_enforced(self, full_access_authz_payload: dict) -> None:
+        token = jwt.encode(
+            full_access_authz_payload,
+            SAMPLE_PRIVATE_KEY,
+            algorithm="RS512",
+            headers={"kid": SAMPLE_PUBLIC_KEY["kid"]},
+        )
+
+        with pytest.raises(Unauthorized):
+            decode_jwt(token)
+
+    @patch.dict(environ, {"ALLOWED_PUBLIC_KEYS": json.dumps({"keys": [{"kty": "RSA"}]})})
+    def test_key_without_kid_is_rejected_when_loaded(self) -> None:
+        ALLOWED_PUBLIC_KEYS.reset()
+
+        with pytest.raises(RuntimeError, match="doesn't have the 'kid' field"):
+            decode_jwt("x")
+
+    @patch.dict(
+        environ, {"ALLOWED_PUBLIC_KEYS": json.dumps({"keys": [{"kty": "XYZ", "kid": "xyz"}]})}
+    )
+    def test_invalid_key_is_rejected_when_loaded(self) -> None:
+        ALLOWED_PUBLIC_KEYS.reset()
+
+        with pytest.raises(RuntimeError, match="The public key with id=xyz is invalid"):
+            key_registry.load()
+
+
+class TestVerifiedTokensCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        verified_tokens_cache.clear()
+
+    def test_token_is_verified_once(
+        self, full_access_authz_payload: dict, full_access_auth_header: str
+    ) -> None:
+        with patch.object(jwt, "decode", wraps=jwt.decode) as jwt_decode:
+            assert decode_jwt(full_access_auth_header) == full_access_authz_payload
+            assert decode_jwt(full_access_auth_header) == full_access_authz_payload
+
+        jwt_decode.assert_called_once()
+        assert verified_tokens_cache.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "size": 1,
+            "maxsize": 1024,
+        }
+
+    def test_cached_claims_are_copied(self, full_access_auth_header: str) -> None:
+        decode_jwt(full_access_auth_header)["allow"] = "changed"
+
+        assert decode_jwt(full_access_auth_header)["allow"] != "changed"
+
+    def test_cache_is_dropped_when_configuration_changes(
+        self, full_access_auth_header: str
+    ) -> None:
+        decode_jwt(full_access_auth_header)
+        ALLOWED_PUBLIC_KEYS.reset()
+
+        with patch.object(jwt, "decode", wraps=jwt.decode) as jwt_decode:
+            decode_jwt(full_access_auth_header)
+
+        jwt_decode.assert_called_once()
+
+    def test_tokens_expiring_within_skew_are_not_cached(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        exp = int((datetime.now(timezone.utc) + timedelta(seconds=20)).timestamp())
+        token = Authorizer.sign_authz(
+            {**full_access_authz_payload, "exp": exp}, SAMPLE_PRIVATE_KEY
+        )
+
+        decode_jwt(token)
+
+        assert len(verified_tokens_cache._cache) == 0  # pylint: disable=protected-access
+
+    @patch.dict(environ, {"JWT_CACHE_SIZE": "0"})
+    def test_cache_can_be_disabled(self, full_access_auth_header: str) -> None:
+        JWT_CACHE_SIZE.reset()
+
+        with patch.object(jwt, "decode", wraps=jwt.decode) as jwt_decode:
+            decode_jwt(full_access_auth_header)
+            decode_jwt(full_access_auth_header)
+
+        assert jwt_decode.call_count == 2
+
+    def test_invalid_tokens_are_not_cached(self, full_access_auth_header: str) -> None:
+        for _ in range(2):
+            with pytest.raises(Unauthorized):
+                decode_jwt(full_access_auth_header + "x")
+
+        assert verified_tokens_cache.stats()["size"] == 0
@@ -0,0 +1,173 @@
+import json
+from collections.abc import Iterator
+from os import environ
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from lbz._cfg import TRUST_AUTHORIZER_CONTEXT
+from lbz.authz.utils import check_permission
+from lbz.exceptions import Unauthorized
+from lbz.jwt_utils import decode_jwt
+from lbz.lambda_authorizer import (
+    CONTEXT_KEY,
+    LambdaAuthorizerBroker,
+    get_token_hash,
+    get_trusted_claims,
+)
+from lbz.resource import Resource
+from lbz.rest import APIGatewayEvent
+from tests.utils import encode_token
+
+METHOD_ARN = "arn:aws:execute-api:eu-west-1:123456789012:abcdef1234/prod/GET/orders/1"
+STAGE_ARN = "arn:aws:execute-api:eu-west-1:123456789012:abcdef1234/prod/*"
+
+
+def token_event(token: str) -> dict:
+    return {"type": "TOKEN", "authorizationToken": token, "methodArn": METHOD_ARN}
+
+
+def request_event(headers: dict) -> dict:
+    return {"type": "REQUEST", "headers": headers, "methodArn": METHOD_ARN}
+
+
+@pytest.fixture(name="trust_authorizer_context")
+def trust_authorizer_context_fixture() -> Iterator[None]:
+    with patch.dict(environ, {"TRUST_AUTHORIZER_CONTEXT": "1"}):
+        TRUST_AUTHORIZER_CONTEXT.reset()
+        yield
+
+
+class TestLambdaAuthorizerBroker:
+    def test_valid_token_is_allowed_to_whole_stage(self, full_access_auth_header: str) -> None:
+        response = LambdaAuthorizerBroker(
+            token_event(full_access_auth_header), MagicMock()
+        ).react()
+
+        assert response["policyDocument"]["Statement"] == [
+            {"Action": "execute-api:Invoke", "Effect": "Allow", "Resource": STAGE_ARN}
+        ]
+        assert response["principalId"] == get_token_hash(full_access_auth_header)
+        assert json.loads(response["context"][CONTEXT_KEY]) == {
+            get_token_hash(full_access_auth_header): decode_jwt(full_access_auth_header)
+        }
+
+    def test_all_tokens_of_request_are_verified(
+        self, full_access_auth_header: str, user_cognito: dict
+    ) -> None:
+        user_token = encode_token({**user_cognito, "sub": "user-id"})
+        event = request_event(
+            {"authorization": full_access_auth_header, "Authentication": user_token}
+        )
+
+        response = LambdaAuthorizerBroker(event, MagicMock()).react()
+
+        assert set(json.loads(response["context"][CONTEXT_KEY])) == {
+            get_token_hash(full_access_auth_header),
+            get_token_hash(user_token),
+        }
+        assert response["principalId"] == "user-id"
+
+    def test_route_arn_of_http_api(self, full_access_auth_header: str) -> None:
+        event = {
+            "version": "2.0",
+            "type": "REQUEST",
+            "routeArn": "arn:aws:execute-api:us-east-1:123456789012:api/$default/GET/orders",
+            "headers": {"authorization": full_access_auth_header},
+        }
+
+        response = LambdaAuthorizerBroker(event, MagicMock()).react()
+
+        assert response["policyDocument"]["Statement"][0]["Resource"] == (
+            "arn:aws:execute-api:us-east-1:123456789012:api/$default/*"
+        )
+
+    @pytest.mark.parametrize(
+        "event",
+        [
+            token_event(""),
+            token_event("invalid-token"),
+            request_event({}),
+            request_event({"Authorization": "invalid-token"}),
+        ],
+    )
+    def test_missing_or_invalid_tokens_are_denied(self, event: dict) -> None:
+        response = LambdaAuthorizerBroker(event, MagicMock()).react()
+
+        assert response["policyDocument"]["Statement"][0]["Effect"] == "Deny"
+        assert response["principalId"] == "unauthorized"
+        assert "context" not in response
+
+    @pytest.mark.parametrize("claim", ["exp", "iss"])
+    def test_tokens_without_required_claims_are_denied(
+        self, full_access_authz_payload: dict, claim: str
+    ) -> None:
+        payload = {key: value for key, value in full_access_authz_payload.items() if key != claim}
+        event = token_event(encode_token(payload))
+
+        response = LambdaAuthorizerBroker(event, MagicMock()).react()
+
+        assert response["policyDocument"]["Statement"][0]["Effect"] == "Deny"
+        assert "context" not in response
+
+
+class TestTrustedClaims:
+    @pytest.fixture(name="request_context")
+    def request_context_fixture(self, full_access_auth_header: str) -> dict:
+        response = LambdaAuthorizerBroker(
+            token_event(full_access_auth_header), MagicMock()
+        ).react()
+        return {"authorizer": {"principalId": response["principalId"], **response["context"]}}
+
+    def test_context_is_not_trusted_by_default(
+        self, request_context: dict, full_access_auth_header: str
+    ) -> None:
+        assert get_trusted_claims(request_context, full_access_auth_header) is None
+
+    @pytest.mark.usefixtures("trust_authorizer_context")
+    def test_claims_are_taken_by_hash_of_the_token(
+        self, request_context: dict, full_access_auth_header: str, limited_access_auth_header: str
+    ) -> None:
+        assert get_trusted_claims(request_context, full_access_auth_header) == decode_jwt(
+            full_access_auth_header
+        )
+        assert get_trusted_claims(request_context, limited_access_auth_header) is None
+        assert get_trusted_claims({}, full_access_auth_header) is None
+
+    @pytest.mark.usefixtures("trust_authorizer_context")
+    def test_context_of_http_api(
+        self, request_context: dict, full_access_auth_header: str
+    ) -> None:
+        http_api_context = {"authorizer": {"lambda": request_context["authorizer"]}}
+
+        assert get_trusted_claims(http_api_context, full_access_auth_header) is not None
+
+    @pytest.mark.usefixtures("trust_authorizer_context")
+    def test_expired_claims_are_not_trusted(self, full_access_authz_payload: dict) -> None:
+        token = encode_token({**full_access_authz_payload, "exp": 1})
+        context = {CONTEXT_KEY: json.dumps({get_token_hash(token): full_access_authz_payload})}
+        expired_context = {
+            CONTEXT_KEY: json.dumps(
+                {get_token_hash(token): {**full_access_authz_payload, "exp": 1}}
+            )
+        }
+
+        assert get_trusted_claims({"authorizer": context}, token) is not None
+        assert get_trusted_claims({"authorizer": expired_context}, token) is None
+
+    @pytest.mark.usefixtures("trust_authorizer_context")
+    def test_resource_does_not_verify_trusted_tokens(
+        self,
+        request_context: dict,
+        full_access_auth_header: str,
+        sample_resource_with_authorization: type[Resource],
+    ) -> None:
+        event = APIGatewayEvent("GET", "/", headers={"authorization": full_access_auth_header})
+        event["requestContext"].update(request_context)
+        resource = sample_resource_with_authorization(event)
+
+        with patch("lbz.request.decode_jwt", side_effect=Unauthorized) as decode_mock:
+            assert check_permission(resource, "perm-name") == {"allow": "*", "deny": None}
+            assert resource().status_code == 200
+
+        decode_mock.assert_not_called()
@@ -6,6 +6,8 @@ from tests.exemplary_events import (
     direct_lambda_event,
     dynamodb_event,
     event_bridge_event,
+    function_url_event,
+    http_api_event,
     s3_event,
     sqs_event,
 )
@@ -15,6 +17,8 @@ from tests.exemplary_events import (
     "source_event, expected_type",
     (
         (api_gw_event(), LambdaSource.API_GW),
+        (http_api_event(), LambdaSource.API_GW),
+        (function_url_event(), LambdaSource.API_GW),
         (direct_lambda_event(), LambdaSource.DIRECT),
         (dynamodb_event(), LambdaSource.DYNAMODB),
         (event_bridge_event(), LambdaSource.EVENT_BRIDGE),
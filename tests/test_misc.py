@@ -1,11 +1,20 @@
 # coding=utf-8
 from collections.abc import MutableMapping
 from typing import Any
+from unittest.mock import MagicMock
 
 import pytest
 from pytest import LogCaptureFixture
 
-from lbz.misc import MultiDict, NestedDict, Singleton, deep_update, deprecated, get_logger
+from lbz.misc import (
+    LRUCache,
+    MultiDict,
+    NestedDict,
+    Singleton,
+    deep_update,
+    deprecated,
+    get_logger,
+)
 
 
 class DummySingletonBasedClass(metaclass=Singleton):
@@ -183,3 +192,51 @@ def test__deprecated__logs_warning_for_method() -> None:
 
     with pytest.deprecated_call(match=expected_warning):
         SMTH().smth()
+
+
+class TestLRUCache:
+    def test_counts_hits_and_misses(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("b", 2) == 2
+        assert cache.stats() == {"hits": 1, "misses": 2, "size": 1, "maxsize": 2}
+        assert repr(cache) == "<LRUCache size=1/2 hits=1 misses=2>"
+
+    def test_evicts_least_recently_used_entries(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_expires_entries_after_their_ttl(self) -> None:
+        timer = MagicMock(return_value=100.0)
+        cache: LRUCache[str, int] = LRUCache(ttl=10, timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=20)
+        cache.set("c", 3, ttl=0)
+        timer.return_value = 110.0
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert "c" not in cache
+        assert len(cache) == 1
+
+    def test_pop_and_clear_remove_entries(self) -> None:
+        cache: LRUCache[str, int] = LRUCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == cache.misses == 0
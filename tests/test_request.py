@@ -1,9 +1,14 @@
 # coding=utf-8
 
+import gzip
+from base64 import b64encode
+from os import environ
+from unittest.mock import patch
+
 import pytest
 from multidict import CIMultiDict
 
-from lbz.exceptions import BadRequestError
+from lbz.exceptions import BadRequestError, UnsupportedMediaType
 from lbz.misc import MultiDict
 from lbz.request import Request
 from lbz.rest import ContentType
@@ -33,8 +38,70 @@ class TestRequestInit:
         assert isinstance(req._is_base64_encoded, bool)  # pylint: disable=protected-access
         assert req.user is None
 
+    def test__init__does_not_copy_raw_headers_until_accessed(self) -> None:
+        raw_headers = {"Content-Type": ContentType.JSON}
+        req = Request(
+            headers=raw_headers,
+            uri_params={},
+            method="GET",
+            body=None,
+            context={},
+            stage_vars={},
+            is_base64_encoded=False,
+        )
+        assert req._headers is raw_headers  # pylint: disable=protected-access
+        assert req.headers["content-type"] == ContentType.JSON
+        assert req.headers is req.headers
+
+    @pytest.mark.parametrize(
+        "raw_headers", [{"authentication": "x"}, CIMultiDict(Authentication="x")]
+    )
+    def test_get_header_does_not_wrap_raw_headers(self, raw_headers: dict) -> None:
+        req = Request(
+            headers=raw_headers,
+            uri_params={},
+            method="GET",
+            body=None,
+            context={},
+            stage_vars={},
+            is_base64_encoded=False,
+        )
+
+        assert req.get_header("Authentication") == "x"
+        assert req.get_header("Authorization") is None
+        assert req._headers is raw_headers  # pylint: disable=protected-access
+
+    def test__init__parses_query_string_when_accessed(self) -> None:
+        req = Request(
+            headers=None,
+            uri_params={},
+            method="GET",
+            body=None,
+            context={},
+            stage_vars={},
+            is_base64_encoded=False,
+            query_string="a=1&a=2&b=",
+        )
+        assert req._query_params is None  # pylint: disable=protected-access
+        assert req.query_params.getlist("a") == ["1", "2"]
+        assert req.query_params["b"] == ""
+        assert req.headers == CIMultiDict()
+
+    def test_request_has_no_instance_dict(self, sample_request: Request) -> None:
+        assert not hasattr(sample_request, "__dict__")
+
 
 class TestRequestGeneral:
+    def test_get_verified_claims_decodes_each_token_once(self, sample_request: Request) -> None:
+        with patch("lbz.request.decode_jwt", side_effect=lambda token: {"sub": token}) as decode:
+            assert sample_request.get_verified_claims("a") == {"sub": "a"}
+            assert sample_request.get_verified_claims("b") == {"sub": "b"}
+            assert sample_request.get_verified_claims("a") is sample_request.get_verified_claims(
+                "a"
+            )
+
+        assert decode.call_count == 2
+
     def test___repr__(self, sample_request: Request) -> None:
         assert str(sample_request) == f"<Request {sample_request.method} >"
 
@@ -79,6 +146,41 @@ class TestRequestRawBody:
         assert sample_request.raw_body == b"abcx"
 
 
+class TestRequestCompressedBody:
+    def test_raw_body_decompresses_gzip_body(self, sample_request: Request) -> None:
+        sample_request.headers = CIMultiDict({"Content-Encoding": "gzip"})
+        sample_request._is_base64_encoded = True  # pylint: disable=protected-access
+        body = b64encode(gzip.compress(b"abcx"))
+        sample_request._body = body  # pylint: disable=protected-access
+        assert sample_request.raw_body == b"abcx"
+
+    def test_raw_body_raises_when_body_is_not_compressed(self, sample_request: Request) -> None:
+        sample_request.headers = CIMultiDict({"Content-Encoding": "gzip"})
+        sample_request._body = "abcx"  # pylint: disable=protected-access
+        with pytest.raises(BadRequestError, match="Invalid gzip data"):
+            sample_request.raw_body  # pylint: disable=pointless-statement
+
+    @patch.dict(environ, {"DECOMPRESSION_MAX_SIZE": "3"})
+    def test_raw_body_raises_when_body_is_too_large(self, sample_request: Request) -> None:
+        sample_request.headers = CIMultiDict({"Content-Encoding": "gzip"})
+        sample_request._is_base64_encoded = True  # pylint: disable=protected-access
+        body = b64encode(gzip.compress(b"abcx"))
+        sample_request._body = body  # pylint: disable=protected-access
+        with pytest.raises(BadRequestError, match="exceeds the size limit"):
+            sample_request.raw_body  # pylint: disable=pointless-statement
+
+    def test_raw_body_raises_when_encoding_is_unsupported(self, sample_request: Request) -> None:
+        sample_request.headers = CIMultiDict({"Content-Encoding": "compress"})
+        sample_request._body = "abcx"  # pylint: disable=protected-access
+        with pytest.raises(UnsupportedMediaType, match="not supported: compress"):
+            sample_request.raw_body  # pylint: disable=pointless-statement
+
+    def test_raw_body_skips_identity_encoding(self, sample_request: Request) -> None:
+        sample_request.headers = CIMultiDict({"Content-Encoding": "identity"})
+        sample_request._body = "abcx"  # pylint: disable=protected-access
+        assert sample_request.raw_body == b"abcx"
+
+
 class TestRequestJsonBody:
     def test_json_body_dict(self, sample_request: Request) -> None:
         sample_request._body = {"x": "t1"}  # pylint: disable=protected-access
@@ -113,7 +215,7 @@ class TestRequestJsonBody:
         assert sample_request.json_body is None
 
     def test_json_body_none_as_body(self, sample_request: Request) -> None:
-        sample_request._body = None  # type: ignore # pylint: disable=protected-access
+        sample_request._body = None  # pylint: disable=protected-access
         assert sample_request.json_body is None
 
 
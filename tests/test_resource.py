@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+from base64 import b64decode
 from collections import defaultdict
 from collections.abc import Callable
+from datetime import datetime
 from http import HTTPStatus
 from os import environ
 from typing import Any
@@ -14,8 +17,10 @@ from multidict import CIMultiDict
 from pytest import LogCaptureFixture
 
 from lbz.authentication import User
+from lbz.authz.decorators import authorization
 from lbz.collector import AuthzCollector
-from lbz.events.api import EventAPI
+from lbz.conditional import compute_etag
+from lbz.events.api import PREVIOUS_SENDING_TIMEOUT, EventAPI
 from lbz.exceptions import NotFound, ServerError
 from lbz.misc import MultiDict
 from lbz.request import Request
@@ -27,8 +32,9 @@ from lbz.resource import (
     Resource,
 )
 from lbz.response import Response
-from lbz.rest import APIGatewayEvent, ContentType
+from lbz.rest import APIGatewayEvent, APIGatewayEventV2, ContentType
 from lbz.router import Router, add_route
+from tests.exemplary_events import function_url_event, http_api_event
 from tests.fixtures.rsa_pair import SAMPLE_PUBLIC_KEY
 
 # TODO: Use fixtures yielded from conftest.py
@@ -91,6 +97,19 @@ class TestResource:
             }
         }
 
+    def test___call__does_not_wrap_headers_to_find_the_user(self) -> None:
+        class XResource(Resource):
+            @add_route("/")
+            def test_method(self) -> Response:
+                return Response({"message": "x"})
+
+        resource = XResource(
+            APIGatewayEvent(method="GET", resource_path="/", headers={"X-Header": "x"})
+        )
+
+        assert resource().status_code == 200
+        assert not isinstance(resource.request._headers, CIMultiDict)  # pylint: disable=W0212
+
     @patch.object(Resource, "_get_user")
     def test___call__(self, get_user: MagicMock) -> None:
         class XResource(Resource):
@@ -107,7 +126,35 @@ class TestResource:
             "body": '{"message":"x"}',
             "isBase64Encoded": False,
         }
-        get_user.assert_called_once_with({})
+        get_user.assert_called_once_with()
+
+    def test_routes_are_not_shared_between_resources(self) -> None:
+        class XResource(Resource):
+            @add_route("/")
+            def x_method(self) -> Response:
+                return Response("x")
+
+        class YResource(Resource):
+            @add_route("/")
+            def y_method(self) -> Response:
+                return Response("y")
+
+        assert XResource(event)().body == "x"
+        assert YResource(event)().body == "y"
+        assert Resource(event)().status_code == HTTPStatus.NOT_FOUND
+
+    def test_method_not_allowed_returned_with_allowed_methods(self) -> None:
+        class XResource(Resource):
+            @add_route("/", method="POST")
+            @add_route("/", method="PATCH")
+            def test_method(self) -> Response:
+                return Response("x")
+
+        response = XResource(event)()
+
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+        assert response.headers["Allow"] == "PATCH, POST"
+        assert response.json()["message"] == "Unsupported method: GET"
 
     def test_not_found_returned_when_path_not_defined(self) -> None:
         response = Resource(event_wrong_uri)()
@@ -140,9 +187,10 @@ class TestResource:
         resp = XResource({**event, "headers": {"authentication": "dummy"}})()
         assert resp.status_code == HTTPStatus.UNAUTHORIZED
 
+    @patch.object(Request, "get_verified_claims", return_value={"username": "x"})
     @patch.object(User, "__init__", return_value=None)
     def test_user_loaded_when_cognito_authentication_configured_correctly(
-        self, load_user: MagicMock
+        self, load_user: MagicMock, get_verified_claims: MagicMock
     ) -> None:
         class XResource(Resource):
             @add_route("/")
@@ -153,7 +201,8 @@ class TestResource:
         authentication_token = jwt.encode({"username": "x"}, "", headers={"kid": key_id})
 
         XResource({**event, "headers": {"authentication": authentication_token}})()
-        load_user.assert_called_once_with(authentication_token)
+        get_verified_claims.assert_called_once_with(authentication_token)
+        load_user.assert_called_once_with(authentication_token, claims={"username": "x"})
 
     def test_unauthorized_when_jwt_header_lacks_kid(self) -> None:
         class XResource(Resource):
@@ -271,11 +320,231 @@ class TestResource:
 
         assert XResource.get_name() == "xresource"
 
+    def test__get_permission_names__lists_permissions_of_handlers_once(self) -> None:
+        class XResource(Resource):
+            @add_route("/")
+            @authorization("list")
+            def items(self, restrictions: dict) -> Response:  # pylint: disable=unused-argument
+                return Response("x")
+
+            @add_route("/", method="POST")
+            @authorization()
+            def create(self, restrictions: dict) -> Response:  # pylint: disable=unused-argument
+                return Response("x")
+
+            @add_route("/all")
+            @authorization("list")
+            def list_all(self, restrictions: dict) -> Response:  # pylint: disable=unused-argument
+                return Response("x")
+
+            @add_route("/public")
+            def public(self) -> Response:
+                return Response("x")
+
+        assert XResource.get_permission_names() == ["list", "create"]
+
+
+class TestResourceWithHTTPAPIEvents:
+    class UsersResource(Resource):
+        @add_route("/users/{uid}", method="GET")
+        def get(self, uid: str) -> Response:
+            return Response({"uid": uid})
+
+        @add_route("/users/{uid}", method="POST")
+        def update(self, uid: str) -> Response:
+            return Response({"uid": uid, "body": self.request.json_body})
+
+    def test_builds_request_from_http_api_event(self) -> None:
+        resource = self.UsersResource(http_api_event())
+
+        assert resource.urn == "/users/42"
+        assert resource.path == "/users/{uid}"
+        assert resource.method == "POST"
+        assert resource.path_params == {"uid": "42"}
+        assert resource.request.headers["Content-Type"] == ContentType.JSON
+        assert resource.request.query_params.getlist("fields") == ["name", "email"]
+        assert resource.request.query_params["limit"] == ""
+        assert resource.request.cookies == ["session=abc", "theme=dark"]
+        assert resource.request.context["requestId"] == "JKJaXmPLvHcESHA="
+        assert resource.request.stage_vars == {}
+
+    def test_handles_http_api_event(self) -> None:
+        response = self.UsersResource(http_api_event())()
+
+        assert response.body == {"uid": "42", "body": {"name": "John"}}
+
+    def test_resolves_route_of_function_url_event(self) -> None:
+        resource = self.UsersResource(function_url_event())
+
+        assert resource.path == "/users/{uid}"
+        assert resource.path_params == {"uid": "42"}
+        assert resource().body == {"uid": "42"}
+        assert not resource.request.query_params
+        assert resource.request.cookies == []
+
+    def test_not_found_returned_when_function_url_path_is_unknown(self) -> None:
+        http_event = APIGatewayEventV2("GET", "/unknown", route_key="$default")
+
+        assert self.UsersResource(http_event)().status_code == HTTPStatus.NOT_FOUND
+
+    def test_works_with_simulated_event(self) -> None:
+        http_event = APIGatewayEventV2(
+            "GET", "/users/{uid}", path_params={"uid": "1"}, query_params={"x": ["1", "2"]}
+        )
+        resource = self.UsersResource(http_event)
+
+        assert resource.request.query_params.getlist("x") == ["1", "2"]
+        assert resource().body == {"uid": "1"}
+
 
 ORIGIN_LOCALHOST = "http://localhost:3000"
 ORIGIN_EXAMPLE = "https://api.example.com"
 
 
+class TestResourceCompression:
+    class ItemsResource(Resource):
+        compression = ("gzip",)
+        compression_min_size = 10
+
+        @add_route("/items")
+        def list_items(self) -> Response:
+            return Response({"items": list(range(10))})
+
+    def test_compresses_response_when_client_accepts_encoding(self) -> None:
+        items_event = APIGatewayEvent("GET", "/items", headers={"Accept-Encoding": "gzip, br;q=0"})
+
+        response = self.ItemsResource(items_event)().to_dict()
+
+        assert response["headers"]["Content-Encoding"] == "gzip"
+        assert response["headers"]["Vary"] == "Accept-Encoding"
+        assert response["isBase64Encoded"]
+        assert json.loads(gzip.decompress(b64decode(response["body"]))) == {
+            "items": list(range(10))
+        }
+
+    def test_does_not_compress_response_when_client_does_not_accept_encoding(self) -> None:
+        response = self.ItemsResource(APIGatewayEvent("GET", "/items"))().to_dict()
+
+        assert "Content-Encoding" not in response["headers"]
+        assert json.loads(response["body"]) == {"items": list(range(10))}
+
+    def test_does_not_compress_not_modified_response(self) -> None:
+        class NotModifiedResource(Resource):
+            compression = ("gzip",)
+            compression_min_size = 0
+            auto_etag = True
+
+            @add_route("/items")
+            def list_items(self) -> Response:
+                return Response({"items": list(range(10))})
+
+        etag = compute_etag(b'{"items":[0,1,2,3,4,5,6,7,8,9]}')
+        items_event = APIGatewayEvent(
+            "GET", "/items", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+
+        response = NotModifiedResource(items_event)().to_dict()
+
+        assert response["statusCode"] == HTTPStatus.NOT_MODIFIED
+        assert "Content-Encoding" not in response["headers"]
+        assert response["body"] == ""
+
+    def test_does_not_compress_response_by_default(self, sample_resource: type[Resource]) -> None:
+        response = sample_resource(
+            APIGatewayEvent("GET", "/", headers={"Accept-Encoding": "gzip"})
+        )()
+
+        assert response.content_encoding is None
+        assert "Vary" not in response.headers
+
+
+class TestResourceConditionalRequests:
+    class ReportResource(Resource):
+        auto_etag = True
+        expensive_work = MagicMock()
+
+        @add_route("/report")
+        def get_report(self) -> Response:
+            return Response({"total": 42})
+
+        @add_route("/report", method="POST")
+        def create_report(self) -> Response:
+            return Response({"total": 42})
+
+        @add_route("/cheap-report")
+        def get_cheap_report(self) -> Response:
+            self.check_not_modified(etag="v1", last_modified=datetime(2015, 10, 21, 7, 28))
+            self.expensive_work()
+            return Response({"total": 42})
+
+    def test_adds_etag_to_successful_get_response(self) -> None:
+        response = self.ReportResource(APIGatewayEvent("GET", "/report"))()
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["ETag"] == compute_etag(b'{"total":42}')
+
+    def test_returns_not_modified_when_etag_matches(self) -> None:
+        etag = compute_etag(b'{"total":42}')
+        report_event = APIGatewayEvent("GET", "/report", headers={"If-None-Match": etag})
+
+        response = self.ReportResource(report_event)()
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.to_dict() == {
+            "body": "",
+            "headers": {"ETag": etag},
+            "statusCode": HTTPStatus.NOT_MODIFIED,
+            "isBase64Encoded": False,
+        }
+
+    def test_does_not_evaluate_conditions_of_unsafe_methods(self) -> None:
+        etag = compute_etag(b'{"total":42}')
+        report_event = APIGatewayEvent("POST", "/report", headers={"If-None-Match": etag})
+
+        response = self.ReportResource(report_event)()
+
+        assert response.status_code == HTTPStatus.OK
+        assert "ETag" not in response.headers
+
+    def test_check_not_modified_ends_request_before_expensive_work(self) -> None:
+        self.ReportResource.expensive_work.reset_mock()
+        report_event = APIGatewayEvent(
+            "GET", "/cheap-report", headers={"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+
+        response = self.ReportResource(report_event)()
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.headers == {
+            "ETag": '"v1"',
+            "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+        }
+        self.ReportResource.expensive_work.assert_not_called()
+
+    def test_check_not_modified_adds_validators_to_response(self) -> None:
+        report_event = APIGatewayEvent("GET", "/cheap-report", headers={"If-None-Match": '"v0"'})
+
+        response = self.ReportResource(report_event)()
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["ETag"] == '"v1"'
+        assert response.headers["Last-Modified"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+    def test_cors_headers_are_added_to_not_modified_response(self) -> None:
+        class ReportCORSResource(CORSResource):
+            @add_route("/report")
+            def get_report(self) -> Response:
+                self.check_not_modified(etag="v1")
+                return Response({"total": 42})
+
+        report_event = APIGatewayEvent("GET", "/report", headers={"If-None-Match": '"v1"'})
+
+        response = ReportCORSResource(report_event, ["GET"], origins=["*"])()
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+
 class TestCORSResource:
     def setup_method(self) -> None:
         environ["CORS_ORIGIN"] = f"{ORIGIN_LOCALHOST},{ORIGIN_EXAMPLE}"
@@ -494,6 +763,34 @@ class TestEventAwareResource:
         mocked_event_api.clear.assert_not_called()
         mocked_event_api.clear_pending.assert_not_called()
 
+    def test_sends_events_in_background_when_deferred(self) -> None:
+        class XResource(EventAwareResource):
+            defer_events = True
+
+            @add_route("/")
+            def test_method(self) -> Response:
+                return Response({"message": "x"})
+
+        resource = XResource(event)
+        with patch.object(resource, "event_api", autospec=True) as mocked_event_api:
+            resource()
+
+        mocked_event_api.send_in_background.assert_called_once_with()
+        mocked_event_api.send.assert_not_called()
+
+    def test_joins_events_sent_in_background_before_clearing_them(self) -> None:
+        class XResource(EventAwareResource):
+            pass
+
+        calls: list[tuple[str, dict]] = []
+        with (
+            patch.object(EventAPI, "join", lambda _, **kwargs: calls.append(("join", kwargs))),
+            patch.object(EventAPI, "clear", lambda _: calls.append(("clear", {}))),
+        ):
+            XResource(event)
+
+        assert calls == [("join", {"timeout": PREVIOUS_SENDING_TIMEOUT}), ("clear", {})]
+
     def test_clears_pending_events_when_request_failed_during_handling(self) -> None:
         class XResource(EventAwareResource):
             @add_route("/")
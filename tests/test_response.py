@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from base64 import b64encode
+import gzip
+import json
+from base64 import b64decode, b64encode
+from datetime import date
+from decimal import Decimal
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
+from lbz.conditional import compute_etag
 from lbz.exceptions import LambdaFWException, ServerError
 from lbz.response import Response
 from lbz.rest import ContentType
@@ -37,6 +43,10 @@ class TestResponse:
             "isBase64Encoded": False,
         }
 
+    def test_response_body_dump_handles_decimals_and_dates(self) -> None:
+        response = Response({"price": Decimal("1.10"), "day": date(2024, 1, 2)})
+        assert response.to_dict()["body"] == '{"price":"1.10","day":"2024-01-02"}'
+
     def test_application_json_header_added_when_dict_without_headers(self) -> None:
         response = Response({"message": "xxx"}, status_code=666)
         assert response.to_dict() == {
@@ -74,6 +84,91 @@ class TestResponse:
             "isBase64Encoded": True,
         }
 
+    def test_response_body_is_base64_encoded_when_bytes(self) -> None:
+        response = Response(b"\x00\x01")
+        assert response.to_dict() == {
+            "body": "AAE=",
+            "headers": {"Content-Type": ContentType.BINARY},
+            "statusCode": 200,
+            "isBase64Encoded": True,
+        }
+
+    def test_response_body_is_compressed_when_encoding_accepted(self) -> None:
+        response = Response({"items": ["x" * 10] * 100}).compress("gzip;q=0.5, br;q=0")
+        dumped = response.to_dict()
+        assert dumped["headers"] == {
+            "Content-Type": ContentType.JSON,
+            "Vary": "Accept-Encoding",
+            "Content-Encoding": "gzip",
+        }
+        assert dumped["isBase64Encoded"]
+        assert json.loads(gzip.decompress(b64decode(dumped["body"]))) == response.body
+        assert "Content-Encoding" not in response.headers
+
+    def test_response_body_is_not_compressed_when_smaller_than_min_size(self) -> None:
+        response = Response("x" * 10, headers={"Vary": "Origin"}).compress("gzip", min_size=11)
+        assert response.to_dict() == {
+            "body": "x" * 10,
+            "headers": {"Vary": "Origin, Accept-Encoding"},
+            "statusCode": 200,
+            "isBase64Encoded": False,
+        }
+
+    def test_response_body_is_not_compressed_when_no_encoding_accepted(self) -> None:
+        response = Response("x" * 2000).compress("identity", encodings=["gzip", "unknown"])
+        assert response.content_encoding is None
+        assert response.to_dict()["body"] == "x" * 2000
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            Response("", status_code=200),
+            Response("", status_code=204),
+            Response("x" * 2000, status_code=204),
+            Response.not_modified({"ETag": '"v1"'}),
+        ],
+    )
+    def test_bodiless_response_is_not_compressed(self, response: Response) -> None:
+        dumped = response.compress("gzip", min_size=0).to_dict()
+
+        assert "Content-Encoding" not in dumped["headers"]
+        assert dumped["body"] == response.body
+        assert not dumped["isBase64Encoded"]
+
+    def test_set_etag_reuses_dumped_body(self) -> None:
+        response = Response({"x": 1})
+        with patch("lbz.response.json_codec.dumps", return_value='{"x":1}') as dumps:
+            etag = response.set_etag()
+            assert response.to_dict()["body"] == '{"x":1}'
+        dumps.assert_called_once()
+        assert response.headers["ETag"] == etag == compute_etag(b'{"x":1}')
+
+    def test_set_etag_is_recomputed_when_body_is_replaced(self) -> None:
+        response = Response("a")
+        etag = response.set_etag(weak=True)
+        response.body = "b"
+        assert etag.startswith("W/")
+        assert response.set_etag(weak=True) != etag
+        assert response.to_dict()["body"] == "b"
+
+    def test_etag_is_weakened_when_body_is_compressed(self) -> None:
+        response = Response("x" * 2000)
+        etag = response.set_etag()
+        response.compress("gzip")
+        assert response.to_dict()["headers"]["ETag"] == f"W/{etag}"
+        assert response.headers["ETag"] == etag
+
+    def test_not_modified_keeps_headers_other_than_content_ones(self) -> None:
+        response = Response.not_modified(
+            {"Content-Type": ContentType.JSON, "ETag": '"v1"', "Cache-Control": "no-cache"}
+        )
+        assert response.to_dict() == {
+            "body": "",
+            "headers": {"ETag": '"v1"', "Cache-Control": "no-cache"},
+            "statusCode": 304,
+            "isBase64Encoded": False,
+        }
+
     @pytest.mark.parametrize(
         "code, outcome",
         [
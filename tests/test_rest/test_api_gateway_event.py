@@ -1,7 +1,7 @@
 import uuid
 from unittest.mock import ANY, MagicMock, patch
 
-from lbz.rest import APIGatewayEvent, ContentType
+from lbz.rest import APIGatewayEvent, APIGatewayEventV2, ContentType
 
 
 class TestAPIGatewayEvent:
@@ -68,3 +68,72 @@ class TestAPIGatewayEvent:
             "resource": "/{pid}",
             "stageVariables": {},
         }
+
+
+class TestAPIGatewayEventV2:
+    @patch.object(uuid, "uuid4")
+    def test_builds_basic_version_of_simulated_event(self, mocked_uuid4: MagicMock) -> None:
+        mocked_uuid4.return_value = "<mocked-uuid-value>"
+
+        event = APIGatewayEventV2(method="GET", resource_path="/")
+
+        assert event == {
+            "version": "2.0",
+            "routeKey": "GET /",
+            "rawPath": "/",
+            "rawQueryString": "",
+            "headers": {"Content-Type": ContentType.JSON},
+            "requestContext": {
+                "http": {
+                    "method": "GET",
+                    "path": "/",
+                    "protocol": "HTTP/1.1",
+                    "sourceIp": "127.0.0.1",
+                    "userAgent": "lbz",
+                },
+                "requestId": "<mocked-uuid-value>",
+                "routeKey": "GET /",
+                "stage": "$default",
+                "timeEpoch": ANY,
+            },
+            "isBase64Encoded": False,
+        }
+
+    def test_builds_event_based_on_data_declared_from_outside(self) -> None:
+        event = APIGatewayEventV2(
+            method="POST",
+            resource_path="/{pid}",
+            path_params={"pid": 123},
+            query_params={"kot": 23, "aids": ["lol", "xd"]},
+            body={"ala": "ma_aids"},
+            headers={"accept": "DarthJson"},
+            cookies=["a=b"],
+            is_base64_encoded=True,
+            route_key="$default",
+        )
+
+        assert event == {
+            "version": "2.0",
+            "routeKey": "$default",
+            "rawPath": "/123",
+            "rawQueryString": "kot=23&aids=lol&aids=xd",
+            "cookies": ["a=b"],
+            "headers": {"accept": "DarthJson"},
+            "queryStringParameters": {"kot": "23", "aids": "lol,xd"},
+            "pathParameters": {"pid": 123},
+            "body": '{"ala": "ma_aids"}',
+            "requestContext": {
+                "http": {
+                    "method": "POST",
+                    "path": "/123",
+                    "protocol": "HTTP/1.1",
+                    "sourceIp": "127.0.0.1",
+                    "userAgent": "lbz",
+                },
+                "requestId": ANY,
+                "routeKey": "$default",
+                "stage": "$default",
+                "timeEpoch": ANY,
+            },
+            "isBase64Encoded": True,
+        }
@@ -0,0 +1,239 @@
+import io
+import json
+from collections.abc import Iterator
+from os import environ
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError, NoCredentialsError
+
+from lbz._cfg import REVOKED_TOKENS_FAIL_CLOSED, REVOKED_TOKENS_SOURCE
+from lbz.aws_boto3 import client
+from lbz.exceptions import Unauthorized
+from lbz.jwt_utils import decode_jwt
+from lbz.revocation import (
+    BloomFilter,
+    RevocationList,
+    get_loader,
+    get_revocation_list,
+    parse_revoked,
+)
+from tests.utils import encode_token
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestBloomFilter:
+    def test_values_are_never_missed(self) -> None:
+        values = [f"jti-{index}" for index in range(1000)]
+
+        bloom_filter = BloomFilter.from_values(values)
+
+        assert all(value in bloom_filter for value in values)
+
+    def test_false_positives_are_rare(self) -> None:
+        bloom_filter = BloomFilter.from_values(
+            [f"jti-{index}" for index in range(1000)], false_positive_rate=0.01
+        )
+
+        false_positives = sum(f"other-{index}" in bloom_filter for index in range(10000))
+
+        assert false_positives < 300
+
+    def test_empty_filter(self) -> None:
+        assert "jti" not in BloomFilter.from_values([])
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['["a", "b"]', "a,b", "a\nb\n", " a , b ,"],
+)
+def test_parse_revoked(content: str) -> None:
+    assert parse_revoked(content) == {"a", "b"}
+
+
+def test_parse_revoked_rejects_other_json() -> None:
+    with pytest.raises(TypeError):
+        parse_revoked("[1, 2]")
+
+
+class TestLoaders:
+    def test_file(self, tmp_path: Path) -> None:
+        (path := tmp_path / "revoked.json").write_text('["a"]', encoding="utf-8")
+
+        assert get_loader(f"file://{path}")() == '["a"]'
+
+    def test_ssm_parameter(self) -> None:
+        with patch("lbz.revocation.SSM.get_parameter", return_value="a,b") as get_parameter:
+            assert get_loader("ssm:/lbz/revoked")() == "a,b"
+
+        get_parameter.assert_called_once_with("/lbz/revoked")
+
+    def test_missing_ssm_parameter(self) -> None:
+        with patch("lbz.revocation.SSM.get_parameter", return_value=None):
+            with pytest.raises(ValueError, match="SSM parameter /lbz/revoked does not exist"):
+                get_loader("ssm:/lbz/revoked")()
+
+    def test_s3_object(self) -> None:
+        with patch.object(client.s3, "get_object") as get_object:
+            get_object.return_value = {"Body": io.BytesIO(b'["a"]')}
+
+            assert get_loader("s3://bucket/path/revoked.json")() == '["a"]'
+
+        get_object.assert_called_once_with(Bucket="bucket", Key="path/revoked.json")
+
+    def test_unsupported_source(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported source of revoked tokens: http://x"):
+            get_loader("http://x")
+
+
+class TestRevocationList:
+    @pytest.fixture(name="timer")
+    def timer_fixture(self) -> FakeTimer:
+        return FakeTimer()
+
+    def test_revoked_ids_are_loaded_once(self, timer: FakeTimer) -> None:
+        with patch("lbz.revocation.load_file", return_value="a,b") as load_file:
+            revocation_list = RevocationList(get_loader("file:///revoked"), ttl=60, timer=timer)
+
+            assert revocation_list.is_revoked("a")
+            assert not revocation_list.is_revoked("c")
+
+        load_file.assert_called_once_with("/revoked")
+
+    def test_revoked_ids_are_reloaded_in_background(self, timer: FakeTimer) -> None:
+        contents = iter(["a", "a,c"])
+        revocation_list = RevocationList(lambda: next(contents), ttl=60, timer=timer)
+        assert not revocation_list.is_revoked("c")
+        timer.now = 60
+
+        revocation_list.is_revoked("c")
+        revocation_list.join()
+
+        assert revocation_list.is_revoked("c")
+
+    def test_failed_load_keeps_revoked_ids(
+        self, timer: FakeTimer, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        contents = iter(["a", "[1]"])
+        revocation_list = RevocationList(lambda: next(contents), ttl=60, timer=timer)
+        assert revocation_list.is_revoked("a")
+
+        assert not revocation_list.refresh()
+
+        assert revocation_list.is_revoked("a")
+        assert "Failed loading revoked tokens" in caplog.text
+
+    @pytest.mark.parametrize("fail_closed", [False, True])
+    def test_failed_first_load_is_retried_right_away(
+        self, timer: FakeTimer, fail_closed: bool
+    ) -> None:
+        contents = iter(["[1]", "a"])
+        revocation_list = RevocationList(
+            lambda: next(contents), ttl=60, timer=timer, fail_closed=fail_closed
+        )
+
+        assert revocation_list.is_revoked("b") is fail_closed
+        assert not revocation_list.loaded
+        timer.now = 60
+        assert not revocation_list.is_revoked("b")
+        assert revocation_list.is_revoked("a")
+        assert revocation_list.loaded
+
+    @pytest.mark.parametrize("fail_closed", [False, True])
+    def test_failed_s3_and_ssm_loads_are_handled(
+        self, timer: FakeTimer, fail_closed: bool, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        error = ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+        with (
+            patch.object(client.s3, "get_object", side_effect=error),
+            patch("lbz.revocation.SSM.get_parameter", side_effect=NoCredentialsError()),
+        ):
+            for source in ("s3://bucket/revoked.json", "ssm:/lbz/revoked"):
+                revocation_list = RevocationList(
+                    get_loader(source), timer=timer, fail_closed=fail_closed
+                )
+
+                assert revocation_list.is_revoked("a") is fail_closed
+                assert not revocation_list.refresh()
+
+        assert "AccessDenied" in caplog.text
+        assert "Unable to locate credentials" in caplog.text
+
+    def test_bloom_filter_hits_are_confirmed(self, timer: FakeTimer) -> None:
+        revocation_list = RevocationList(lambda: "a", timer=timer)
+
+        with patch.object(BloomFilter, "__contains__", return_value=True):
+            assert not revocation_list.is_revoked("b")
+
+
+class TestRevokedTokens:
+    @pytest.fixture(autouse=True)
+    def revoked_tokens_file(self, tmp_path: Path) -> Iterator[None]:
+        path = tmp_path / "revoked.json"
+        path.write_text(json.dumps(["revoked-jti"]), encoding="utf-8")
+        with patch.dict(environ, {"REVOKED_TOKENS_SOURCE": f"file://{path}"}):
+            REVOKED_TOKENS_SOURCE.reset()
+            yield
+
+    def test_list_is_shared(self) -> None:
+        assert get_revocation_list() is get_revocation_list()
+
+    def test_revoked_token_is_rejected_even_if_cached(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        token = encode_token({**full_access_authz_payload, "jti": "to-revoke"})
+        assert decode_jwt(token)
+        revocation_list = get_revocation_list()
+        assert revocation_list is not None
+
+        with patch.object(revocation_list, "_revoked", frozenset(["to-revoke"])):
+            with patch.object(revocation_list, "_filter", BloomFilter.from_values(["to-revoke"])):
+                with pytest.raises(Unauthorized, match="Your token has been revoked."):
+                    decode_jwt(token)
+
+    @pytest.mark.parametrize("jti", [None, "other-jti"])
+    def test_other_tokens_are_accepted(
+        self, full_access_authz_payload: dict, jti: str | None
+    ) -> None:
+        claims = {**full_access_authz_payload, **({"jti": jti} if jti else {})}
+
+        assert decode_jwt(encode_token(claims)) == claims
+
+    def test_revoked_token_is_rejected(self, full_access_authz_payload: dict) -> None:
+        token = encode_token({**full_access_authz_payload, "jti": "revoked-jti"})
+
+        with pytest.raises(Unauthorized, match="Your token has been revoked."):
+            decode_jwt(token)
+
+    @pytest.fixture(name="missing_revoked_tokens")
+    def missing_revoked_tokens_fixture(self, tmp_path: Path) -> Iterator[None]:
+        with patch.dict(environ, {"REVOKED_TOKENS_SOURCE": f"file://{tmp_path / 'missing'}"}):
+            REVOKED_TOKENS_SOURCE.reset()
+            yield
+
+    @pytest.mark.usefixtures("missing_revoked_tokens")
+    def test_tokens_are_accepted_while_revoked_ids_cannot_be_loaded(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        claims = {**full_access_authz_payload, "jti": "other-jti"}
+
+        assert decode_jwt(encode_token(claims)) == claims
+
+    @pytest.mark.usefixtures("missing_revoked_tokens")
+    @patch.dict(environ, {"REVOKED_TOKENS_FAIL_CLOSED": "1"})
+    def test_tokens_are_rejected_while_revoked_ids_cannot_be_loaded_if_fail_closed(
+        self, full_access_authz_payload: dict
+    ) -> None:
+        token = encode_token({**full_access_authz_payload, "jti": "other-jti"})
+        REVOKED_TOKENS_FAIL_CLOSED.reset()
+
+        with pytest.raises(Unauthorized):
+            decode_jwt(token)
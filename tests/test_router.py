@@ -3,7 +3,10 @@ import json
 
 import pytest
 
+from lbz.authz.decorators import authorization
+from lbz.exceptions import NotFound, UnsupportedMethod
 from lbz.misc import NestedDict
+from lbz.resource import Resource
 from lbz.router import Router, add_route
 
 
@@ -53,13 +56,169 @@ class TestRouter:
 
 class TestAddRoute:
     def test_add_route(self) -> None:
-        router = Router()
-        assert len(router) == 0
+        class XResource:
+            @add_route("/")
+            def random_method(self) -> None:
+                pass
 
-        @add_route("/")
-        def random_method() -> None:
-            pass
+        router = Router.collect(XResource)
 
         assert len(router) == 1
         assert router["/"] == {"GET": "random_method"}
         assert router["/"]["GET"] == "random_method"
+
+    def test_add_route_stacked_on_same_handler(self) -> None:
+        class XResource:
+            @add_route("/", method="POST")
+            @add_route("/x", method="PUT")
+            def random_method(self) -> None:
+                pass
+
+        router = Router.collect(XResource)
+
+        assert router["/"] == {"POST": "random_method"}
+        assert router["/x"] == {"PUT": "random_method"}
+
+
+class TestRouterCollect:
+    def test_routes_are_not_shared_between_classes(self) -> None:
+        class XResource:
+            @add_route("/x")
+            def handler(self) -> None:
+                pass
+
+        class YResource:
+            @add_route("/y")
+            def handler(self) -> None:
+                pass
+
+        assert list(Router.collect(XResource)) == ["/x"]
+        assert list(Router.collect(YResource)) == ["/y"]
+
+    def test_routes_are_inherited_and_can_be_overridden(self) -> None:
+        class XResource:
+            @add_route("/")
+            def handler(self) -> None:
+                pass
+
+            @add_route("/x")
+            def other_handler(self) -> None:
+                pass
+
+        class YResource(XResource):
+            @add_route("/x")
+            def overriding_handler(self) -> None:
+                pass
+
+        router = Router.collect(YResource)
+
+        assert router["/"] == {"GET": "handler"}
+        assert router["/x"] == {"GET": "overriding_handler"}
+
+    def test_collected_router_is_frozen(self) -> None:
+        class XResource:
+            pass
+
+        router = Router.collect(XResource)
+
+        with pytest.raises(RuntimeError, match="Router is frozen"):
+            router.add_route("/", "GET", "x")
+
+
+class TestRouterGetEndpoint:
+    def test_binds_handlers_with_their_metadata(self) -> None:
+        class XResource(Resource):
+            @add_route("/x/{uid}/{path+}", method="POST")
+            @authorization("perm-name")
+            def handler(self, restrictions: dict) -> None:
+                pass
+
+        endpoint = XResource._router.get_endpoint(  # pylint: disable=protected-access
+            "/x/{uid}/{path+}", "POST"
+        )
+
+        assert endpoint.route == "/x/{uid}/{path+}"
+        assert endpoint.method == "POST"
+        assert endpoint.handler is XResource.handler
+        assert endpoint.permission == "perm-name"
+
+    def test_binds_overridden_handlers(self) -> None:
+        class XResource:
+            @add_route("/")
+            def handler(self) -> None:
+                pass
+
+        class YResource(XResource):
+            def handler(self) -> None:
+                pass
+
+        endpoint = Router.collect(YResource).get_endpoint("/", "GET")
+
+        assert endpoint.handler is YResource.handler
+        assert endpoint.permission is None
+
+    def test_raises_not_found_when_route_is_unknown(self) -> None:
+        class XResource:
+            pass
+
+        with pytest.raises(NotFound, match="Nothing matches the given URI: /x"):
+            Router.collect(XResource).get_endpoint("/x", "GET")
+        with pytest.raises(NotFound):
+            Router.collect(XResource).get_endpoint(None, "GET")
+
+    def test_raises_unsupported_method_with_allowed_methods(self) -> None:
+        class XResource:
+            @add_route("/", method="GET")
+            @add_route("/", method="PUT")
+            def handler(self) -> None:
+                pass
+
+        with pytest.raises(UnsupportedMethod) as error:
+            Router.collect(XResource).get_endpoint("/", "DELETE")
+
+        assert error.value.allowed_methods == ["PUT", "GET"]
+
+
+class TestRouterResolve:
+    @pytest.fixture(autouse=True)
+    def setup_routes(self, sample_router: Router) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        self.router = sample_router
+        self.router.add_route("/users", "GET", "x")
+        self.router.add_route("/users/{user_id}", "GET", "x")
+        self.router.add_route("/users/me", "GET", "x")
+        self.router.add_route("/users/{user_id}/orders/{order_id}", "GET", "x")
+        self.router.add_route("/users/{uid}/avatar", "GET", "x")
+        self.router.add_route("/files/{path+}", "GET", "x")
+
+    def test_resolves_root(self) -> None:
+        assert self.router.resolve("/") == ("/", {})
+
+    def test_resolves_static_route(self) -> None:
+        assert self.router.resolve("/users") == ("/users", {})
+        assert self.router.resolve("/users/") == ("/users", {})
+
+    def test_resolves_route_with_params(self) -> None:
+        assert self.router.resolve("/users/123") == ("/users/{user_id}", {"user_id": "123"})
+        assert self.router.resolve("/users/1/orders/2") == (
+            "/users/{user_id}/orders/{order_id}",
+            {"user_id": "1", "order_id": "2"},
+        )
+
+    def test_static_segment_takes_precedence_over_param(self) -> None:
+        assert self.router.resolve("/users/me") == ("/users/me", {})
+
+    def test_backtracks_to_differently_named_param(self) -> None:
+        assert self.router.resolve("/users/1/avatar") == ("/users/{uid}/avatar", {"uid": "1"})
+
+    def test_greedy_param_consumes_rest_of_path(self) -> None:
+        assert self.router.resolve("/files/a/b/c.txt") == ("/files/{path+}", {"path": "a/b/c.txt"})
+
+    def test_returns_none_when_nothing_matches(self) -> None:
+        assert self.router.resolve("/users/1/orders") is None
+        assert self.router.resolve("/files") is None
+        assert self.router.resolve("/unknown") is None
+
+    def test_clear_removes_compiled_routes(self) -> None:
+        self.router.clear()
+        assert self.router.resolve("/users") is None